@@ -1,11 +1,29 @@
 import os
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from PIL import Image, ImageTk, ImageOps, ImageEnhance
-import yt_dlp
-import threading
-from datetime import datetime
-import shutil
+from PIL import ImageTk
+import time
+import multiprocessing
+
+from tic_core.formats import (SUPPORTED_FORMATS, SUPPORTED_SITES, INPUT_EXTENSIONS, DEFAULT_PRESET, PRESET_LABELS,
+                              default_download_folders)
+from tic_core.files import rename_file
+from tic_core.downloads import download_media, probe_formats
+from tic_core.download_queue import DownloadQueue, QUEUED, RUNNING, DONE, FAILED, STATE_LABELS, describe_transfer
+from tic_core.images import default_workers, build_output_path, convert_image_file, iter_convert_batch
+from tic_core.large_images import default_memory_budget
+from tic_core.benchmark import compare_presets
+from tic_core.video import default_video_workers, iter_convert_videos
+from tic_core.audio import default_audio_workers, iter_convert_audio
+from tic_core.jobs import JobRunner
+from tic_core.adjustments import apply_adjustments, describe
+from tic_core.thumbnails import ThumbnailCache
+from tic_core.metadata import MetadataCache, summarize
+from tic_core.filmstrip import FilmstripCache
+from tic_core.waveform import WaveformCache, render_waveform
+from tic_core.metrics import metrics, profile_capture
+from tic_core.manifest import ConversionManifest, settings_key
+from tic_core.dedupe import find_duplicates, iter_deduplicated, iter_folder_files, link_duplicates
 
 class MediaToolsPro:
     def __init__(self, root):
@@ -18,49 +36,54 @@ class MediaToolsPro:
         self.current_file = ""
         self.batch_files = []
         self.current_file_index = 0
-        self.downloading = False
+        self.converting = False
         self.preview_image = None
-        self.original_image = None
-        self.download_folders = {
-            'images': os.path.expanduser("~/Downloads/MediaTools_Images"),
-            'videos': os.path.expanduser("~/Downloads/MediaTools_Videos"),
-            'audio': os.path.expanduser("~/Downloads/MediaTools_Audio")
-        }
+        self.image_adjustments = []
+        self.jobs = JobRunner()
+        self.thumbnails = ThumbnailCache()
+        self.metadata = MetadataCache()
+        self.probing = set()
+        self.probe_errors = {}
+        self.jobs.configure_pool('probe', 1)
+        self.filmstrips = FilmstripCache()
+        self.filmstrip_image = None
+        self.filmstrip_path = None
+        self.filmstrip_job = None
+        self.jobs.configure_pool('filmstrip', 1)
+        self.waveforms = WaveformCache()
+        self.waveform_image = None
+        self.waveform_path = None
+        self.waveform_job = None
+        self.jobs.configure_pool('waveform', 1)
+        self.profile_next_batch = tk.BooleanVar(value=False)
+        self.incremental_var = tk.BooleanVar(value=False)
+        self.diagnostics_window = None
+        self.download_folders = default_download_folders()
         
         # Criar pastas de downloads se não existirem
         for folder in self.download_folders.values():
             os.makedirs(folder, exist_ok=True)
         
         # Formatos suportados para cada tipo de mídia
-        self.supported_formats = {
-            'images': {
-                "JPEG": ".jpg", "PNG": ".png", "GIF": ".gif", 
-                "BMP": ".bmp", "WEBP": ".webp", "TIFF": ".tiff", 
-                "AVIF": ".avif", "ICO": ".ico", "TGA": ".tga"
-            },
-            'videos': {
-                "MP4": ".mp4", "MOV": ".mov", "AVI": ".avi",
-                "MKV": ".mkv", "WEBM": ".webm", "MPEG": ".mpeg",
-                "GIF": ".gif"
-            },
-            'audio': {
-                "MP3": ".mp3", "WAV": ".wav", "OGG": ".ogg",
-                "AAC": ".aac", "FLAC": ".flac", "M4A": ".m4a"
-            }
-        }
+        self.supported_formats = SUPPORTED_FORMATS
         
         # Sites suportados para download organizados por tipo
-        self.supported_sites = {
-            'images': ["Qualquer URL de imagem"],
-            'videos': ["YouTube", "Vimeo", "Facebook", "Twitter", "Instagram", "TikTok", "Dailymotion"],
-            'audio': ["YouTube", "SoundCloud", "Bandcamp", "Mixcloud"]
-        }
+        self.supported_sites = SUPPORTED_SITES
+        
+        # Fila de downloads com workers por tipo de mídia
+        self.download_queue = DownloadQueue(self.jobs, self.download_folders,
+                                            download_func=self._download_thread)
+        self.download_views = {}
         
         # Configurar estilo
         self.setup_styles()
         
         # Configurar interface
         self.setup_ui()
+        
+        # Acompanha as tarefas em segundo plano sem bloquear a interface
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.after(100, self.poll_jobs)
     
     def setup_styles(self):
         """Configura os estilos visuais da aplicação"""
@@ -115,6 +138,9 @@ class MediaToolsPro:
         self.setup_video_tab()
         self.setup_audio_tab()
         
+        # Barra de tarefas em segundo plano
+        self.setup_job_bar(main_frame)
+        
         # Rodapé
         footer = ttk.Frame(main_frame)
         footer.pack(fill=tk.X, pady=(10, 0))
@@ -123,6 +149,38 @@ class MediaToolsPro:
                  foreground='#666',
                  font=('Segoe UI', 8)).pack(side=tk.RIGHT)
     
+    def setup_job_bar(self, parent):
+        """Configura a barra de progresso das tarefas em segundo plano"""
+        job_frame = ttk.Frame(parent)
+        job_frame.pack(fill=tk.X, pady=(10, 0))
+        
+        self.job_progress = ttk.Progressbar(job_frame, 
+                                          style='Horizontal.TProgressbar', 
+                                          mode='determinate')
+        self.job_progress.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
+        
+        self.btn_cancel_jobs = ttk.Button(job_frame, 
+                                        text="✖ Cancelar", 
+                                        command=self.cancel_jobs,
+                                        state=tk.DISABLED)
+        self.btn_cancel_jobs.pack(side=tk.RIGHT)
+        
+        ttk.Button(job_frame, 
+                  text="🩺 Diagnóstico", 
+                  command=self.show_diagnostics).pack(side=tk.RIGHT, padx=(0, 5))
+        
+        self.job_status_label = ttk.Label(parent, 
+                                        text="Nenhuma tarefa em andamento", 
+                                        foreground='#666',
+                                        font=('Segoe UI', 8))
+        self.job_status_label.pack(anchor=tk.W)
+    
+    def setup_incremental_option(self, parent):
+        """Opção (compartilhada pelas abas) de pular o que já foi convertido no lote"""
+        ttk.Checkbutton(parent, 
+                       text="Pular arquivos já convertidos no lote", 
+                       variable=self.incremental_var).pack(anchor=tk.W, pady=2)
+    
     def setup_image_tab(self):
         """Configura a aba para processamento de imagens"""
         tab_image = ttk.Frame(self.notebook, style='Image.TFrame')
@@ -200,6 +258,20 @@ class MediaToolsPro:
                                  state="readonly")
         format_menu.pack(fill=tk.X, pady=2)
         
+        # Preset do codificador: velocidade x tamanho do arquivo
+        self.image_preset_var = tk.StringVar(value=PRESET_LABELS[DEFAULT_PRESET])
+        preset_frame = ttk.Frame(convert_frame)
+        preset_frame.pack(fill=tk.X, pady=2)
+        ttk.Label(preset_frame, text="Preset:").pack(side=tk.LEFT)
+        ttk.Combobox(preset_frame, 
+                    textvariable=self.image_preset_var, 
+                    values=list(PRESET_LABELS.values()), 
+                    state="readonly",
+                    width=14).pack(side=tk.LEFT, padx=5)
+        ttk.Button(preset_frame, 
+                  text="⏱ Comparar", 
+                  command=self.compare_image_presets).pack(side=tk.RIGHT)
+        
         # Controle de qualidade
         self.image_quality_var = tk.IntVar(value=90)
         quality_frame = ttk.Frame(convert_frame)
@@ -214,6 +286,30 @@ class MediaToolsPro:
                  command=lambda v: self.image_quality_var.set(int(float(v)))).pack(side=tk.LEFT, fill=tk.X, expand=True)
         ttk.Label(quality_frame, textvariable=self.image_quality_var).pack(side=tk.LEFT, padx=5)
         
+        # Processos usados na conversão em lote
+        self.image_workers_var = tk.IntVar(value=default_workers())
+        workers_frame = ttk.Frame(convert_frame)
+        workers_frame.pack(fill=tk.X, pady=2)
+        
+        ttk.Label(workers_frame, text="Processos:").pack(side=tk.LEFT)
+        ttk.Spinbox(workers_frame, 
+                   from_=1, 
+                   to=max(64, default_workers()), 
+                   width=5,
+                   textvariable=self.image_workers_var).pack(side=tk.LEFT, padx=5)
+        
+        # Limite de memória das conversões simultâneas (imagens enormes esperam a vez)
+        self.image_memory_var = tk.IntVar(value=default_memory_budget() // (1024 * 1024))
+        ttk.Label(workers_frame, text="Memória (MB):").pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Spinbox(workers_frame, 
+                   from_=256, 
+                   to=1024 * 1024, 
+                   increment=256,
+                   width=8,
+                   textvariable=self.image_memory_var).pack(side=tk.LEFT, padx=5)
+        
+        self.setup_incremental_option(convert_frame)
+        
         # Botões de conversão
         btn_convert = ttk.Button(convert_frame, 
                                text="🔄 Converter Imagem", 
@@ -253,6 +349,22 @@ class MediaToolsPro:
                                         command=lambda: self.adjust_image('darkness'))
         btn_brightness_minus.pack(fill=tk.X, pady=1)
         
+        btn_adjust_batch = ttk.Button(adjust_frame, 
+                                    text="🗂 Aplicar ao Lote", 
+                                    command=self.adjust_image_batch)
+        btn_adjust_batch.pack(fill=tk.X, pady=1)
+        
+        btn_reset_adjustments = ttk.Button(adjust_frame, 
+                                         text="✖ Limpar Ajustes", 
+                                         command=self.reset_adjustments)
+        btn_reset_adjustments.pack(fill=tk.X, pady=1)
+        
+        self.lbl_adjustments = ttk.Label(adjust_frame, 
+                                       text="Ajustes: nenhum", 
+                                       foreground='#4a6baf',
+                                       font=('Segoe UI', 8))
+        self.lbl_adjustments.pack(anchor=tk.W, pady=(2, 0))
+        
         # Seção de renomeação
         rename_frame = ttk.LabelFrame(left_panel, text=" Renomeação ", padding=8)
         rename_frame.pack(fill=tk.X, pady=5)
@@ -272,8 +384,8 @@ class MediaToolsPro:
         download_frame = ttk.LabelFrame(left_panel, text=" Download ", padding=8)
         download_frame.pack(fill=tk.X, pady=5)
         
-        ttk.Label(download_frame, text="URL da Imagem:").pack(anchor=tk.W)
-        self.image_url_entry = ttk.Entry(download_frame)
+        ttk.Label(download_frame, text="URLs (uma por linha):").pack(anchor=tk.W)
+        self.image_url_entry = tk.Text(download_frame, height=3, font=('Segoe UI', 9))
         self.image_url_entry.pack(fill=tk.X, pady=2)
         
         download_buttons_frame = ttk.Frame(download_frame)
@@ -289,6 +401,8 @@ class MediaToolsPro:
                                    command=lambda: self.open_download_folder('images'))
         btn_open_folder.pack(side=tk.RIGHT, fill=tk.X, expand=True, padx=(5, 0))
         
+        self.setup_download_queue_view(download_frame, 'images')
+        
         # ===== PAINEL DIREITO - VISUALIZAÇÃO =====
         self.setup_image_preview(right_panel)
     
@@ -355,6 +469,49 @@ class MediaToolsPro:
                  text="☀ Brilho -", 
                  command=lambda: self.adjust_image('darkness')).pack(side=tk.LEFT, padx=2)
 
+    def setup_download_queue_view(self, parent, media_type):
+        """Configura a lista de downloads e o controle de simultaneidade"""
+        workers_frame = ttk.Frame(parent)
+        workers_frame.pack(fill=tk.X, pady=2)
+        
+        workers_var = tk.IntVar(value=self.download_queue.workers(media_type))
+        ttk.Label(workers_frame, text="Downloads simultâneos:").pack(side=tk.LEFT)
+        ttk.Spinbox(workers_frame, 
+                   from_=1, 
+                   to=16, 
+                   width=5,
+                   textvariable=workers_var,
+                   command=lambda: self._set_download_workers(media_type)).pack(side=tk.LEFT, padx=5)
+        ttk.Button(workers_frame, 
+                  text="🧹 Duplicatas", 
+                  command=lambda: self.scan_duplicates(media_type)).pack(side=tk.RIGHT)
+        
+        # Playlists e canais viram um item por entrada (só vídeos e áudios)
+        bulk_var = tk.BooleanVar(value=False)
+        if media_type != 'images':
+            ttk.Checkbutton(parent, 
+                           text="Playlist/canal: baixar todos os itens", 
+                           variable=bulk_var).pack(anchor=tk.W)
+            ttk.Button(workers_frame, 
+                      text="🔎 Formatos", 
+                      command=lambda: self.probe_download_formats(media_type)).pack(side=tk.RIGHT, padx=5)
+        
+        tree = ttk.Treeview(parent, 
+                           columns=('url', 'state', 'progress', 'attempts'), 
+                           show='headings', 
+                           height=4)
+        tree.heading('url', text="URL")
+        tree.heading('state', text="Estado")
+        tree.heading('progress', text="Progresso")
+        tree.heading('attempts', text="Tentativas")
+        tree.column('url', width=220)
+        tree.column('state', width=80, anchor=tk.CENTER)
+        tree.column('progress', width=220, anchor=tk.CENTER)
+        tree.column('attempts', width=70, anchor=tk.CENTER)
+        tree.pack(fill=tk.X, pady=2)
+        
+        self.download_views[media_type] = {'workers': workers_var, 'tree': tree, 'bulk': bulk_var}
+    
     def setup_video_tab(self):
         """Configura a aba para processamento de vídeos"""
         tab_video = ttk.Frame(self.notebook, style='Video.TFrame')
@@ -423,6 +580,20 @@ class MediaToolsPro:
                                  state="readonly")
         format_menu.pack(fill=tk.X, pady=2)
         
+        # Conversões simultâneas (cada FFmpeg já usa várias threads)
+        self.video_workers_var = tk.IntVar(value=default_video_workers())
+        workers_frame = ttk.Frame(convert_frame)
+        workers_frame.pack(fill=tk.X, pady=2)
+        
+        ttk.Label(workers_frame, text="Conversões simultâneas:").pack(side=tk.LEFT)
+        ttk.Spinbox(workers_frame, 
+                   from_=1, 
+                   to=max(8, default_workers()), 
+                   width=5,
+                   textvariable=self.video_workers_var).pack(side=tk.LEFT, padx=5)
+        
+        self.setup_incremental_option(convert_frame)
+        
         # Botões de conversão
         btn_convert = ttk.Button(convert_frame, 
                                text="🔄 Converter Vídeo", 
@@ -453,8 +624,8 @@ class MediaToolsPro:
         download_frame = ttk.LabelFrame(left_panel, text=" Download ", padding=8)
         download_frame.pack(fill=tk.X, pady=5)
         
-        ttk.Label(download_frame, text="URL do Vídeo:").pack(anchor=tk.W)
-        self.video_url_entry = ttk.Entry(download_frame)
+        ttk.Label(download_frame, text="URLs (uma por linha):").pack(anchor=tk.W)
+        self.video_url_entry = tk.Text(download_frame, height=3, font=('Segoe UI', 9))
         self.video_url_entry.pack(fill=tk.X, pady=2)
         
         ttk.Label(download_frame, text="Site:").pack(anchor=tk.W)
@@ -484,6 +655,8 @@ class MediaToolsPro:
                                    command=lambda: self.open_download_folder('videos'))
         btn_open_folder.pack(side=tk.RIGHT, fill=tk.X, expand=True, padx=(5, 0))
         
+        self.setup_download_queue_view(download_frame, 'videos')
+        
         # ===== PAINEL DIREITO - VISUALIZAÇÃO =====
         self.setup_video_preview(right_panel)
     
@@ -492,6 +665,21 @@ class MediaToolsPro:
         preview_frame = ttk.LabelFrame(parent, text=" Informações do Vídeo ", padding=10)
         preview_frame.pack(fill=tk.BOTH, expand=True)
         
+        # Tira de quadros-chave do vídeo
+        filmstrip_container = tk.Frame(preview_frame, 
+                                     bg='#222', 
+                                     bd=1, 
+                                     relief=tk.SOLID)
+        filmstrip_container.pack(fill=tk.X, pady=5)
+        
+        self.video_filmstrip_label = tk.Label(filmstrip_container, 
+                                            bg='#222',
+                                            fg='#999',
+                                            bd=0,
+                                            height=6,
+                                            font=('Segoe UI', 9))
+        self.video_filmstrip_label.pack(fill=tk.X, padx=2, pady=2)
+        
         # Container de informações
         info_container = tk.Frame(preview_frame, 
                                 bg='white', 
@@ -587,6 +775,20 @@ class MediaToolsPro:
                     values=["64", "96", "128", "160", "192", "256", "320"], 
                     state="readonly").pack(fill=tk.X, pady=2)
         
+        # Conversões simultâneas (um processo FFmpeg por arquivo)
+        self.audio_workers_var = tk.IntVar(value=default_audio_workers())
+        workers_frame = ttk.Frame(convert_frame)
+        workers_frame.pack(fill=tk.X, pady=2)
+        
+        ttk.Label(workers_frame, text="Conversões simultâneas:").pack(side=tk.LEFT)
+        ttk.Spinbox(workers_frame, 
+                   from_=1, 
+                   to=max(8, default_workers()), 
+                   width=5,
+                   textvariable=self.audio_workers_var).pack(side=tk.LEFT, padx=5)
+        
+        self.setup_incremental_option(convert_frame)
+        
         # Botões de conversão
         btn_convert = ttk.Button(convert_frame, 
                                text="🔄 Converter Áudio", 
@@ -617,8 +819,8 @@ class MediaToolsPro:
         download_frame = ttk.LabelFrame(left_panel, text=" Download ", padding=8)
         download_frame.pack(fill=tk.X, pady=5)
         
-        ttk.Label(download_frame, text="URL do Áudio:").pack(anchor=tk.W)
-        self.audio_url_entry = ttk.Entry(download_frame)
+        ttk.Label(download_frame, text="URLs (uma por linha):").pack(anchor=tk.W)
+        self.audio_url_entry = tk.Text(download_frame, height=3, font=('Segoe UI', 9))
         self.audio_url_entry.pack(fill=tk.X, pady=2)
         
         ttk.Label(download_frame, text="Site:").pack(anchor=tk.W)
@@ -641,6 +843,8 @@ class MediaToolsPro:
                                    command=lambda: self.open_download_folder('audio'))
         btn_open_folder.pack(side=tk.RIGHT, fill=tk.X, expand=True, padx=(5, 0))
         
+        self.setup_download_queue_view(download_frame, 'audio')
+        
         # ===== PAINEL DIREITO - VISUALIZAÇÃO =====
         self.setup_audio_preview(right_panel)
     
@@ -649,6 +853,21 @@ class MediaToolsPro:
         preview_frame = ttk.LabelFrame(parent, text=" Informações do Áudio ", padding=10)
         preview_frame.pack(fill=tk.BOTH, expand=True)
         
+        # Forma de onda do áudio
+        waveform_container = tk.Frame(preview_frame, 
+                                    bg='white', 
+                                    bd=1, 
+                                    relief=tk.SOLID)
+        waveform_container.pack(fill=tk.X, pady=5)
+        
+        self.audio_waveform_label = tk.Label(waveform_container, 
+                                           bg='white',
+                                           fg='#999',
+                                           bd=0,
+                                           height=6,
+                                           font=('Segoe UI', 9))
+        self.audio_waveform_label.pack(fill=tk.X, padx=2, pady=2)
+        
         # Container de informações
         info_container = tk.Frame(preview_frame, 
                                 bg='white', 
@@ -729,6 +948,7 @@ class MediaToolsPro:
             if media_type == 'images':
                 self.lbl_image_file.config(text=f"Arquivo: {os.path.basename(filename)}")
                 self.image_name_var.set(os.path.splitext(os.path.basename(filename))[0])
+                self.image_adjustments = []
                 self.show_image_preview(filename)
             elif media_type == 'videos':
                 self.lbl_video_file.config(text=f"Arquivo: {os.path.basename(filename)}")
@@ -772,47 +992,58 @@ class MediaToolsPro:
                 self.lbl_image_file.config(text=f"Arquivo: {filename} (1/{len(self.batch_files)})")
                 self.lbl_batch_images.config(text=f"Total: {len(self.batch_files)} imagens selecionadas")
                 self.image_name_var.set(os.path.splitext(filename)[0])
+                self.image_adjustments = []
                 self.show_image_preview(self.current_file)
             elif media_type == 'videos':
                 self.lbl_video_file.config(text=f"Arquivo: {filename} (1/{len(self.batch_files)})")
                 self.lbl_batch_videos.config(text=f"Total: {len(self.batch_files)} vídeos selecionados")
                 self.video_name_var.set(os.path.splitext(filename)[0])
+                self._probe_files(self.batch_files, media_type)
                 self.show_video_info(self.current_file)
             elif media_type == 'audio':
                 self.lbl_audio_file.config(text=f"Arquivo: {filename} (1/{len(self.batch_files)})")
                 self.lbl_batch_audio.config(text=f"Total: {len(self.batch_files)} áudios selecionados")
                 self.audio_name_var.set(os.path.splitext(filename)[0])
+                self._probe_files(self.batch_files, media_type)
                 self.show_audio_info(self.current_file)
     
     def show_image_preview(self, image_path):
         """Exibe preview da imagem"""
         try:
-            self.original_image = Image.open(image_path)
-            
-            # Redimensiona para caber no preview mantendo aspect ratio
-            preview_size = (400, 400)
-            image = self.original_image.copy()
-            image.thumbnail(preview_size, Image.Resampling.LANCZOS)
-            
-            # Converte para PhotoImage
-            self.preview_image = ImageTk.PhotoImage(image)
+            # Miniatura do cache (memória/disco), gerada apenas na primeira vez
+            image, info = self.thumbnails.get(image_path)
             
-            # Atualiza o label
-            self.image_preview_label.config(image=self.preview_image, text="")
+            # Os ajustes pendentes são exibidos sobre a miniatura, sem tocar no original
+            self._render_image_preview(image)
             
             # Atualiza informações
-            width, height = self.original_image.size
             file_size = os.path.getsize(image_path) / 1024  # KB
-            info_text = f"Dimensões: {width} x {height} px\n"
+            info_text = f"Dimensões: {info['width']} x {info['height']} px\n"
             info_text += f"Tamanho: {file_size:.1f} KB\n"
-            info_text += f"Formato: {self.original_image.format}\n"
-            info_text += f"Modo: {self.original_image.mode}"
+            info_text += f"Formato: {info['format']}\n"
+            info_text += f"Modo: {info['mode']}"
             
             self.image_info_label.config(text=info_text)
             
+            self._prefetch_image_neighbors()
+            
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao carregar imagem: {str(e)}")
     
+    def _prefetch_image_neighbors(self, count=3):
+        """Pré-carrega as miniaturas dos próximos e anteriores do lote"""
+        total = len(self.batch_files)
+        if total < 2:
+            return
+        
+        paths = []
+        for offset in range(1, count + 1):
+            for index in (self.current_file_index + offset, self.current_file_index - offset):
+                path = self.batch_files[index % total]
+                if path != self.current_file and path not in paths:
+                    paths.append(path)
+        self.thumbnails.prefetch(paths)
+    
     def show_video_info(self, video_path):
         """Exibe informações do vídeo"""
         try:
@@ -824,9 +1055,10 @@ class MediaToolsPro:
             info_text += f"Formato: {file_ext}\n"
             info_text += f"Tamanho: {file_size:.2f} MB\n"
             info_text += f"Caminho: {video_path}\n\n"
-            info_text += "⚠️ Preview de vídeo não disponível nesta versão"
+            info_text += self._media_details(video_path, 'videos')
             
             self.video_info_label.config(text=info_text, fg='#333')
+            self._show_filmstrip(video_path)
             
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao carregar informações do vídeo: {str(e)}")
@@ -842,48 +1074,237 @@ class MediaToolsPro:
             info_text += f"Formato: {file_ext}\n"
             info_text += f"Tamanho: {file_size:.2f} KB\n"
             info_text += f"Caminho: {audio_path}\n\n"
-            info_text += "🔊 Preview de áudio não disponível nesta versão"
+            info_text += self._media_details(audio_path, 'audio')
             
             self.audio_info_label.config(text=info_text, fg='#333')
+            self._show_waveform(audio_path)
             
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao carregar informações do áudio: {str(e)}")
     
+    def _show_filmstrip(self, video_path):
+        """Exibe os quadros-chave do vídeo, extraindo-os em segundo plano se necessário"""
+        if video_path == self.filmstrip_path:
+            return
+        self.filmstrip_path = video_path
+        
+        # Um vídeo por vez: ao trocar de arquivo, a extração anterior é abandonada
+        if self.filmstrip_job is not None:
+            self.jobs.cancel(self.filmstrip_job)
+            self.filmstrip_job = None
+        
+        strip = self.filmstrips.lookup(video_path)
+        if strip is not None:
+            self._render_filmstrip(strip)
+            return
+        
+        self.filmstrip_image = None
+        self.video_filmstrip_label.config(image='', text="⏳ Extraindo quadros-chave...", height=6)
+        # Os retornos conferem a tarefa: a de uma seleção anterior do mesmo vídeo não vale mais
+        job = self.jobs.submit(self._filmstrip_thread, video_path,
+                               name="Quadros do vídeo",
+                               pool='filmstrip',
+                               on_done=lambda result: self._on_filmstrip_done(job, result),
+                               on_error=lambda error: self._on_filmstrip_error(job, error))
+        self.filmstrip_job = job
+    
+    def _filmstrip_thread(self, job, video_path):
+        """Tarefa que extrai os quadros-chave (usa a duração do cache de metadados)"""
+        duration = self.metadata.get(video_path)['duration']
+        return video_path, self.filmstrips.get(video_path, duration, should_stop=job.cancelled)
+    
+    def _on_filmstrip_done(self, job, result):
+        """Exibe a tira se ela ainda for do vídeo selecionado"""
+        if job is not self.filmstrip_job:
+            return
+        self.filmstrip_job = None
+        strip = result[1] if result is not None else None
+        if strip is None:
+            # Cancelado: limpa o aviso e permite extrair de novo ao selecionar o vídeo
+            self.filmstrip_path = None
+            self.video_filmstrip_label.config(image='', text='', height=6)
+            return
+        self._render_filmstrip(strip)
+    
+    def _on_filmstrip_error(self, job, error):
+        """Informa a falha na extração dos quadros"""
+        if job is self.filmstrip_job:
+            self.filmstrip_job = None
+            self.filmstrip_path = None
+            self.video_filmstrip_label.config(image='', text=f"❌ Quadros indisponíveis: {error}", height=6)
+    
+    def _render_filmstrip(self, strip):
+        """Exibe a tira reduzida à largura disponível"""
+        available = self.video_filmstrip_label.winfo_width()
+        if available > 1 and strip.width > available:
+            strip = strip.copy()
+            strip.thumbnail((available, strip.height))
+        
+        self.filmstrip_image = ImageTk.PhotoImage(strip)
+        self.video_filmstrip_label.config(image=self.filmstrip_image, text='', height=strip.height)
+    
+    def _show_waveform(self, audio_path):
+        """Exibe a forma de onda do áudio, calculando os picos em segundo plano se necessário"""
+        if audio_path == self.waveform_path:
+            return
+        self.waveform_path = audio_path
+        
+        # Um áudio por vez: ao trocar de arquivo, a análise anterior é abandonada
+        if self.waveform_job is not None:
+            self.jobs.cancel(self.waveform_job)
+            self.waveform_job = None
+        
+        peaks = self.waveforms.lookup(audio_path)
+        if peaks is not None:
+            self._render_waveform(peaks)
+            return
+        
+        self.waveform_image = None
+        self.audio_waveform_label.config(image='', text="⏳ Calculando forma de onda...", height=6)
+        # Os retornos conferem a tarefa: a de uma seleção anterior do mesmo áudio não vale mais
+        job = self.jobs.submit(self._waveform_thread, audio_path,
+                               name="Forma de onda",
+                               pool='waveform',
+                               on_done=lambda result: self._on_waveform_done(job, result),
+                               on_error=lambda error: self._on_waveform_error(job, error))
+        self.waveform_job = job
+    
+    def _waveform_thread(self, job, audio_path):
+        """Tarefa que calcula os picos (usa a duração do cache de metadados)"""
+        duration = self.metadata.get(audio_path)['duration']
+        return audio_path, self.waveforms.get(audio_path, duration, should_stop=job.cancelled)
+    
+    def _on_waveform_done(self, job, result):
+        """Exibe a forma de onda se ela ainda for do áudio selecionado"""
+        if job is not self.waveform_job:
+            return
+        self.waveform_job = None
+        peaks = result[1] if result is not None else None
+        if peaks is None:
+            # Cancelado: limpa o aviso e permite calcular de novo ao selecionar o áudio
+            self.waveform_path = None
+            self.audio_waveform_label.config(image='', text='', height=6)
+            return
+        self._render_waveform(peaks)
+    
+    def _on_waveform_error(self, job, error):
+        """Informa a falha no cálculo da forma de onda"""
+        if job is self.waveform_job:
+            self.waveform_job = None
+            self.waveform_path = None
+            self.audio_waveform_label.config(image='', text=f"❌ Forma de onda indisponível: {error}", height=6)
+    
+    def _render_waveform(self, peaks):
+        """Desenha a forma de onda na largura disponível"""
+        width = self.audio_waveform_label.winfo_width()
+        if width <= 1:
+            width = 700
+        
+        self.waveform_image = ImageTk.PhotoImage(render_waveform(peaks, width, 90))
+        self.audio_waveform_label.config(image=self.waveform_image, text='', height=90)
+    
+    def _media_details(self, file_path, media_type):
+        """Texto com os metadados do cache, ou agenda a análise do arquivo"""
+        if file_path in self.probe_errors:
+            return f"❌ Não foi possível analisar o arquivo: {self.probe_errors[file_path]}"
+        
+        info = self.metadata.lookup(file_path)
+        if info is None:
+            self._probe_files([file_path], media_type)
+            return "⏳ Analisando arquivo..."
+        return "\n".join(summarize(info))
+    
+    def _probe_files(self, files, media_type):
+        """Analisa em segundo plano os arquivos que ainda não estão sendo analisados"""
+        files = [path for path in files if path not in self.probing]
+        if not files:
+            return
+        
+        self.probing.update(files)
+        self.jobs.submit(self._probe_thread, files, media_type,
+                         name="Análise de mídia",
+                         pool='probe',
+                         on_done=lambda result: self.probing.difference_update(files),
+                         on_error=lambda error: self.probing.difference_update(files))
+    
+    def _probe_thread(self, job, files, media_type):
+        """Tarefa que analisa os arquivos, publicando cada resultado ao chegar"""
+        total_duration = 0.0
+        for done, (path, info, error) in enumerate(self.metadata.iter_probe(files, should_stop=job.cancelled), 1):
+            if not error:
+                total_duration += info['duration'] or 0.0
+            job.report(done, len(files), os.path.basename(path),
+                       probed=path, media_type=media_type, total_duration=total_duration, error=error)
+    
+    def _on_media_probed(self, event):
+        """Atualiza a interface com o resultado de uma análise"""
+        media_type = event['media_type']
+        if event['error']:
+            self.probe_errors[event['probed']] = event['error']
+        
+        if event['probed'] == self.current_file:
+            if media_type == 'videos':
+                self.show_video_info(self.current_file)
+            else:
+                self.show_audio_info(self.current_file)
+        
+        if event['total'] > 1:
+            label = self.lbl_batch_videos if media_type == 'videos' else self.lbl_batch_audio
+            noun = "vídeos selecionados" if media_type == 'videos' else "áudios selecionados"
+            duration = time.strftime('%H:%M:%S', time.gmtime(event['total_duration']))
+            label.config(text=f"Total: {event['total']} {noun} • duração: {duration} "
+                              f"({event['done']}/{event['total']} analisados)")
+    
+    def _render_image_preview(self, thumbnail):
+        """Exibe a miniatura com os ajustes pendentes aplicados"""
+        image = apply_adjustments(thumbnail, self.image_adjustments)
+        
+        # Converte para PhotoImage
+        self.preview_image = ImageTk.PhotoImage(image)
+        
+        # Atualiza o label
+        self.image_preview_label.config(image=self.preview_image, text="")
+        self.lbl_adjustments.config(text=f"Ajustes: {describe(self.image_adjustments)}")
+    
     def adjust_image(self, adjustment):
-        """Aplica ajustes na imagem"""
-        if not self.current_file or not self.original_image:
+        """Registra um ajuste e atualiza o preview
+
+        O ajuste só é aplicado à imagem em resolução total na conversão,
+        junto com os demais e de uma só vez.
+        """
+        if not self.current_file:
             messagebox.showwarning("Aviso", "Selecione uma imagem primeiro")
             return
         
         try:
-            image = self.original_image.copy()
-            
-            if adjustment == 'rotate':
-                image = image.rotate(90, expand=True)
-            elif adjustment == 'mirror':
-                image = ImageOps.mirror(image)
-            elif adjustment == 'brightness':
-                enhancer = ImageEnhance.Brightness(image)
-                image = enhancer.enhance(1.2)
-            elif adjustment == 'darkness':
-                enhancer = ImageEnhance.Brightness(image)
-                image = enhancer.enhance(0.8)
-            
-            # Atualiza a imagem original
-            self.original_image = image
-            
-            # Atualiza o preview
-            preview_size = (400, 400)
-            preview_image = image.copy()
-            preview_image.thumbnail(preview_size, Image.Resampling.LANCZOS)
-            self.preview_image = ImageTk.PhotoImage(preview_image)
-            self.image_preview_label.config(image=self.preview_image)
-            
-            messagebox.showinfo("Sucesso", f"Ajuste '{adjustment}' aplicado com sucesso!")
+            self.image_adjustments.append(adjustment)
+            thumbnail, _ = self.thumbnails.get(self.current_file)
+            self._render_image_preview(thumbnail)
             
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao aplicar ajuste: {str(e)}")
     
+    def adjust_image_batch(self):
+        """Aplica os ajustes pendentes a todas as imagens do lote"""
+        if not self.batch_files:
+            messagebox.showwarning("Aviso", "Selecione múltiplas imagens primeiro")
+            return
+        
+        if not self.image_adjustments:
+            messagebox.showwarning("Aviso", "Escolha ao menos um ajuste primeiro")
+            return
+        
+        # Mesmo fluxo da conversão em lote, mantendo o formato de cada arquivo
+        self._convert_batch_files('images', keep_format=True)
+    
+    def reset_adjustments(self):
+        """Descarta os ajustes pendentes"""
+        self.image_adjustments = []
+        if self.current_file:
+            self.show_image_preview(self.current_file)
+        else:
+            self.lbl_adjustments.config(text="Ajustes: nenhum")
+    
     def convert_image(self):
         """Converte uma imagem individual"""
         if not self.current_file:
@@ -906,7 +1327,7 @@ class MediaToolsPro:
             messagebox.showwarning("Aviso", "Selecione um vídeo primeiro")
             return
         
-        messagebox.showinfo("Info", "Conversão de vídeo será implementada em versão futura")
+        self._convert_single_file(self.current_file, 'videos')
     
     def convert_video_batch(self):
         """Converte múltiplos vídeos"""
@@ -914,7 +1335,7 @@ class MediaToolsPro:
             messagebox.showwarning("Aviso", "Selecione múltiplos vídeos primeiro")
             return
         
-        messagebox.showinfo("Info", "Conversão em lote de vídeos será implementada em versão futura")
+        self._convert_batch_files('videos')
     
     def convert_audio(self):
         """Converte um áudio individual"""
@@ -922,7 +1343,7 @@ class MediaToolsPro:
             messagebox.showwarning("Aviso", "Selecione um áudio primeiro")
             return
         
-        messagebox.showinfo("Info", "Conversão de áudio será implementada em versão futura")
+        self._convert_single_file(self.current_file, 'audio')
     
     def convert_audio_batch(self):
         """Converte múltiplos áudios"""
@@ -930,7 +1351,48 @@ class MediaToolsPro:
             messagebox.showwarning("Aviso", "Selecione múltiplos áudios primeiro")
             return
         
-        messagebox.showinfo("Info", "Conversão em lote de áudio será implementada em versão futura")
+        self._convert_batch_files('audio')
+    
+    def _image_preset(self):
+        """Chave do preset de codificação escolhido (fast, balanced, smallest)"""
+        label = self.image_preset_var.get()
+        return next((key for key, value in PRESET_LABELS.items() if value == label), DEFAULT_PRESET)
+    
+    def compare_image_presets(self):
+        """Mede cada preset numa amostra do lote (ou na imagem atual) e mostra tempo x tamanho"""
+        files = list(self.batch_files) or ([self.current_file] if self.current_file else [])
+        files = [path for path in files if os.path.splitext(path)[1].lower() in INPUT_EXTENSIONS['images']]
+        if not files:
+            messagebox.showwarning("Aviso", "Selecione uma imagem ou um lote primeiro")
+            return
+        
+        self.jobs.submit(self._compare_presets_thread, files, self.image_format_var.get(),
+                         self.image_quality_var.get(), list(self.image_adjustments),
+                         name="Comparação de presets",
+                         on_done=self._on_presets_compared,
+                         on_error=lambda error: messagebox.showerror("Erro", f"Erro ao comparar presets: {error}"))
+    
+    def _compare_presets_thread(self, job, files, format_name, quality, adjustments):
+        """Tarefa que codifica a amostra com cada preset"""
+        job.report(status="Codificando a amostra com cada preset")
+        results = compare_presets(files, format_name, quality, adjustments=adjustments, should_stop=job.cancelled)
+        return {'format': format_name, 'results': results}
+    
+    def _on_presets_compared(self, result):
+        """Exibe o tempo de codificação e o tamanho obtidos por preset"""
+        if not result:
+            return
+        
+        lines = []
+        for preset, measured in result['results'].items():
+            if not measured['items']:
+                lines.append(f"{PRESET_LABELS[preset]}: falhou")
+                continue
+            ratio = f" ({measured['ratio'] * 100:.0f}%)" if measured['ratio'] else ""
+            lines.append(f"{PRESET_LABELS[preset]}: {measured['latency']['mean_ms']:.0f} ms/imagem, "
+                         f"{measured['bytes'] / 1024:.0f} KB{ratio}")
+        sample = next(iter(result['results'].values()))['items'] if result['results'] else 0
+        messagebox.showinfo("Presets", f"{result['format']}, amostra de {sample} imagens:\n\n" + "\n".join(lines))
     
     def _convert_single_file(self, file_path, media_type):
         """Converte um arquivo individual"""
@@ -940,58 +1402,313 @@ class MediaToolsPro:
                 extension = self.supported_formats['images'][format_name]
                 quality = self.image_quality_var.get()
                 
-                # Abre a imagem
-                image = Image.open(file_path)
-                
                 # Define o nome do arquivo de saída
                 output_dir = self.download_folders['images']
-                base_name = os.path.splitext(os.path.basename(file_path))[0]
-                output_path = os.path.join(output_dir, f"{base_name}_converted{extension}")
-                
-                # Salva no novo formato
-                if format_name in ['JPEG', 'WEBP']:
-                    image.save(output_path, format=format_name, quality=quality, optimize=True)
-                else:
-                    image.save(output_path, format=format_name, optimize=True)
+                output_path = build_output_path(file_path, output_dir, extension)
                 
-                messagebox.showinfo("Sucesso", f"Imagem convertida com sucesso!\nSalva em: {output_path}")
+                # Salva no novo formato em segundo plano
+                self.jobs.submit(
+                    self._convert_single_job, file_path, output_path, format_name, quality,
+                    list(self.image_adjustments), self._image_preset(),
+                    name="Conversão",
+                    on_done=self._on_convert_single_done,
+                    on_error=lambda error: messagebox.showerror("Erro", f"Erro ao converter arquivo: {error}"))
+            
+            elif media_type in ('videos', 'audio'):
+                self._convert_media_files([file_path], media_type)
                 
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao converter arquivo: {str(e)}")
     
-    def _convert_batch_files(self, media_type):
-        """Converte múltiplos arquivos em lote"""
+    def _convert_single_job(self, job, file_path, output_path, format_name, quality, adjustments, preset):
+        """Tarefa de conversão de um único arquivo"""
+        job.report(0, 1, f"Convertendo {os.path.basename(file_path)}")
+        convert_image_file(file_path, output_path, format_name, quality, adjustments, preset=preset)
+        job.report(1, 1, f"Convertido {os.path.basename(file_path)}")
+        return output_path
+    
+    def _on_convert_single_done(self, output_path):
+        """Informa o término da conversão individual"""
+        if output_path:
+            messagebox.showinfo("Sucesso", f"Imagem convertida com sucesso!\nSalva em: {output_path}")
+    
+    def _convert_batch_files(self, media_type, keep_format=False):
+        """Converte múltiplos arquivos em lote (ou só aplica os ajustes, com keep_format)"""
+        if self.converting:
+            messagebox.showwarning("Aviso", "Já existe uma conversão em andamento")
+            return
+        
         try:
             if media_type == 'images':
                 format_name = self.image_format_var.get()
                 extension = self.supported_formats['images'][format_name]
                 quality = self.image_quality_var.get()
                 output_dir = self.download_folders['images']
+                name = "Conversão em lote"
                 
-                converted_count = 0
+                if keep_format:
+                    format_name = None
+                    extension = None
+                    name = "Ajustes em lote"
                 
-                for file_path in self.batch_files:
-                    try:
-                        image = Image.open(file_path)
-                        base_name = os.path.splitext(os.path.basename(file_path))[0]
-                        output_path = os.path.join(output_dir, f"{base_name}_converted{extension}")
-                        
-                        if format_name in ['JPEG', 'WEBP']:
-                            image.save(output_path, format=format_name, quality=quality, optimize=True)
-                        else:
-                            image.save(output_path, format=format_name, optimize=True)
-                        
-                        converted_count += 1
-                        
-                    except Exception as e:
-                        print(f"Erro ao converter {file_path}: {str(e)}")
-                        continue
+                try:
+                    workers = int(self.image_workers_var.get())
+                except (tk.TclError, ValueError):
+                    workers = default_workers()
+                try:
+                    memory_budget = int(self.image_memory_var.get()) * 1024 * 1024
+                except (tk.TclError, ValueError):
+                    memory_budget = None
                 
-                messagebox.showinfo("Sucesso", f"{converted_count} de {len(self.batch_files)} imagens convertidas!\nSalvas em: {output_dir}")
+                # Com captura de perfil, converte na própria tarefa para o cProfile enxergar o trabalho
+                if self.profile_next_batch.get():
+                    workers = 0
+                
+                self.converting = True
+                
+                # A conversão roda em processos separados; a tarefa só repassa os resultados
+                self.jobs.submit(
+                    self._profiled(self._convert_batch_thread, 'imagens'), list(self.batch_files), output_dir,
+                    format_name, extension, quality, workers, list(self.image_adjustments),
+                    self.incremental_var.get(), memory_budget, self._image_preset(),
+                    name=name,
+                    on_done=self._on_convert_batch_done,
+                    on_error=self._on_convert_batch_error)
+            
+            elif media_type in ('videos', 'audio'):
+                self._convert_media_files(list(self.batch_files), media_type, self.incremental_var.get())
                 
         except Exception as e:
+            self.converting = False
             messagebox.showerror("Erro", f"Erro no processamento em lote: {str(e)}")
     
+    def _convert_batch_thread(self, job, files, output_dir, format_name, extension, quality, workers,
+                              adjustments, incremental=False, memory_budget=None, preset=DEFAULT_PRESET):
+        """Tarefa que acompanha a conversão em lote de imagens"""
+        converted_count = 0
+        failed_count = 0
+        duplicate_count = 0
+        files_per_sec = 0.0
+        total = len(files)
+        
+        # No modo incremental, só entram os arquivos novos ou alterados desde a última execução
+        settings = settings_key(type='images', format=format_name, quality=quality, adjustments=adjustments,
+                                preset=preset)
+        manifest = ConversionManifest(output_dir) if incremental else None
+        skipped = []
+        if manifest:
+            job.report(0, total, "Verificando arquivos já convertidos")
+            files, skipped = manifest.split(files, output_dir, extension, settings)
+        
+        job.report(0, len(files), f"Iniciando ({len(files)} arquivos)")
+        # Arquivos de conteúdo idêntico são convertidos uma vez e a saída é ligada aos demais
+        convert = lambda batch: iter_convert_batch(batch, output_dir, format_name, extension, quality, workers,
+                                                   should_stop=job.cancelled, adjustments=adjustments,
+                                                   memory_budget=memory_budget, preset=preset)
+        for result in iter_deduplicated(files, output_dir, extension, convert):
+            if result['error']:
+                failed_count += 1
+                print(f"Erro ao converter {result['file']}: {result['error']}")
+            else:
+                converted_count += 1
+                duplicate_count += 'duplicate_of' in result
+                if manifest:
+                    manifest.record(result['file'], settings, result['output'])
+            
+            files_per_sec = result['files_per_sec']
+            job.report(result['done'], result['total'],
+                       f"{os.path.basename(result['file'])} ({files_per_sec:.1f} arquivos/s)",
+                       error=result['error'])
+        
+        return {
+            'converted': converted_count,
+            'skipped': len(skipped),
+            'duplicates': duplicate_count,
+            'failed': failed_count,
+            'total': total,
+            'files_per_sec': files_per_sec,
+            'output_dir': output_dir,
+            'action': "convertidas" if format_name else "ajustadas",
+        }
+    
+    def _on_convert_batch_done(self, result):
+        """Exibe o resumo da conversão em lote"""
+        self.converting = False
+        if result is None:
+            return
+        
+        self.lbl_batch_images.config(text=f"Total: {result['total']} imagens selecionadas")
+        message = (f"{result['converted']} de {result['total']} imagens {result['action']}!\n"
+                   f"Já em dia (puladas): {result['skipped']} • Idênticas (vinculadas): {result['duplicates']} • "
+                   f"Falhas: {result['failed']}\n"
+                   f"Velocidade: {result['files_per_sec']:.1f} imagens/s\n"
+                   f"Salvas em: {result['output_dir']}")
+        if result.get('profile_dir'):
+            message += f"\nPerfil salvo em: {result['profile_dir']}"
+        messagebox.showinfo("Sucesso", message)
+    
+    def _convert_media_files(self, files, media_type, incremental=False):
+        """Agenda a conversão de vídeos ou áudios com FFmpeg, vários em paralelo"""
+        if self.converting:
+            messagebox.showwarning("Aviso", "Já existe uma conversão em andamento")
+            return
+        
+        output_dir = self.download_folders[media_type]
+        
+        if media_type == 'videos':
+            format_name = self.video_format_var.get()
+            workers_var, default_count = self.video_workers_var, default_video_workers
+        else:
+            format_name = self.audio_format_var.get()
+            workers_var, default_count = self.audio_workers_var, default_audio_workers
+        extension = self.supported_formats[media_type][format_name]
+        
+        try:
+            workers = int(workers_var.get())
+        except (tk.TclError, ValueError):
+            workers = default_count()
+        
+        self.converting = True
+        if media_type == 'videos':
+            self.jobs.submit(self._profiled(self._convert_video_thread, 'videos'), files, output_dir, format_name,
+                             extension, workers, incremental,
+                             name="Conversão de vídeo",
+                             on_done=self._on_convert_media_done,
+                             on_error=self._on_convert_batch_error)
+        else:
+            bitrate = int(self.audio_quality_var.get())
+            self.jobs.submit(self._profiled(self._convert_audio_thread, 'audio'), files, output_dir, format_name,
+                             extension, bitrate, workers, incremental,
+                             name="Conversão de áudio",
+                             on_done=self._on_convert_media_done,
+                             on_error=self._on_convert_batch_error)
+    
+    def _convert_video_thread(self, job, files, output_dir, format_name, extension, workers, incremental=False):
+        """Tarefa que acompanha as conversões de vídeo"""
+        converted_count = 0
+        remuxed_count = 0
+        failed_count = 0
+        duplicate_count = 0
+        total = len(files)
+        
+        settings = settings_key(type='videos', format=format_name)
+        manifest = ConversionManifest(output_dir) if incremental else None
+        skipped = []
+        if manifest:
+            files, skipped = manifest.split(files, output_dir, extension, settings)
+        
+        def progress(file_path, percent, speed):
+            status = os.path.basename(file_path)
+            if percent is not None:
+                status += f": {percent:.0f}%"
+            if speed:
+                status += f" ({speed:.1f}x)"
+            job.report(status=status)
+        
+        job.report(0, len(files), f"Iniciando ({len(files)} arquivos)")
+        convert = lambda batch: iter_convert_videos(batch, output_dir, format_name, extension, workers,
+                                                    on_progress=progress, should_stop=job.cancelled)
+        for result in iter_deduplicated(files, output_dir, extension, convert):
+            if result['error']:
+                failed_count += 1
+                print(f"Erro ao converter {result['file']}: {result['error']}")
+            else:
+                converted_count += 1
+                duplicate_count += 'duplicate_of' in result
+                remuxed_count += result['remux']
+                if manifest:
+                    manifest.record(result['file'], settings, result['output'])
+            
+            job.report(result['done'], result['total'], f"{os.path.basename(result['file'])}: concluído",
+                       error=result['error'])
+        
+        return {
+            'converted': converted_count,
+            'remuxed': remuxed_count,
+            'skipped': len(skipped),
+            'duplicates': duplicate_count,
+            'failed': failed_count,
+            'total': total,
+            'output_dir': output_dir,
+        }
+    
+    def _convert_audio_thread(self, job, files, output_dir, format_name, extension, bitrate, workers,
+                              incremental=False):
+        """Tarefa que acompanha as conversões de áudio"""
+        converted_count = 0
+        copied_count = 0
+        failed_count = 0
+        duplicate_count = 0
+        realtime = None
+        total = len(files)
+        
+        settings = settings_key(type='audio', format=format_name, bitrate=bitrate)
+        manifest = ConversionManifest(output_dir) if incremental else None
+        skipped = []
+        if manifest:
+            files, skipped = manifest.split(files, output_dir, extension, settings)
+        
+        def progress(file_path, percent, speed):
+            status = os.path.basename(file_path)
+            if percent is not None:
+                status += f": {percent:.0f}%"
+            if speed:
+                status += f" ({speed:.0f}x)"
+            job.report(status=status)
+        
+        job.report(0, len(files), f"Iniciando ({len(files)} arquivos)")
+        convert = lambda batch: iter_convert_audio(batch, output_dir, format_name, extension, bitrate, workers,
+                                                   on_progress=progress, should_stop=job.cancelled)
+        for result in iter_deduplicated(files, output_dir, extension, convert):
+            if result['error']:
+                failed_count += 1
+                print(f"Erro ao converter {result['file']}: {result['error']}")
+            else:
+                converted_count += 1
+                duplicate_count += 'duplicate_of' in result
+                copied_count += result['copied']
+                if manifest:
+                    manifest.record(result['file'], settings, result['output'])
+            realtime = result['total_realtime']
+            
+            status = f"{os.path.basename(result['file'])}: concluído"
+            if result['realtime']:
+                status += f" ({result['realtime']:.0f}x tempo real)"
+            job.report(result['done'], result['total'], status, error=result['error'])
+        
+        return {
+            'converted': converted_count,
+            'remuxed': copied_count,
+            'skipped': len(skipped),
+            'duplicates': duplicate_count,
+            'failed': failed_count,
+            'total': total,
+            'output_dir': output_dir,
+            'realtime': realtime,
+        }
+    
+    def _on_convert_media_done(self, result):
+        """Exibe o resumo das conversões com FFmpeg"""
+        self.converting = False
+        if result is None:
+            return
+        
+        message = (f"{result['converted']} de {result['total']} arquivos convertidos!\n"
+                   f"Já em dia (pulados): {result['skipped']} • Idênticos (vinculados): {result['duplicates']} • "
+                   f"Falhas: {result['failed']}\n"
+                   f"Sem recodificar (cópia direta): {result['remuxed']}\n")
+        if result.get('realtime'):
+            message += f"Velocidade: {result['realtime']:.0f}x o tempo real\n"
+        message += f"Salvos em: {result['output_dir']}"
+        if result.get('profile_dir'):
+            message += f"\nPerfil salvo em: {result['profile_dir']}"
+        messagebox.showinfo("Sucesso", message)
+    
+    def _on_convert_batch_error(self, error):
+        """Informa falha na conversão em lote"""
+        self.converting = False
+        messagebox.showerror("Erro", f"Erro no processamento em lote: {error}")
+    
     def rename_image(self):
         """Renomeia a imagem atual"""
         self._rename_file('images')
@@ -1023,16 +1740,12 @@ class MediaToolsPro:
             return
         
         try:
-            directory = os.path.dirname(self.current_file)
-            extension = os.path.splitext(self.current_file)[1]
-            new_path = os.path.join(directory, new_name + extension)
-            
-            # Verifica se o arquivo de destino já existe
-            if os.path.exists(new_path):
-                messagebox.showerror("Erro", "Já existe um arquivo com este nome")
+            try:
+                new_path = rename_file(self.current_file, new_name)
+            except FileExistsError as e:
+                messagebox.showerror("Erro", str(e))
                 return
             
-            os.rename(self.current_file, new_path)
             self.current_file = new_path
             self.batch_files[self.current_file_index] = new_path
             
@@ -1064,91 +1777,342 @@ class MediaToolsPro:
         """Faz download de um áudio da URL"""
         self._download_media('audio')
     
-    def _download_media(self, media_type):
-        """Faz download de mídia da URL"""
-        url = ""
+    def _download_urls(self, media_type):
+        """URLs digitadas na aba (uma por linha)"""
+        text = ""
         if media_type == 'images':
-            url = self.image_url_entry.get().strip()
+            text = self.image_url_entry.get('1.0', tk.END)
         elif media_type == 'videos':
-            url = self.video_url_entry.get().strip()
+            text = self.video_url_entry.get('1.0', tk.END)
         elif media_type == 'audio':
-            url = self.audio_url_entry.get().strip()
-        
-        if not url:
+            text = self.audio_url_entry.get('1.0', tk.END)
+        return [line.strip() for line in text.splitlines() if line.strip()]
+    
+    def _download_media(self, media_type):
+        """Enfileira o download das URLs informadas (uma por linha)"""
+        urls = self._download_urls(media_type)
+        if not urls:
             messagebox.showwarning("Aviso", "Digite uma URL válida")
             return
         
-        if self.downloading:
-            messagebox.showwarning("Aviso", "Já existe um download em andamento")
+        self._set_download_workers(media_type)
+        
+        # Uma nova leva limpa a lista se a anterior já terminou
+        if not self._downloads_pending(media_type):
+            self.download_queue.clear_finished(media_type)
+            tree = self.download_views[media_type]['tree']
+            tree.delete(*tree.get_children())
+        
+        options = {}
+        if media_type == 'videos':
+            options['quality'] = self.video_quality_var.get()
+            options['video_format'] = self.video_format_var.get()
+        elif media_type == 'audio':
+            # Mesmo formato e qualidade escolhidos para a conversão de áudios
+            options['audio_format'] = self.audio_format_var.get()
+            options['bitrate'] = int(self.audio_quality_var.get())
+        
+        if self.download_views[media_type]['bulk'].get():
+            self.job_status_label.config(text="Listando itens da playlist/canal...")
+            self.download_queue.expand(urls, media_type, 
+                                       on_expanded=lambda *result: self._on_download_expanded(media_type, *result), 
+                                       on_update=self._on_download_item_finished, 
+                                       **options)
+            return
+        
+        items = self.download_queue.add(urls, media_type, on_update=self._on_download_item_finished, **options)
+        for item in items:
+            self._update_download_row(item)
+    
+    def _on_download_expanded(self, media_type, url, items, skipped, error):
+        """Mostra na lista os itens encontrados em uma playlist/canal"""
+        if error is not None:
+            print(f"Erro ao listar {url}: {str(error)}")
+            messagebox.showerror("Erro", f"Erro ao listar a playlist/canal: {str(error)}")
             return
         
-        self.downloading = True
+        for item in items:
+            self._update_download_row(item)
+        self.job_status_label.config(text=f"{len(items)} itens enfileirados de {url}"
+                                          + (f" ({skipped} já baixados)" if skipped else ""))
+        
+        if not items and not self._downloads_pending(media_type):
+            messagebox.showinfo("Downloads", "Nenhum item novo para baixar"
+                                             + (f" ({skipped} já baixados)" if skipped else ""))
+    
+    def _downloads_pending(self, media_type):
+        """Indica se ainda há downloads ou listagens de playlist em andamento"""
+        counts = self.download_queue.counts(media_type)
+        return bool(counts[QUEUED] or counts[RUNNING] or self.download_queue.expanding(media_type))
+    
+    def probe_download_formats(self, media_type):
+        """Lista os formatos disponíveis na primeira URL, sem baixar"""
+        urls = self._download_urls(media_type)
+        if not urls:
+            messagebox.showwarning("Aviso", "Digite uma URL válida")
+            return
         
-        # Inicia o download em uma thread separada
-        thread = threading.Thread(target=self._download_thread, args=(url, media_type))
-        thread.daemon = True
-        thread.start()
+        self.jobs.submit(self._probe_formats_thread, urls[0],
+                         name="Consulta de formatos",
+                         on_done=self._on_formats_probed,
+                         on_error=lambda error: messagebox.showerror("Erro", f"Erro ao consultar formatos: {error}"))
+    
+    def _probe_formats_thread(self, job, url):
+        """Tarefa que extrai as informações da URL (ou as lê do cache)"""
+        job.report(0, 1, url)
+        return probe_formats(url)
     
-    def _download_thread(self, url, media_type):
-        """Thread para download de mídia"""
+    def _on_formats_probed(self, result):
+        """Mostra os formatos disponíveis em uma janela"""
+        if not result:
+            return
+        
+        window = tk.Toplevel(self.root)
+        window.title(f"Formatos - {result['title']}")
+        window.geometry("760x360")
+        
+        columns = ('ext', 'resolution', 'fps', 'vcodec', 'acodec', 'bitrate', 'size', 'note')
+        headings = ("Ext.", "Resolução", "FPS", "Vídeo", "Áudio", "kbps", "Tamanho", "Obs.")
+        tree = ttk.Treeview(window, columns=columns, height=14)
+        tree.heading('#0', text="ID")
+        tree.column('#0', width=70)
+        for column, heading in zip(columns, headings):
+            tree.heading(column, text=heading)
+            tree.column(column, width=80, anchor=tk.CENTER)
+        tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        for f in result['formats']:
+            size = f"{f['filesize'] / 1024 / 1024:.1f} MB" if f['filesize'] else "-"
+            tree.insert('', tk.END, text=f['format_id'], values=(
+                f['ext'], f['resolution'], f['fps'] or "-", f['vcodec'] or "-", f['acodec'] or "-",
+                f"{f['bitrate']:.0f}" if f['bitrate'] else "-", size, f['note'] or ""))
+    
+    def _set_download_workers(self, media_type):
+        """Aplica o número de downloads simultâneos escolhido na aba"""
         try:
-            output_dir = self.download_folders[media_type]
-            
-            if media_type == 'images':
-                # Para imagens, usa uma abordagem simples
-                import requests
-                from urllib.parse import urlparse
-                
-                response = requests.get(url, stream=True)
-                response.raise_for_status()
-                
-                # Extrai o nome do arquivo da URL
-                parsed_url = urlparse(url)
-                filename = os.path.basename(parsed_url.path)
-                if not filename:
-                    filename = f"image_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jpg"
-                
-                output_path = os.path.join(output_dir, filename)
-                
-                with open(output_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
-                
-                self.root.after(0, lambda: messagebox.showinfo("Sucesso", f"Imagem baixada com sucesso!\nSalva em: {output_path}"))
-                
+            count = int(self.download_views[media_type]['workers'].get())
+        except (tk.TclError, ValueError):
+            return
+        self.download_queue.set_workers(media_type, count)
+    
+    def _download_thread(self, url, media_type, output_dir, **options):
+        """Baixa uma URL (executado pelos workers da fila de downloads)"""
+        return download_media(url, media_type, output_dir, **options)
+    
+    def _update_download_row(self, item):
+        """Atualiza a linha do item na lista de downloads"""
+        tree = self.download_views[item.media_type]['tree']
+        row_id = f"item{item.id}"
+        progress = describe_transfer(item.transfer) if item.state == RUNNING else ""
+        values = (item.title or item.url, STATE_LABELS[item.state], progress, item.attempts)
+        if tree.exists(row_id):
+            tree.item(row_id, values=values)
+        else:
+            tree.insert('', tk.END, iid=row_id, values=values)
+    
+    def _on_download_item_finished(self, item):
+        """Atualiza a lista e, quando a leva termina, exibe o resumo"""
+        self._update_download_row(item)
+        if item.state == FAILED:
+            print(f"Erro ao baixar {item.url}: {item.error}")
+        
+        if self._downloads_pending(item.media_type):
+            return
+        counts = self.download_queue.counts(item.media_type)
+        
+        items = self.download_queue.items(item.media_type)
+        if len(items) == 1 and item.state == DONE:
+            if item.media_type == 'images':
+                messagebox.showinfo("Sucesso", f"Imagem baixada com sucesso!\nSalva em: {item.output}")
             else:
-                # Para vídeos e áudio, usa yt-dlp
-                ydl_opts = {
-                    'outtmpl': os.path.join(output_dir, '%(title)s.%(ext)s'),
-                    'quiet': True,
-                }
-                
-                if media_type == 'audio':
-                    ydl_opts.update({
-                        'format': 'bestaudio/best',
-                        'postprocessors': [{
-                            'key': 'FFmpegExtractAudio',
-                            'preferredcodec': 'mp3',
-                            'preferredquality': '192',
-                        }],
-                    })
-                elif media_type == 'videos':
-                    quality = self.video_quality_var.get()
-                    if quality == "Melhor disponível":
-                        ydl_opts['format'] = 'best'
-                    else:
-                        ydl_opts['format'] = f'best[height<={quality[:-1]}]'
-                
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    ydl.download([url])
-                
-                self.root.after(0, lambda: messagebox.showinfo("Sucesso", f"Download concluído!\nSalvo em: {output_dir}"))
+                messagebox.showinfo("Sucesso", f"Download concluído!\nSalvo em: {item.output}")
+        elif len(items) == 1:
+            messagebox.showerror("Erro", f"Erro no download: {item.error}")
+        else:
+            messagebox.showinfo("Downloads", f"{counts[DONE]} de {len(items)} downloads concluídos "
+                                             f"({counts[FAILED]} com falha)\n"
+                                             f"Salvos em: {self.download_folders[item.media_type]}")
+    
+    def scan_duplicates(self, media_type):
+        """Procura arquivos idênticos na pasta de downloads (hashes calculados em paralelo)"""
+        folder_path = self.download_folders[media_type]
+        if not os.path.exists(folder_path):
+            messagebox.showerror("Erro", f"Pasta {folder_path} não encontrada")
+            return
         
-        except Exception as e:
-            self.root.after(0, lambda: messagebox.showerror("Erro", f"Erro no download: {str(e)}"))
+        self.jobs.submit(self._scan_duplicates_thread, folder_path,
+                         name="Busca de duplicatas",
+                         on_done=self._on_duplicates_found,
+                         on_error=lambda error: messagebox.showerror("Erro", f"Erro ao buscar duplicatas: {error}"))
+    
+    def _scan_duplicates_thread(self, job, folder_path):
+        """Tarefa que agrupa os arquivos idênticos da pasta"""
+        job.report(status="Listando arquivos")
+        files = list(iter_folder_files([folder_path]))
+        groups = find_duplicates(files, should_stop=job.cancelled,
+                                 on_progress=lambda done, total: job.report(done, total, "Calculando hashes"))
+        if job.cancelled():
+            return None
+        return {'folder': folder_path, 'files': len(files), 'groups': groups}
+    
+    def _on_duplicates_found(self, result):
+        """Mostra o que foi encontrado e, se confirmado, troca as cópias por links"""
+        if result is None:
+            return
+        
+        groups = result['groups']
+        copies = sum(len(group) - 1 for group in groups)
+        if not copies:
+            messagebox.showinfo("Duplicatas", f"Nenhuma duplicata entre {result['files']} arquivos")
+            return
+        
+        size = sum(os.path.getsize(group[0]) * (len(group) - 1) for group in groups)
+        if not messagebox.askyesno("Duplicatas",
+                                   f"{copies} cópias idênticas em {len(groups)} grupos "
+                                   f"({size / 1024 / 1024:.1f} MB).\n"
+                                   f"Substituir as cópias por links para o arquivo original?"):
+            return
+        
+        self.jobs.submit(lambda job: link_duplicates(groups),
+                         name="Vínculo de duplicatas",
+                         on_done=self._on_duplicates_linked,
+                         on_error=lambda error: messagebox.showerror("Erro", f"Erro ao vincular duplicatas: {error}"))
+    
+    def _on_duplicates_linked(self, summary):
+        """Resumo dos vínculos criados"""
+        if summary is None:
+            # Cancelado antes de começar
+            return
         
-        finally:
-            self.downloading = False
+        messagebox.showinfo("Duplicatas", f"{summary['linked']} cópias vinculadas "
+                                          f"({summary['bytes'] / 1024 / 1024:.1f} MB liberados), "
+                                          f"{summary['failed']} falhas")
+    
+    def _profiled(self, func, label):
+        """Envolve a tarefa na captura de perfil, se ela foi pedida no painel de diagnóstico"""
+        if not self.profile_next_batch.get():
+            return func
+        self.profile_next_batch.set(False)
+        
+        def run(job, *args):
+            with profile_capture(label) as capture:
+                result = func(job, *args)
+            if isinstance(result, dict):
+                result['profile_dir'] = capture['directory']
+            return result
+        return run
+    
+    def show_diagnostics(self):
+        """Abre o painel com o resumo das operações medidas"""
+        if self.diagnostics_window is not None and self.diagnostics_window.winfo_exists():
+            self.diagnostics_window.lift()
+            return
+        
+        window = tk.Toplevel(self.root)
+        window.title("Diagnóstico de desempenho")
+        window.geometry("900x420")
+        self.diagnostics_window = window
+        
+        columns = ('count', 'errors', 'mean', 'p50', 'p90', 'max', 'total', 'rate')
+        headings = ("Qtd.", "Erros", "Média (ms)", "p50 (ms)", "p90 (ms)", "Máx. (ms)", "Total (s)", "MB/s")
+        tree = ttk.Treeview(window, columns=columns, height=14)
+        tree.heading('#0', text="Operação")
+        tree.column('#0', width=180)
+        for column, heading in zip(columns, headings):
+            tree.heading(column, text=heading)
+            tree.column(column, width=80, anchor=tk.E)
+        tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=(10, 5))
+        
+        buttons = ttk.Frame(window)
+        buttons.pack(fill=tk.X, padx=10, pady=(0, 10))
+        
+        ttk.Checkbutton(buttons, 
+                       text="Perfilar o próximo lote (cProfile + tracemalloc)", 
+                       variable=self.profile_next_batch).pack(side=tk.LEFT)
+        ttk.Button(buttons, text="🗑 Limpar", 
+                  command=lambda: (metrics.clear(), redraw())).pack(side=tk.RIGHT)
+        ttk.Button(buttons, text="💾 Exportar JSONL", 
+                  command=self.export_metrics).pack(side=tk.RIGHT, padx=5)
+        
+        def redraw():
+            tree.delete(*tree.get_children())
+            for row in metrics.summary():
+                rate = f"{row['bytes_per_sec'] / (1024 * 1024):.1f}" if row['bytes_per_sec'] else "-"
+                tree.insert('', tk.END, text=row['name'], values=(
+                    row['count'], row['errors'], f"{row['mean_ms']:.1f}", f"{row['p50_ms']:.1f}",
+                    f"{row['p90_ms']:.1f}", f"{row['max_ms']:.1f}", f"{row['total_s']:.2f}", rate))
+        
+        # Atualiza a cada segundo enquanto a janela estiver aberta
+        def refresh():
+            if window.winfo_exists():
+                redraw()
+                window.after(1000, refresh)
+        
+        refresh()
+    
+    def export_metrics(self):
+        """Exporta os eventos medidos em JSON lines"""
+        path = filedialog.asksaveasfilename(title="Exportar métricas",
+                                            defaultextension=".jsonl",
+                                            filetypes=[("JSON lines", "*.jsonl"), ("Todos os arquivos", "*.*")])
+        if not path:
+            return
+        
+        try:
+            count = metrics.export_jsonl(path)
+            messagebox.showinfo("Sucesso", f"{count} eventos exportados para:\n{path}")
+        except OSError as e:
+            messagebox.showerror("Erro", f"Erro ao exportar métricas: {str(e)}")
+    
+    def poll_jobs(self):
+        """Consome a fila de eventos das tarefas e atualiza a interface"""
+        # Vários avisos do mesmo download no intervalo viram uma atualização da linha
+        download_rows = {}
+        for event in self.jobs.poll():
+            job = event['job']
+            
+            if event['type'] == 'progress':
+                total = max(event['total'], 1)
+                self.job_progress.config(maximum=total, value=event['done'])
+                status = f"{job.name}: {event['status']} ({event['done']}/{event['total']})"
+                if event['eta'] is not None:
+                    status += f" • restante: {time.strftime('%H:%M:%S', time.gmtime(event['eta']))}"
+                self.job_status_label.config(text=status)
+                if 'item' in event:
+                    download_rows[event['item'].id] = event['item']
+                if 'probed' in event:
+                    self._on_media_probed(event)
+            elif event['type'] == 'done':
+                self.job_status_label.config(text=f"{job.name}: concluída")
+                if job.on_done:
+                    job.on_done(event['result'])
+            elif event['type'] == 'cancelled':
+                self.job_status_label.config(text=f"{job.name}: cancelada")
+                if job.on_done:
+                    job.on_done(event['result'])
+            elif event['type'] == 'error':
+                self.job_status_label.config(text=f"{job.name}: erro")
+                if job.on_error:
+                    job.on_error(event['error'])
+        
+        for item in download_rows.values():
+            self._update_download_row(item)
+        
+        state = tk.NORMAL if self.jobs.active_jobs() else tk.DISABLED
+        self.btn_cancel_jobs.config(state=state)
+        self.root.after(100, self.poll_jobs)
+    
+    def cancel_jobs(self):
+        """Cancela as tarefas em andamento"""
+        self.jobs.cancel()
+        self.job_status_label.config(text="Cancelando...")
+    
+    def on_close(self):
+        """Encerra as tarefas pendentes e fecha a janela"""
+        self.jobs.shutdown()
+        self.thumbnails.shutdown()
+        self.filmstrips.shutdown()
+        self.root.destroy()
     
     def open_download_folder(self, media_type):
         """Abre a pasta de downloads do tipo de mídia especificado"""
@@ -1160,6 +2124,7 @@ class MediaToolsPro:
 
 def main():
     """Função principal"""
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = MediaToolsPro(root)
     root.mainloop()
@@ -0,0 +1,62 @@
+"""Ajustes fundidos: o resultado deve ser o mesmo de aplicar cada operação em sequência"""
+import itertools
+import unittest
+
+import numpy as np
+from PIL import Image, ImageChops, ImageEnhance, ImageOps
+
+from tic_core.adjustments import apply_adjustments, describe, fuse
+
+
+def sample_image(mode='RGB', size=(7, 4), high=256):
+    pixels = np.random.default_rng(0).integers(0, high, (size[1], size[0], len(mode)), dtype=np.uint8)
+    return Image.fromarray(pixels.squeeze(), mode)
+
+
+def step_by_step(image, operations):
+    """Uma operação de cada vez, como a tela de imagens fazia antes da fusão"""
+    for operation in operations:
+        if operation == 'rotate':
+            image = image.rotate(90, expand=True)
+        elif operation == 'mirror':
+            image = ImageOps.mirror(image)
+        else:
+            image = ImageEnhance.Brightness(image).enhance(1.2 if operation == 'brightness' else 0.8)
+    return image
+
+
+class FusedAdjustmentsTest(unittest.TestCase):
+    def test_geometry_matches_step_by_step(self):
+        image = sample_image()
+        for length in range(5):
+            for operations in itertools.product(('rotate', 'mirror'), repeat=length):
+                with self.subTest(operations=operations):
+                    fused, expected = apply_adjustments(image, operations), step_by_step(image, operations)
+                    self.assertEqual(fused.size, expected.size)
+                    self.assertEqual(fused.tobytes(), expected.tobytes())
+
+    def test_brightness_mixed_with_geometry_matches_step_by_step(self):
+        # Valores baixos: nenhum passo intermediário satura, então só sobra arredondamento
+        image = sample_image(high=150)
+        for operations in (['brightness'], ['darkness', 'darkness'], ['brightness', 'rotate', 'darkness'],
+                           ['mirror', 'brightness', 'brightness', 'rotate', 'mirror'],
+                           ['rotate', 'darkness', 'mirror', 'brightness']):
+            with self.subTest(operations=operations):
+                fused, expected = apply_adjustments(image, operations), step_by_step(image, operations)
+                self.assertEqual(fused.size, expected.size)
+                self.assertLessEqual(max(high for _, high in ImageChops.difference(fused, expected).getextrema()), 2)
+
+    def test_fuse_and_describe(self):
+        self.assertEqual(fuse([]), (False, 0, 1.0))
+        self.assertEqual(fuse(['rotate', 'mirror', 'rotate']), (True, 0, 1.0))
+        mirrored, quarter_turns, brightness = fuse(['rotate', 'brightness', 'rotate', 'darkness', 'mirror'])
+        self.assertEqual((mirrored, quarter_turns), (True, 2))
+        self.assertAlmostEqual(brightness, 0.96)
+        self.assertEqual(describe(['rotate'] * 4), "nenhum")
+        self.assertEqual(describe(['mirror', 'rotate', 'brightness']), "espelhada, girada 90°, brilho x1.20")
+        with self.assertRaises(ValueError):
+            fuse(['blur'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+"""Conversões deduplicadas: saídas ligadas não podem ser sobrescritas no lugar"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from PIL import Image
+
+from tic_core.dedupe import iter_deduplicated, same_file
+from tic_core.images import iter_convert_batch
+
+
+def convert_png(output_dir):
+    return lambda batch: iter_convert_batch(batch, output_dir, 'PNG', '.png', 90, workers=0)
+
+
+class LinkedOutputTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.output_dir = os.path.join(self.root, 'out')
+        os.makedirs(self.output_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def source(self, name, color):
+        path = os.path.join(self.root, name)
+        Image.new('RGB', (32, 32), color).save(path, format='BMP')
+        return path
+
+    def pixel(self, result):
+        with Image.open(result['output']) as image:
+            return image.convert('RGB').getpixel((0, 0))
+
+    def test_reconverting_one_copy_keeps_the_other_output(self):
+        files = [self.source('a.bmp', 'red'), self.source('b.bmp', 'red')]
+        results = list(iter_deduplicated(files, self.output_dir, '.png', convert_png(self.output_dir)))
+        self.assertEqual([result['error'] for result in results], [None, None])
+        outputs = {os.path.basename(result['file']): result for result in results}
+        self.assertTrue(same_file(outputs['a.bmp']['output'], outputs['b.bmp']['output']))
+
+        # Uma das origens muda e só ela é convertida de novo
+        changed = self.source('b.bmp', 'blue')
+        list(iter_deduplicated([changed], self.output_dir, '.png', convert_png(self.output_dir)))
+
+        self.assertEqual(self.pixel(outputs['b.bmp']), (0, 0, 255))
+        self.assertEqual(self.pixel(outputs['a.bmp']), (255, 0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+"""Fila de downloads contra um servidor HTTP local: conclusão, novas tentativas, falhas e cancelamento"""
+import http.server
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from tic_core.download_queue import DONE, FAILED, DownloadQueue
+from tic_core.jobs import JobRunner
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    """/ok/<nome>, /flaky/<nome> (503 nas duas primeiras vezes), /missing/<nome> e /slow/<nome>"""
+    requests = {}
+
+    def do_GET(self):
+        kind, _, name = self.path.strip('/').partition('/')
+        Handler.requests[self.path] = Handler.requests.get(self.path, 0) + 1
+        if kind == 'missing' or (kind == 'flaky' and Handler.requests[self.path] <= 2):
+            self.send_error(404 if kind == 'missing' else 503)
+            return
+
+        body = name.encode() * (64 * 1024 if kind == 'slow' else 100)
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        step = 1024 if kind == 'slow' else len(body)
+        try:
+            for start in range(0, len(body), step):
+                self.wfile.write(body[start:start + step])
+                if kind == 'slow':
+                    time.sleep(0.005)
+        except OSError:
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+class DownloadQueueTest(unittest.TestCase):
+    def setUp(self):
+        Handler.requests = {}
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f'http://127.0.0.1:{self.server.server_port}'
+
+        self.output_dir = tempfile.mkdtemp()
+        self.runner = JobRunner()
+        self.queue = DownloadQueue(self.runner, {'images': self.output_dir}, retries=2, backoff=0.01)
+        self.finished = []
+
+    def tearDown(self):
+        self.runner.shutdown()
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def add(self, *paths, **options):
+        return self.queue.add([self.base_url + path for path in paths], 'images',
+                              on_update=self.finished.append, chunk_size=1024, **options)
+
+    def dispatch(self):
+        """Consome os eventos do JobRunner como a CLI"""
+        for event in self.runner.poll():
+            job = event['job']
+            if event['type'] in ('done', 'cancelled') and job.on_done:
+                job.on_done(event['result'])
+            elif event['type'] == 'error' and job.on_error:
+                job.on_error(event['error'])
+
+    def wait(self, count, until=None, timeout=20):
+        """Despacha os eventos até `count` itens terminarem"""
+        deadline = time.monotonic() + timeout
+        while len(self.finished) < count:
+            self.assertLess(time.monotonic(), deadline, "a fila não terminou a tempo")
+            self.dispatch()
+            if until:
+                until()
+            time.sleep(0.01)
+
+    def test_completes_retries_and_fails(self):
+        ok, flaky, missing = self.add('/ok/a.jpg', '/flaky/b.jpg', '/missing/c.jpg')
+        self.wait(3)
+
+        self.assertEqual((ok.state, ok.attempts), (DONE, 1))
+        with open(ok.output, 'rb') as f:
+            self.assertEqual(f.read(), b'a.jpg' * 100)
+        self.assertEqual((flaky.state, flaky.attempts), (DONE, 3))
+        # 404 não melhora com nova tentativa
+        self.assertEqual((missing.state, missing.attempts), (FAILED, 1))
+        self.assertEqual(Handler.requests['/missing/c.jpg'], 1)
+        self.assertEqual(self.queue.counts('images'), {'queued': 0, 'running': 0, 'done': 2, 'failed': 1})
+
+    def test_cancel_stops_a_running_download(self):
+        item, = self.add('/slow/d.jpg')
+
+        def cancel_when_transferring():
+            if item.transfer is not None:
+                self.runner.cancel()
+
+        start = time.monotonic()
+        self.wait(1, until=cancel_when_transferring)
+        self.assertEqual((item.state, item.error), (FAILED, "Cancelado"))
+        # O corpo inteiro levaria mais de 1 s para chegar
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, 'd.jpg')))
+
+    def test_cancel_during_expansion_enqueues_nothing(self):
+        listing = threading.Event()
+        release = threading.Event()
+
+        def expand(url, output_dir):
+            listing.set()
+            release.wait(5)
+            # A listagem termina mesmo assim e devolve as entradas
+            return [{'url': self.base_url + '/ok/e.jpg', 'title': 'e'}], 0
+
+        self.queue.expand_func = expand
+        expanded = []
+        self.queue.expand(['playlist'], 'images', on_expanded=lambda *result: expanded.append(result))
+        self.assertTrue(listing.wait(5))
+        self.runner.cancel()
+        release.set()
+
+        deadline = time.monotonic() + 5
+        while not expanded:
+            self.assertLess(time.monotonic(), deadline, "a listagem não terminou a tempo")
+            self.dispatch()
+            time.sleep(0.01)
+        self.assertEqual(expanded, [('playlist', [], 0, "Cancelado")])
+        self.assertEqual(self.queue.items(), [])
+        self.assertEqual(self.queue.expanding('images'), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
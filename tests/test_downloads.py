@@ -0,0 +1,226 @@
+"""Downloads via yt-dlp com extratores falsos e um servidor HTTP local"""
+import functools
+import http.server
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import yt_dlp
+from yt_dlp.extractor.common import InfoExtractor
+
+from tic_core import downloads
+from tic_core.extraction import ExtractionCache
+from tic_core.ffmpeg import find_executable
+
+BASE_URL = None
+
+
+class FakeVideoIE(InfoExtractor):
+    _VALID_URL = r'fakevideo://(?P<id>\w+)'
+
+    def _real_extract(self, url):
+        video_id = self._match_id(url)
+        return {'id': video_id, 'title': f'video {video_id}', 'url': f'{BASE_URL}/{video_id}.mp4', 'ext': 'mp4'}
+
+
+class FakePlaylistIE(InfoExtractor):
+    _VALID_URL = r'fakeplaylist://(?P<id>\w+)'
+
+    def _real_extract(self, url):
+        # Gerador, como nos extratores de playlists e canais de verdade
+        entries = (self.url_result(f'fakevideo://{i}', FakeVideoIE.ie_key(), str(i)) for i in ('a', 'b'))
+        return self.playlist_result(entries, self._match_id(url), 'playlist')
+
+
+class FakeStreamsIE(InfoExtractor):
+    """Vídeo com streams separados: fakestreams://<codecs>[_broken] (o áudio some com _broken)"""
+    _VALID_URL = r'fakestreams://(?P<id>\w+)'
+
+    def _real_extract(self, url):
+        video_id = self._match_id(url)
+        codecs = video_id.split('_')[0]
+        video_ext, audio_ext, vcodec, acodec = STREAM_VARIANTS[codecs]
+        audio_name = 'missing' if video_id.endswith('_broken') else f'{codecs}_audio'
+        return {'id': video_id, 'title': f'streams {video_id}', 'formats': [
+            {'format_id': 'v', 'url': f'{BASE_URL}/{codecs}_video.{video_ext}', 'ext': video_ext,
+             'vcodec': vcodec, 'acodec': 'none', 'width': 160, 'height': 120},
+            {'format_id': 'a', 'url': f'{BASE_URL}/{audio_name}.{audio_ext}', 'ext': audio_ext,
+             'vcodec': 'none', 'acodec': acodec},
+        ]}
+
+
+# Streams servidos: extensões, codecs informados ao yt-dlp e argumentos do ffmpeg
+STREAM_VARIANTS = {
+    'h264': ('mp4', 'm4a', 'avc1.64000d', 'mp4a.40.2'),
+}
+STREAM_ENCODERS = {
+    'h264': (['-c:v', 'libx264', '-pix_fmt', 'yuv420p'], ['-c:a', 'aac']),
+}
+
+
+def fake_extractors(ydl):
+    ydl.add_info_extractor(FakePlaylistIE())
+    ydl.add_info_extractor(FakeVideoIE())
+    ydl.add_info_extractor(FakeStreamsIE())
+
+
+def make_streams(directory, codecs):
+    """Gera com o ffmpeg um stream só de vídeo e outro só de áudio, de 1 s"""
+    video_ext, audio_ext, _, _ = STREAM_VARIANTS[codecs]
+    video_args, audio_args = STREAM_ENCODERS[codecs]
+    ffmpeg = [find_executable('ffmpeg'), '-hide_banner', '-loglevel', 'error', '-nostdin', '-y']
+    subprocess.run(ffmpeg + ['-f', 'lavfi', '-i', 'testsrc=size=160x120:rate=10:duration=1'] + video_args
+                   + [os.path.join(directory, f'{codecs}_video.{video_ext}')], check=True)
+    subprocess.run(ffmpeg + ['-f', 'lavfi', '-i', 'sine=duration=1'] + audio_args
+                   + [os.path.join(directory, f'{codecs}_audio.{audio_ext}')], check=True)
+
+
+class ServedTestCase(unittest.TestCase):
+    """Servidor HTTP local com os arquivos de `served` e cache de extrações temporário"""
+
+    def setUp(self):
+        global BASE_URL
+        self.root = tempfile.mkdtemp()
+        self.served = os.path.join(self.root, 'served')
+        os.makedirs(self.served)
+
+        handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=self.served)
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        BASE_URL = f'http://127.0.0.1:{self.server.server_port}'
+
+        self.cache = ExtractionCache(os.path.join(self.root, 'cache'))
+        self.patches = [
+            mock.patch.object(yt_dlp.YoutubeDL, 'add_default_info_extractors', fake_extractors),
+            mock.patch.object(downloads, 'extraction_cache', lambda: self.cache),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+class PlaylistDownloadTest(ServedTestCase):
+    def setUp(self):
+        super().setUp()
+        for name in ('a', 'b'):
+            with open(os.path.join(self.served, f'{name}.mp4'), 'wb') as f:
+                f.write(name.encode() * 1000)
+
+    def test_playlist_extraction_is_listed_and_serializable(self):
+        info = downloads.ytdlp_extract('fakeplaylist://pl')
+        self.assertEqual([entry['url'] for entry in info['entries']], ['fakevideo://a', 'fakevideo://b'])
+        json.dumps(info)
+
+    def test_playlist_url_downloads_every_entry(self):
+        output_dir = os.path.join(self.root, 'out')
+        for _ in range(2):
+            # A segunda vez usa a extração guardada em cache
+            downloads.download_media('fakeplaylist://pl', 'videos', output_dir)
+        self.assertTrue(os.path.exists(os.path.join(output_dir, 'video a.mp4')))
+        self.assertTrue(os.path.exists(os.path.join(output_dir, 'video b.mp4')))
+        self.assertIsNotNone(self.cache.get('fakeplaylist://pl'))
+
+
+
+@unittest.skipIf(find_executable('ffmpeg') is None, "FFmpeg não encontrado")
+class StreamsDownloadTest(ServedTestCase):
+    def setUp(self):
+        super().setUp()
+        for codecs in STREAM_VARIANTS:
+            make_streams(self.served, codecs)
+        self.output_dir = os.path.join(self.root, 'out')
+
+    def download(self, url, video_format):
+        downloads.download_media(url, 'videos', self.output_dir, video_format=video_format)
+        return sorted(os.listdir(self.output_dir))
+
+    def test_streams_are_merged_into_the_chosen_container(self):
+        self.assertIn('streams h264.mp4', self.download('fakestreams://h264', 'MP4'))
+
+    def test_codecs_the_container_refuses_are_merged_as_mkv(self):
+        # WEBM só aceita VP8/VP9/AV1 com Opus/Vorbis
+        names = self.download('fakestreams://h264', 'WEBM')
+        self.assertEqual([name for name in names if name.startswith('streams')], ['streams h264.mkv'])
+
+    def test_failed_stream_leaves_no_partial_files(self):
+        with self.assertRaises(Exception):
+            self.download('fakestreams://h264_broken', 'MP4')
+        self.assertEqual([name for name in os.listdir(self.output_dir) if name.startswith('streams')], [])
+
+
+@unittest.skipIf(find_executable('ffmpeg') is None, "FFmpeg não encontrado")
+class ExtractionCacheTest(ServedTestCase):
+    def setUp(self):
+        super().setUp()
+        make_streams(self.served, 'h264')
+        self.output_dir = os.path.join(self.root, 'out')
+        self.extracted = []
+
+    def extractor(self, url, flat):
+        self.extracted.append(url)
+        return downloads.ytdlp_extract(url, flat)
+
+    def download(self, url='fakestreams://h264'):
+        downloads.download_media(url, 'videos', self.output_dir, video_format='MP4', extractor=self.extractor)
+        output_path = os.path.join(self.output_dir, 'streams h264.mp4')
+        self.assertTrue(os.path.exists(output_path))
+        # Sem a saída, o próximo download baixa os streams de novo
+        os.remove(output_path)
+
+    def test_download_within_ttl_reuses_the_extraction(self):
+        self.download()
+        self.download()
+        self.assertEqual(len(self.extracted), 1)
+
+    def test_expired_extraction_is_extracted_again(self):
+        self.download()
+        self.cache.ttl = -1
+        self.download()
+        self.assertEqual(len(self.extracted), 2)
+
+    def test_refresh_ignores_the_cache(self):
+        info, cached = downloads.extract_info('fakestreams://h264', extractor=self.extractor)
+        self.assertFalse(cached)
+        info, cached = downloads.extract_info('fakestreams://h264', extractor=self.extractor)
+        self.assertTrue(cached)
+        info, cached = downloads.extract_info('fakestreams://h264', refresh=True, extractor=self.extractor)
+        self.assertFalse(cached)
+        self.assertEqual(len(self.extracted), 2)
+
+    def test_expired_links_in_the_cache_are_extracted_again(self):
+        # Extração guardada com um link que não existe mais no servidor
+        stale = downloads.ytdlp_extract('fakestreams://h264_broken')
+        stale['id'], stale['title'] = 'h264', 'streams h264'
+        self.cache.put('fakestreams://h264', stale)
+        self.download()
+        self.assertEqual(self.extracted, ['fakestreams://h264'])
+
+
+class FormatSelectionTest(unittest.TestCase):
+    def test_merge_container_checks_the_stream_codecs(self):
+        h264 = [{'vcodec': 'avc1.64001F', 'ext': 'mp4'}, {'acodec': 'mp4a.40.2', 'ext': 'm4a'}]
+        vp9 = [{'vcodec': 'vp09.00.40.08', 'ext': 'webm'}, {'acodec': 'opus', 'ext': 'webm'}]
+        self.assertEqual(downloads.merge_container(h264, 'MP4'), 'MP4')
+        self.assertEqual(downloads.merge_container(h264, 'WEBM'), 'MKV')
+        self.assertEqual(downloads.merge_container(vp9, 'WEBM'), 'WEBM')
+        self.assertEqual(downloads.merge_container(vp9, 'MOV'), 'MKV')
+        self.assertEqual(downloads.merge_container(vp9, 'MKV'), 'MKV')
+
+    def test_without_ffmpeg_only_combined_files_are_chosen(self):
+        with mock.patch.object(downloads, 'find_executable', lambda name: None):
+            self.assertEqual(downloads.video_format_options('MP4', '720p'), {'format': 'best[height<=720]'})
+
+
+if __name__ == '__main__':
+    unittest.main()
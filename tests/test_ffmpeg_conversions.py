@@ -0,0 +1,76 @@
+"""Conversões com FFmpeg: progresso lido de -progress pipe:1 em clipes curtos gerados com lavfi"""
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import unittest
+
+from tic_core.audio import iter_convert_audio
+from tic_core.ffmpeg import find_executable, probe
+from tic_core.video import iter_convert_videos
+
+
+def lavfi(*args):
+    command = [find_executable('ffmpeg'), '-hide_banner', '-loglevel', 'error', '-nostdin', '-y']
+    subprocess.run(command + list(args), check=True)
+
+
+@unittest.skipIf(find_executable('ffmpeg') is None or find_executable('ffprobe') is None,
+                 "FFmpeg/FFprobe não encontrados")
+class ConversionProgressTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.root = tempfile.mkdtemp()
+        cls.video = os.path.join(cls.root, 'clip.mp4')
+        lavfi('-f', 'lavfi', '-i', 'testsrc=size=320x240:rate=25:duration=6',
+              '-f', 'lavfi', '-i', 'sine=frequency=440:duration=6',
+              '-c:v', 'libx264', '-preset', 'ultrafast', '-pix_fmt', 'yuv420p', '-c:a', 'aac', '-shortest', cls.video)
+        cls.audio = os.path.join(cls.root, 'tone.wav')
+        lavfi('-f', 'lavfi', '-i', 'sine=frequency=440:duration=120', cls.audio)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.root, ignore_errors=True)
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp(dir=self.root)
+        self.progress = []
+        self.lock = threading.Lock()
+
+    def on_progress(self, file_path, percent, speed):
+        with self.lock:
+            self.progress.append(percent)
+
+    def assert_rising_to_complete(self):
+        self.assertTrue(self.progress)
+        self.assertEqual(self.progress, sorted(self.progress))
+        self.assertTrue(all(0 <= percent <= 100 for percent in self.progress))
+        self.assertEqual(self.progress[-1], 100.0)
+
+    def test_video_transcode_reports_rising_progress(self):
+        results = list(iter_convert_videos([self.video], self.output_dir, 'WEBM', '.webm',
+                                           on_progress=self.on_progress))
+        self.assertIsNone(results[0]['error'])
+        self.assertFalse(results[0]['remux'])
+        self.assert_rising_to_complete()
+
+        info = probe(results[0]['output'])
+        codecs = {stream['type']: stream['codec'] for stream in info['streams']}
+        self.assertEqual(codecs, {'video': 'vp9', 'audio': 'opus'})
+        self.assertAlmostEqual(info['duration'], 6, delta=0.5)
+
+    def test_audio_transcode_reports_rising_progress(self):
+        results = list(iter_convert_audio([self.audio], self.output_dir, 'OGG', '.ogg', 128,
+                                          on_progress=self.on_progress))
+        self.assertIsNone(results[0]['error'])
+        self.assertFalse(results[0]['copied'])
+        self.assert_rising_to_complete()
+
+        info = probe(results[0]['output'])
+        self.assertEqual([stream['codec'] for stream in info['streams']], ['vorbis'])
+        self.assertAlmostEqual(info['duration'], 120, delta=0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
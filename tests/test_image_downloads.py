@@ -0,0 +1,85 @@
+"""Download de imagens em blocos por HTTP, com progresso espaçado, contra um servidor local"""
+import functools
+import http.server
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import requests
+
+from tic_core import downloads
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class ImageDownloadTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.served = os.path.join(self.root, 'served')
+        self.output_dir = os.path.join(self.root, 'out')
+        os.makedirs(self.served)
+        os.makedirs(self.output_dir)
+        self.body = os.urandom(256 * 1024)
+        with open(os.path.join(self.served, 'photo.jpg'), 'wb') as f:
+            f.write(self.body)
+
+        handler = functools.partial(QuietHandler, directory=self.served)
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self.server.server_port}/photo.jpg'
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_body_is_read_in_the_requested_chunks(self):
+        sizes = []
+        iter_content = requests.Response.iter_content
+
+        def spy(response, chunk_size=1, decode_unicode=False):
+            for chunk in iter_content(response, chunk_size, decode_unicode):
+                sizes.append((chunk_size, len(chunk)))
+                yield chunk
+
+        with mock.patch.object(requests.Response, 'iter_content', spy):
+            path = downloads.download_media(self.url, 'images', self.output_dir, chunk_size=4096)
+
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), self.body)
+        self.assertEqual({chunk_size for chunk_size, _ in sizes}, {4096})
+        self.assertEqual(len(sizes), len(self.body) // 4096)
+        self.assertFalse(os.path.exists(path + '.part'))
+
+    def test_progress_is_throttled(self):
+        statuses = []
+        downloads.download_media(self.url, 'images', self.output_dir, chunk_size=1024,
+                                 on_progress=statuses.append)
+
+        # 256 blocos chegam bem dentro de um intervalo: só o primeiro aviso e o fim passam
+        self.assertLess(len(statuses), 5)
+        self.assertEqual(statuses[-1]['status'], 'finished')
+        self.assertEqual(statuses[-1]['downloaded_bytes'], len(self.body))
+        self.assertEqual(statuses[0]['total_bytes'], len(self.body))
+
+    def test_throttle_drops_updates_within_the_interval_but_not_the_end(self):
+        statuses = []
+        throttle = downloads.ProgressThrottle(statuses.append, interval=60)
+        for received in range(0, 100, 10):
+            throttle.download_hook({'filename': 'a', 'status': 'downloading', 'downloaded_bytes': received,
+                                    'total_bytes': 100})
+        throttle.download_hook({'filename': 'a', 'status': 'finished', 'downloaded_bytes': 100,
+                                'total_bytes': 100})
+
+        self.assertEqual([(status['status'], status['downloaded_bytes']) for status in statuses],
+                         [('downloading', 0), ('finished', 100)])
+
+
+if __name__ == '__main__':
+    unittest.main()
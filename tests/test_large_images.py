@@ -0,0 +1,102 @@
+"""Gravadores PNG/TIFF em faixas: mesmos pixels e metadados que o save() do Pillow"""
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+from PIL import Image, ImageChops, ImageCms
+
+from tic_core import large_images
+from tic_core.images import convert_image_file
+
+ICC_PROFILE = ImageCms.ImageCmsProfile(ImageCms.createProfile('sRGB')).tobytes()
+DPI = (300, 150)
+
+
+def sample_image(mode, size=(97, 61)):
+    channels = len(mode)
+    pixels = np.random.default_rng(len(mode)).integers(0, 256, (size[1], size[0], channels), dtype=np.uint8)
+    return Image.fromarray(pixels.squeeze(), mode)
+
+
+def strips(image, rows=16):
+    width, height = image.size
+    for top in range(0, height, rows):
+        yield image.crop((0, top, width, min(height, top + rows)))
+
+
+def reopen(data):
+    image = Image.open(io.BytesIO(data))
+    image.load()
+    return image
+
+
+class StripWriterTest(unittest.TestCase):
+    def write(self, writer, image, **metadata):
+        f = io.BytesIO()
+        writer(f, image.size, image.mode, strips(image), **metadata)
+        return reopen(f.getvalue())
+
+    def saved(self, image, format_name, **metadata):
+        f = io.BytesIO()
+        image.save(f, format=format_name, **metadata)
+        return reopen(f.getvalue())
+
+    def assert_same_image(self, written, saved):
+        self.assertEqual((written.mode, written.size), (saved.mode, saved.size))
+        self.assertEqual(written.tobytes(), saved.tobytes())
+
+    def test_round_trip_matches_pillow(self):
+        for mode in large_images.STRIP_MODES:
+            image = sample_image(mode)
+            with self.subTest(mode=mode, format='PNG'):
+                self.assert_same_image(self.write(large_images.write_png, image), self.saved(image, 'PNG'))
+            with self.subTest(mode=mode, format='TIFF'):
+                self.assert_same_image(self.write(large_images.write_tiff, image), self.saved(image, 'TIFF'))
+
+    def test_icc_profile_and_dpi_are_kept(self):
+        image = sample_image('RGB')
+        for writer, format_name in ((large_images.write_png, 'PNG'), (large_images.write_tiff, 'TIFF')):
+            with self.subTest(format=format_name):
+                written = self.write(writer, image, icc_profile=ICC_PROFILE, dpi=DPI)
+                saved = self.saved(image, format_name, icc_profile=ICC_PROFILE, dpi=DPI)
+                self.assert_same_image(written, saved)
+                self.assertEqual(written.info['icc_profile'], ICC_PROFILE)
+                for written_dpi, saved_dpi in zip(written.info['dpi'], saved.info['dpi']):
+                    self.assertAlmostEqual(float(written_dpi), float(saved_dpi), places=2)
+
+
+class LargeConversionTest(unittest.TestCase):
+    """convert_image_file com o limite de "imagem grande" reduzido, comparada ao caminho normal"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.source = os.path.join(self.root, 'source.tif')
+        sample_image('RGB', (300, 200)).save(self.source, icc_profile=ICC_PROFILE, dpi=DPI)
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def convert(self, format_name, strip):
+        output_path = os.path.join(self.root, f"{'strip' if strip else 'normal'}.{format_name.lower()}")
+        with mock.patch.object(large_images, 'LARGE_IMAGE_PIXELS', 0 if strip else 10 ** 12):
+            convert_image_file(self.source, output_path, format_name, 90, adjustments=['mirror'])
+        return reopen(open(output_path, 'rb').read())
+
+    def test_strip_path_keeps_pixels_and_metadata(self):
+        for format_name in ('PNG', 'TIFF', 'JPEG'):
+            with self.subTest(format=format_name):
+                strip, normal = self.convert(format_name, True), self.convert(format_name, False)
+                self.assertEqual(strip.mode, normal.mode)
+                self.assertIsNone(ImageChops.difference(strip, normal).getbbox())
+                self.assertEqual(strip.info.get('icc_profile'), ICC_PROFILE)
+                self.assertEqual(normal.info.get('icc_profile'), ICC_PROFILE)
+                for strip_dpi, normal_dpi in zip(strip.info['dpi'], normal.info['dpi']):
+                    self.assertAlmostEqual(float(strip_dpi), float(normal_dpi), places=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
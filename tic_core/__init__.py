@@ -0,0 +1 @@
+"""Núcleo de processamento do MediaTools Pro (independente da interface gráfica)"""
@@ -0,0 +1,9 @@
+"""Permite executar `python -m tic_core convert|download|rename`"""
+import multiprocessing
+import sys
+
+from tic_core.cli import main
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
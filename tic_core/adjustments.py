@@ -0,0 +1,72 @@
+"""Ajustes rápidos não destrutivos: lista de operações aplicada de uma só vez
+
+Os ajustes (girar, espelhar, brilho) são registrados como uma lista de nomes
+de operação. Antes de aplicar, a lista é fundida: rotações e espelhamentos
+viram uma única transposição e os fatores de brilho são multiplicados, de
+modo que a imagem em resolução total passa por no máximo duas operações.
+"""
+from PIL import Image, ImageEnhance, ImageOps
+
+OPERATIONS = ('rotate', 'mirror', 'brightness', 'darkness')
+
+BRIGHTNESS_FACTORS = {'brightness': 1.2, 'darkness': 0.8}
+
+# Rotação anti-horária em quartos de volta -> transposição equivalente
+ROTATIONS = {
+    1: Image.Transpose.ROTATE_90,
+    2: Image.Transpose.ROTATE_180,
+    3: Image.Transpose.ROTATE_270,
+}
+
+
+def fuse(operations):
+    """Reduz a lista de operações a (espelhado, quartos de volta, fator de brilho)
+
+    O resultado equivale a espelhar (se indicado), depois girar e por fim
+    ajustar o brilho.
+    """
+    mirrored = False
+    quarter_turns = 0
+    brightness = 1.0
+
+    for operation in operations:
+        if operation == 'rotate':
+            quarter_turns = (quarter_turns + 1) % 4
+        elif operation == 'mirror':
+            # Espelhar depois de girar k vezes = espelhar antes e girar -k vezes
+            mirrored = not mirrored
+            quarter_turns = -quarter_turns % 4
+        elif operation in BRIGHTNESS_FACTORS:
+            brightness *= BRIGHTNESS_FACTORS[operation]
+        else:
+            raise ValueError(f"Ajuste desconhecido: {operation}")
+
+    return mirrored, quarter_turns, brightness
+
+
+def apply_adjustments(image, operations):
+    """Aplica a lista de operações (já fundida) e retorna uma nova imagem"""
+    mirrored, quarter_turns, brightness = fuse(operations)
+
+    if mirrored:
+        image = ImageOps.mirror(image)
+    if quarter_turns:
+        image = image.transpose(ROTATIONS[quarter_turns])
+    if abs(brightness - 1.0) > 1e-6:
+        if image.mode not in ('RGB', 'RGBA', 'L'):
+            image = image.convert('RGBA' if 'A' in image.getbands() or image.mode == 'P' else 'RGB')
+        image = ImageEnhance.Brightness(image).enhance(brightness)
+    return image
+
+
+def describe(operations):
+    """Resumo legível da lista de operações fundida"""
+    mirrored, quarter_turns, brightness = fuse(operations)
+    parts = []
+    if mirrored:
+        parts.append("espelhada")
+    if quarter_turns:
+        parts.append(f"girada {quarter_turns * 90}°")
+    if abs(brightness - 1.0) > 1e-6:
+        parts.append(f"brilho x{brightness:.2f}")
+    return ", ".join(parts) if parts else "nenhum"
@@ -0,0 +1,137 @@
+"""Conversão de áudios com FFmpeg, individual e em lote com transcodificações em paralelo"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from tic_core.ffmpeg import probe, run_ffmpeg
+from tic_core.files import build_output_path
+from tic_core.metrics import metrics
+
+# Para cada formato de saída: muxer do FFmpeg, codec gerado, codificador e
+# se o formato é sem perdas (nesse caso a taxa de bits escolhida é ignorada)
+ENCODERS = {
+    'MP3': {'muxer': 'mp3', 'codec': 'mp3', 'encoder': 'libmp3lame', 'lossless': False},
+    'WAV': {'muxer': 'wav', 'codec': 'pcm_s16le', 'encoder': 'pcm_s16le', 'lossless': True},
+    'OGG': {'muxer': 'ogg', 'codec': 'vorbis', 'encoder': 'libvorbis', 'lossless': False},
+    'AAC': {'muxer': 'adts', 'codec': 'aac', 'encoder': 'aac', 'lossless': False},
+    'FLAC': {'muxer': 'flac', 'codec': 'flac', 'encoder': 'flac', 'lossless': True},
+    'M4A': {'muxer': 'ipod', 'codec': 'aac', 'encoder': 'aac', 'lossless': False},
+}
+
+# Diferença de taxa de bits (proporcional) ainda considerada "a mesma"; arquivos
+# VBR e o arredondamento do ffmpeg raramente batem exatamente com o nominal
+BITRATE_TOLERANCE = 0.05
+
+
+def default_audio_workers():
+    """Transcodificações simultâneas padrão (os codificadores de áudio usam uma thread)"""
+    return max(1, os.cpu_count() or 1)
+
+
+def plan_audio_conversion(info, format_name, bitrate):
+    """Decide entre copiar o stream de áudio e recodificá-lo
+
+    Copia quando o codec de origem já é o de destino e, em formatos com
+    perdas, a taxa de bits de origem não passa da escolhida (recodificar
+    para uma taxa maior não recupera qualidade). `bitrate` é em kbps.
+    Retorna (argumentos de codec para o ffmpeg, True se for cópia).
+    """
+    encoder = ENCODERS[format_name]
+    audio = next((s for s in info['streams'] if s['type'] == 'audio'), None)
+    if audio is None:
+        raise RuntimeError("O arquivo não possui stream de áudio")
+
+    source_rate = audio['bit_rate'] or info['bit_rate']
+    same_codec = audio['codec'] == encoder['codec']
+    same_rate = encoder['lossless'] or (
+        source_rate is not None and source_rate <= bitrate * 1000 * (1 + BITRATE_TOLERANCE))
+
+    args = ['-map', '0:a:0', '-vn', '-sn']
+    if same_codec and same_rate:
+        return args + ['-c:a', 'copy'], True
+
+    args += ['-c:a', encoder['encoder']]
+    if not encoder['lossless']:
+        args += ['-b:a', f'{bitrate}k']
+    return args, False
+
+
+def convert_audio_file(file_path, output_path, format_name, bitrate, on_progress=None, should_stop=None):
+    """Converte um áudio; apenas copia o stream quando codec e taxa já coincidem
+
+    Grava em `<saída>.part` e renomeia ao final. Retorna um dicionário com o
+    caminho de saída, se houve cópia, a duração, o tempo gasto (`seconds`) e
+    o fator de tempo real (segundos de áudio processados por segundo).
+    """
+    info = probe(file_path)
+    codec_args, copied = plan_audio_conversion(info, format_name, bitrate)
+
+    part_path = output_path + '.part'
+    args = ['-i', file_path] + codec_args + ['-f', ENCODERS[format_name]['muxer'], part_path]
+
+    start = time.perf_counter()
+    try:
+        run_ffmpeg(args, info['duration'], on_progress, should_stop)
+    except Exception:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+    os.replace(part_path, output_path)
+
+    elapsed = time.perf_counter() - start
+    duration = info['duration'] or 0.0
+    metrics.record('audio.copy' if copied else 'audio.transcode', elapsed, file=file_path,
+                   format=format_name, duration=duration, bytes=os.path.getsize(output_path))
+    return {
+        'output': output_path,
+        'copied': copied,
+        'duration': duration,
+        'seconds': elapsed,
+        'realtime': duration / elapsed if elapsed > 0 else None,
+    }
+
+
+def iter_convert_audio(files, output_dir, format_name, extension, bitrate, workers=None,
+                       on_progress=None, should_stop=None):
+    """Converte vários áudios em paralelo, produzindo um resultado por arquivo
+
+    Cada conversão é um processo ffmpeg próprio. Além do resultado do arquivo,
+    cada item traz o fator de tempo real agregado do lote até o momento
+    (`total_realtime`: segundos de áudio convertidos por segundo de relógio).
+    """
+    files = list(files)
+    total = len(files)
+    workers = max(1, min(workers or default_audio_workers(), total or 1))
+    start = time.perf_counter()
+    done = 0
+    audio_seconds = 0.0
+
+    def convert(file_path):
+        output_path = build_output_path(file_path, output_dir, extension)
+        progress = (lambda percent, speed: on_progress(file_path, percent, speed)) if on_progress else None
+        return convert_audio_file(file_path, output_path, format_name, bitrate, progress, should_stop)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='tic-ffmpeg') as executor:
+        futures = {executor.submit(convert, file_path): file_path for file_path in files}
+
+        for future in as_completed(futures):
+            if should_stop and should_stop():
+                for pending in futures:
+                    pending.cancel()
+                break
+
+            file_path = futures[future]
+            result = {'file': file_path, 'output': None, 'copied': False, 'realtime': None, 'seconds': None,
+                      'error': None}
+            try:
+                result.update(future.result())
+                audio_seconds += result['duration']
+            except Exception as e:
+                result['error'] = str(e)
+
+            done += 1
+            elapsed = time.perf_counter() - start
+            result.update({'done': done, 'total': total, 'elapsed': elapsed,
+                           'files_per_sec': done / elapsed if elapsed > 0 else 0.0,
+                           'total_realtime': audio_seconds / elapsed if elapsed > 0 else None})
+            yield result
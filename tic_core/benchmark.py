@@ -0,0 +1,468 @@
+"""Benchmarks reproduzíveis dos caminhos de conversão, preview e download
+
+Gera corpora sintéticos (imagens com semente fixa; áudios e vídeos com as
+fontes `lavfi` do FFmpeg), executa cada cenário num processo próprio e
+relata vazão, percentis de latência e pico de memória (RSS). Tudo roda
+offline: os downloads usam um servidor HTTP local.
+"""
+import functools
+import http.server
+import multiprocessing
+import os
+import platform
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from tic_core.ffmpeg import CREATION_FLAGS, find_executable
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SCENARIOS = ('convert-images', 'preview-images', 'download-images', 'convert-audio', 'convert-videos',
+             'waveform-audio', 'filmstrip-videos')
+
+# Cenários que dependem do FFmpeg (pulados, com aviso, se ele não estiver instalado)
+FFMPEG_SCENARIOS = {'convert-audio', 'convert-videos', 'waveform-audio', 'filmstrip-videos'}
+
+# Tempo máximo (s) de um cenário; depois disso o processo é encerrado
+SCENARIO_TIMEOUT = 30 * 60
+
+
+def make_image_corpus(directory, count, size=(1920, 1080), seed=0):
+    """Gera `count` imagens (JPEG e PNG alternados) com gradiente e ruído"""
+    import numpy as np
+    from PIL import Image
+
+    os.makedirs(directory, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    width, height = size
+    gradient = np.linspace(0, 255, width, dtype=np.float32)[None, :, None]
+    files = []
+    for index in range(count):
+        noise = rng.normal(0, 24, (height, width, 3)).astype(np.float32)
+        tint = rng.uniform(0.3, 1.0, 3).astype(np.float32)
+        pixels = np.clip(gradient * tint + noise, 0, 255).astype(np.uint8)
+        extension = '.jpg' if index % 2 == 0 else '.png'
+        path = os.path.join(directory, f'image_{index:04d}{extension}')
+        Image.fromarray(pixels).save(path, quality=90)
+        files.append(path)
+    return files
+
+
+def make_audio_corpus(directory, count, seconds=30):
+    """Gera `count` MP3 estéreo a 192 kb/s com tons de frequências diferentes"""
+    os.makedirs(directory, exist_ok=True)
+    files = []
+    for index in range(count):
+        path = os.path.join(directory, f'audio_{index:03d}.mp3')
+        _lavfi(['-f', 'lavfi', '-i', f'sine=frequency={220 + 110 * index}:duration={seconds}',
+                '-ac', '2', '-c:a', 'libmp3lame', '-b:a', '192k', path])
+        files.append(path)
+    return files
+
+
+def make_video_corpus(directory, count, seconds=10, size=(1280, 720)):
+    """Gera `count` MP4 (H.264 + AAC) com padrão de teste animado"""
+    os.makedirs(directory, exist_ok=True)
+    files = []
+    for index in range(count):
+        path = os.path.join(directory, f'video_{index:03d}.mp4')
+        _lavfi(['-f', 'lavfi', '-i', f'testsrc2=size={size[0]}x{size[1]}:rate=30:duration={seconds}',
+                '-f', 'lavfi', '-i', f'sine=frequency={440 + 110 * index}:duration={seconds}',
+                '-c:v', 'libx264', '-preset', 'veryfast', '-g', '60', '-pix_fmt', 'yuv420p',
+                '-c:a', 'aac', '-b:a', '128k', '-shortest', path])
+        files.append(path)
+    return files
+
+
+def _lavfi(args):
+    command = [find_executable('ffmpeg'), '-hide_banner', '-loglevel', 'error', '-nostdin', '-y'] + args
+    subprocess.run(command, check=True, creationflags=CREATION_FLAGS)
+
+
+def percentiles(values):
+    """p50/p90/p99/máximo em milissegundos (interpolação linear)"""
+    values = sorted(value for value in values if value is not None)
+    if not values:
+        return None
+
+    def at(fraction):
+        position = (len(values) - 1) * fraction
+        lower = int(position)
+        upper = min(lower + 1, len(values) - 1)
+        return (values[lower] + (values[upper] - values[lower]) * (position - lower)) * 1000
+
+    return {'p50_ms': at(0.5), 'p90_ms': at(0.9), 'p99_ms': at(0.99), 'max_ms': values[-1] * 1000,
+            'mean_ms': sum(values) / len(values) * 1000}
+
+
+def measurement(items, seconds, latencies, total_bytes=0, failed=0, **extra):
+    """Resultado padrão de um cenário"""
+    return {
+        'items': items,
+        'failed': failed,
+        'seconds': seconds,
+        'items_per_sec': items / seconds if seconds > 0 else None,
+        'mb_per_sec': total_bytes / (1024 * 1024) / seconds if seconds > 0 and total_bytes else None,
+        'latency': percentiles(latencies),
+        **extra,
+    }
+
+
+def _input_bytes(files):
+    return sum(os.path.getsize(path) for path in files)
+
+
+def bench_convert_images(corpus, workdir, workers=None):
+    """Conversão em lote para JPEG (mesmo caminho do _convert_batch_files)"""
+    from tic_core.images import iter_convert_batch
+
+    output_dir = _fresh_dir(workdir, 'out-images')
+    start = time.perf_counter()
+    results = list(iter_convert_batch(corpus['images'], output_dir, 'JPEG', '.jpg', 90, workers))
+    elapsed = time.perf_counter() - start
+    return measurement(len(results), elapsed, [r['seconds'] for r in results], _input_bytes(corpus['images']),
+                       failed=sum(1 for r in results if r['error']))
+
+
+def compare_presets(files, format_name, quality, sample=8, adjustments=None, should_stop=None):
+    """Tempo de codificação x tamanho do arquivo de cada preset, numa amostra do lote
+
+    Até `sample` arquivos espalhados pelo lote são decodificados uma vez e
+    codificados em memória com cada preset. Retorna {preset: resultado}, com
+    o número de arquivos, os segundos de codificação, os percentis, o total
+    de bytes e o tamanho relativo ao preset padrão (`ratio`).
+    """
+    import io
+
+    from PIL import Image
+
+    from tic_core.adjustments import apply_adjustments
+    from tic_core.formats import DEFAULT_PRESET, PRESET_LABELS
+    from tic_core.images import encoder_options
+
+    files = list(files)
+    step = max(1, len(files) // sample) if sample else 1
+    images = []
+    for file_path in files[::step][:sample or None]:
+        with Image.open(file_path) as image:
+            image.load()
+            images.append((image.format, apply_adjustments(image, adjustments) if adjustments else image.copy()))
+
+    results = {}
+    for preset in PRESET_LABELS:
+        latencies = []
+        total_bytes = 0
+        failed = 0
+        for source_format, image in images:
+            if should_stop and should_stop():
+                return results
+            target = format_name or source_format
+            encoded = io.BytesIO()
+            start = time.perf_counter()
+            try:
+                image.save(encoded, format=target, **encoder_options(target, quality, preset))
+            except (OSError, ValueError, KeyError):
+                failed += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+            total_bytes += encoded.tell()
+        results[preset] = measurement(len(latencies), sum(latencies), latencies, failed=failed,
+                                      bytes=total_bytes)
+
+    reference = results.get(DEFAULT_PRESET, {}).get('bytes')
+    for result in results.values():
+        result['ratio'] = result['bytes'] / reference if reference else None
+    return results
+
+
+def bench_preview_images(corpus, workdir, workers=None):
+    """Miniaturas do preview: geração (cache frio) e leitura do cache em disco"""
+    from tic_core.thumbnails import ThumbnailCache
+
+    cache_directory = _fresh_dir(workdir, 'thumbnails')
+    files = corpus['images']
+    result = {}
+    for phase in ('cold', 'disk'):
+        # Um cache novo por fase: a fase 'disk' não encontra nada em memória
+        cache = ThumbnailCache(directory=cache_directory)
+        latencies = []
+        start = time.perf_counter()
+        for path in files:
+            begin = time.perf_counter()
+            cache.get(path)
+            latencies.append(time.perf_counter() - begin)
+        result[phase] = measurement(len(files), time.perf_counter() - start, latencies)
+        cache.shutdown()
+    return result
+
+
+def bench_download_images(corpus, workdir, workers=None):
+    """Downloads por HTTP local (mesmo caminho do _download_thread), depois revalidação"""
+    from tic_core.downloads import download_media
+
+    files = corpus['images']
+    server = _serve_directory(os.path.dirname(files[0]))
+    base_url = f'http://127.0.0.1:{server.server_address[1]}/'
+    urls = [base_url + os.path.basename(path) for path in files]
+    output_dir = _fresh_dir(workdir, 'downloads')
+
+    def timed(url):
+        begin = time.perf_counter()
+        download_media(url, 'images', output_dir)
+        return time.perf_counter() - begin
+
+    result = {}
+    try:
+        # 'cold' baixa tudo; 'revalidate' repete as URLs e deve receber 304
+        for phase in ('cold', 'revalidate'):
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers or 4) as executor:
+                latencies = list(executor.map(timed, urls))
+            result[phase] = measurement(len(urls), time.perf_counter() - start, latencies,
+                                        _input_bytes(files) if phase == 'cold' else 0)
+    finally:
+        server.shutdown()
+        server.server_close()
+    return result
+
+
+def bench_convert_audio(corpus, workdir, workers=None):
+    """Transcodificação de MP3 para OGG a 128 kb/s"""
+    from tic_core.audio import iter_convert_audio
+
+    output_dir = _fresh_dir(workdir, 'out-audio')
+    start = time.perf_counter()
+    results = list(iter_convert_audio(corpus['audio'], output_dir, 'OGG', '.ogg', 128, workers))
+    elapsed = time.perf_counter() - start
+    return measurement(len(results), elapsed, [r['seconds'] for r in results], _input_bytes(corpus['audio']),
+                       failed=sum(1 for r in results if r['error']),
+                       realtime=results[-1]['total_realtime'] if results else None)
+
+
+def bench_convert_videos(corpus, workdir, workers=None):
+    """Remux para MKV e transcodificação para WEBM"""
+    from tic_core.video import iter_convert_videos
+
+    result = {}
+    for format_name, extension in (('MKV', '.mkv'), ('WEBM', '.webm')):
+        output_dir = _fresh_dir(workdir, f'out-videos-{extension[1:]}')
+        start = time.perf_counter()
+        results = list(iter_convert_videos(corpus['videos'], output_dir, format_name, extension, workers))
+        elapsed = time.perf_counter() - start
+        result[format_name.lower()] = measurement(len(results), elapsed, [r['seconds'] for r in results],
+                                                  _input_bytes(corpus['videos']),
+                                                  failed=sum(1 for r in results if r['error']))
+    return result
+
+
+def bench_waveform_audio(corpus, workdir, workers=None):
+    """Picos da forma de onda: cálculo (cache frio) e leitura do cache"""
+    from tic_core.ffmpeg import probe
+    from tic_core.waveform import WaveformCache
+
+    cache = WaveformCache(directory=_fresh_dir(workdir, 'waveforms'))
+    durations = {path: probe(path)['duration'] for path in corpus['audio']}
+    result = {}
+    for phase in ('cold', 'disk'):
+        latencies = []
+        start = time.perf_counter()
+        for path in corpus['audio']:
+            begin = time.perf_counter()
+            cache.get(path, durations[path])
+            latencies.append(time.perf_counter() - begin)
+        result[phase] = measurement(len(latencies), time.perf_counter() - start, latencies)
+    return result
+
+
+def bench_filmstrip_videos(corpus, workdir, workers=None):
+    """Tira de quadros-chave: extração (cache frio) e leitura do cache em disco"""
+    from tic_core.ffmpeg import probe
+    from tic_core.filmstrip import FilmstripCache
+
+    cache_directory = _fresh_dir(workdir, 'filmstrips')
+    durations = {path: probe(path)['duration'] for path in corpus['videos']}
+    result = {}
+    for phase in ('cold', 'disk'):
+        cache = FilmstripCache(directory=cache_directory)
+        latencies = []
+        start = time.perf_counter()
+        for path in corpus['videos']:
+            begin = time.perf_counter()
+            cache.get(path, durations[path])
+            latencies.append(time.perf_counter() - begin)
+        result[phase] = measurement(len(latencies), time.perf_counter() - start, latencies)
+        cache.shutdown()
+    return result
+
+
+BENCHMARKS = {
+    'convert-images': bench_convert_images,
+    'preview-images': bench_preview_images,
+    'download-images': bench_download_images,
+    'convert-audio': bench_convert_audio,
+    'convert-videos': bench_convert_videos,
+    'waveform-audio': bench_waveform_audio,
+    'filmstrip-videos': bench_filmstrip_videos,
+}
+
+
+class _QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def _serve_directory(directory):
+    """Servidor HTTP local (porta livre) em segundo plano"""
+    handler = functools.partial(_QuietHandler, directory=directory)
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _fresh_dir(workdir, name):
+    path = os.path.join(workdir, name)
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path)
+    return path
+
+
+def _peak_rss_mb(who):
+    """Pico de memória residente em MB (None sem o módulo resource)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux informa em KB; macOS, em bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _run_scenario(name, corpus, workdir, workers, results):
+    """Executa um cenário no processo filho e devolve o resultado com o pico de RSS"""
+    try:
+        result = {'result': BENCHMARKS[name](corpus, workdir, workers)}
+    except Exception as e:
+        result = {'error': str(e)}
+    if resource is not None:
+        result['peak_rss_mb'] = _peak_rss_mb(resource.RUSAGE_SELF)
+        result['peak_children_rss_mb'] = _peak_rss_mb(resource.RUSAGE_CHILDREN)
+    results.put(result)
+
+
+def run_scenario(name, corpus, workdir, workers=None, timeout=SCENARIO_TIMEOUT):
+    """Executa um cenário num processo novo, para o pico de RSS ser só dele
+
+    Se o processo morrer sem entregar o resultado (falta de memória, falha
+    num codec) ou passar de `timeout` segundos, o cenário sai com 'error'.
+    """
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    process = context.Process(target=_run_scenario, args=(name, corpus, workdir, workers, results))
+    process.start()
+    result = _wait_result(process, results, timeout)
+    process.join()
+    return result
+
+
+def _wait_result(process, results, timeout):
+    """Resultado enviado pelo processo, ou {'error'} se ele terminar sem enviar ou estourar o tempo"""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return results.get(timeout=1)
+        except queue.Empty:
+            pass
+        if not process.is_alive():
+            # O resultado pode ter chegado junto com o fim do processo
+            try:
+                return results.get(timeout=1)
+            except queue.Empty:
+                return {'error': f"O processo do cenário terminou sem resultado (código {process.exitcode})"}
+        if time.monotonic() > deadline:
+            process.terminate()
+            return {'error': f"O cenário passou de {timeout} s e foi encerrado"}
+
+
+def build_corpus(workdir, images=20, image_size=(1920, 1080), audio=4, audio_seconds=30,
+                 videos=2, video_seconds=10, ffmpeg=True):
+    """Gera (ou reaproveita, se já existir com os mesmos parâmetros) os corpora sintéticos
+
+    Cada tipo de mídia tem a própria marca de concluído; sem `ffmpeg`, áudios
+    e vídeos ficam vazios e são gerados na primeira execução com o FFmpeg.
+    """
+    corpus_dir = os.path.join(workdir, 'corpus', f'i{images}-{image_size[0]}x{image_size[1]}'
+                                                 f'-a{audio}x{audio_seconds}-v{videos}x{video_seconds}')
+    makers = {
+        'images': lambda directory: make_image_corpus(directory, images, image_size),
+        'audio': lambda directory: make_audio_corpus(directory, audio, audio_seconds),
+        'videos': lambda directory: make_video_corpus(directory, videos, video_seconds),
+    }
+    corpus = {}
+    for media_type, make in makers.items():
+        directory = os.path.join(corpus_dir, media_type)
+        marker = os.path.join(corpus_dir, f'.{media_type}.complete')
+        if not os.path.exists(marker) and (media_type == 'images' or ffmpeg):
+            shutil.rmtree(directory, ignore_errors=True)
+            make(directory)
+            open(marker, 'w').close()
+
+        corpus[media_type] = []
+        if os.path.exists(marker):
+            corpus[media_type] = sorted(os.path.join(directory, name) for name in os.listdir(directory))
+    return corpus
+
+
+def run_benchmarks(workdir, scenarios=SCENARIOS, workers=None, on_result=None, **corpus_options):
+    """Gera os corpora, executa os cenários e retorna o relatório completo
+
+    on_result(nome, resultado) é chamado ao fim de cada cenário.
+    """
+    has_ffmpeg = find_executable('ffmpeg') is not None
+    corpus = build_corpus(workdir, ffmpeg=has_ffmpeg, **corpus_options)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'workers': workers,
+            'ffmpeg': has_ffmpeg,
+            'corpus': {media_type: len(files) for media_type, files in corpus.items()},
+            'options': corpus_options,
+        },
+        'scenarios': {},
+    }
+    for name in scenarios:
+        if name in FFMPEG_SCENARIOS and not has_ffmpeg:
+            result = {'skipped': "FFmpeg não encontrado"}
+        else:
+            result = run_scenario(name, corpus, workdir, workers)
+        report['scenarios'][name] = result
+        if on_result:
+            on_result(name, result)
+    return report
+
+
+def compare(previous, current):
+    """Razão de vazão (atual / anterior) de cada medida presente nos dois relatórios"""
+    ratios = {}
+
+    def walk(prefix, old, new):
+        if not isinstance(old, dict) or not isinstance(new, dict):
+            return
+        if old.get('items_per_sec') and new.get('items_per_sec'):
+            ratios[prefix] = new['items_per_sec'] / old['items_per_sec']
+            return
+        for key in new:
+            walk(f'{prefix}.{key}' if prefix else key, old.get(key), new[key])
+
+    walk('', previous.get('scenarios', {}), current.get('scenarios', {}))
+    return ratios
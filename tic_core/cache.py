@@ -0,0 +1,41 @@
+"""Pastas e chaves dos caches persistentes do MediaTools Pro"""
+import hashlib
+import os
+
+
+def cache_root():
+    """Pasta raiz dos caches (LOCALAPPDATA no Windows, ~/.cache nos demais)"""
+    base = os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_CACHE_HOME') or os.path.expanduser("~/.cache")
+    return os.path.join(base, 'MediaToolsPro')
+
+
+def cache_dir(name):
+    """Subpasta de cache com o nome indicado, criada se necessário"""
+    path = os.path.join(cache_root(), name)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def file_signature(path):
+    """Identifica a versão de um arquivo: (caminho absoluto, mtime em ns, tamanho)"""
+    stat = os.stat(path)
+    return os.path.abspath(path), stat.st_mtime_ns, stat.st_size
+
+
+def cache_key(*parts):
+    """Chave estável (hex) para um conjunto de valores"""
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+
+def content_hasher():
+    """Objeto de hash usado para o conteúdo dos arquivos (atualizável em fluxo)"""
+    return hashlib.blake2b(digest_size=20)
+
+
+def file_hash(path, chunk_size=1024 * 1024):
+    """Hash (BLAKE2b, hex) do conteúdo do arquivo, lido em blocos"""
+    digest = content_hasher()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,467 @@
+"""Interface de linha de comando do MediaTools Pro (sem tkinter)
+
+Uso:
+    python -m tic_core convert FOTOS/ "*.png" --format WEBP --jobs 8
+    python -m tic_core adjust FOTOS/ --adjust rotate --adjust brightness
+    python -m tic_core convert FOTOS/ --format WEBP --preset fast
+    python -m tic_core convert FOTOS/ --format AVIF --compare-presets --sample 5
+    python -m tic_core convert VIDEOS/ --type videos --format MKV --jobs 2
+    python -m tic_core convert MUSICAS/ --type audio --format OGG --bitrate 160
+    python -m tic_core download URL [URL ...] --type videos --quality 720p
+    python -m tic_core formats URL
+    python -m tic_core rename ARQUIVO NOVO_NOME
+    python -m tic_core dedupe MediaTools_Images/ --recursive --apply
+    python -m tic_core bench --images 50 --output resultado.json --compare anterior.json
+    python -m tic_core --metrics tempos.jsonl --profile convert FOTOS/ --format WEBP
+
+O progresso é emitido em stdout como JSON, um objeto por linha.
+"""
+import argparse
+import json
+import os
+import sys
+
+from tic_core.dedupe import iter_deduplicated
+from tic_core.files import collect_files, rename_file
+from tic_core.adjustments import OPERATIONS
+from tic_core.formats import (SUPPORTED_FORMATS, INPUT_EXTENSIONS, DEFAULT_PRESET, PRESET_LABELS,
+                              default_download_folders)
+
+
+def emit(event, **data):
+    """Escreve um evento JSON em stdout"""
+    print(json.dumps({'event': event, **data}, ensure_ascii=False), flush=True)
+
+
+def incremental_plan(args, files, output_dir, extension, **settings):
+    """Com --incremental, separa os arquivos já em dia segundo o manifesto da pasta de saída
+
+    Retorna (arquivos a converter, arquivos pulados, função que registra um
+    resultado bem-sucedido no manifesto).
+    """
+    if not args.incremental:
+        return files, [], lambda result: None
+
+    from tic_core.manifest import ConversionManifest, settings_key
+
+    manifest = ConversionManifest(output_dir)
+    key = settings_key(**settings)
+    pending, skipped = manifest.split(files, output_dir, extension, key)
+    return pending, skipped, lambda result: manifest.record(result['file'], key, result['output'])
+
+
+def cmd_convert(args):
+    """Converte imagens (ou vídeos e áudios, com --type) em lote"""
+    media_type = getattr(args, 'type', 'images')
+    files = collect_files(args.inputs, INPUT_EXTENSIONS[media_type], recursive=args.recursive)
+    output_dir = args.output or default_download_folders()[media_type]
+    os.makedirs(output_dir, exist_ok=True)
+
+    if media_type == 'videos':
+        return convert_videos(args, files, output_dir)
+    if media_type == 'audio':
+        return convert_audio(args, files, output_dir)
+
+    from tic_core.images import iter_convert_batch
+
+    # 'adjust' mantém o formato de cada arquivo e só aplica os ajustes
+    format_name = args.format.upper() if args.command == 'convert' else None
+    extension = SUPPORTED_FORMATS['images'][format_name] if format_name else None
+    total = len(files)
+    if args.compare_presets:
+        return compare_image_presets(args, files, format_name)
+
+    files, skipped, record = incremental_plan(args, files, output_dir, extension, type='images',
+                                              format=format_name, quality=args.quality, adjustments=args.adjust,
+                                              preset=args.preset)
+
+    emit('start', command=args.command, total=total, skipped=len(skipped), output_dir=output_dir)
+
+    converted_count = 0
+    failed_count = 0
+    files_per_sec = 0.0
+    memory_budget = args.memory_budget * 1024 * 1024 if args.memory_budget else None
+    convert = lambda batch: iter_convert_batch(batch, output_dir, format_name, extension, args.quality, args.jobs,
+                                               adjustments=args.adjust, memory_budget=memory_budget,
+                                               preset=args.preset)
+    for result in iter_deduplicated(files, output_dir, extension, convert):
+        if result['error']:
+            failed_count += 1
+        else:
+            converted_count += 1
+            record(result)
+        files_per_sec = result['files_per_sec']
+        emit('progress', **result)
+
+    emit('summary', command=args.command, total=total, converted=converted_count, skipped=len(skipped),
+         failed=failed_count, files_per_sec=files_per_sec)
+    return 0 if failed_count == 0 else 1
+
+
+def compare_image_presets(args, files, format_name):
+    """Mede tempo de codificação x tamanho de cada preset numa amostra, sem converter"""
+    from tic_core.benchmark import compare_presets
+
+    emit('start', command='compare-presets', total=len(files), sample=args.sample)
+    results = compare_presets(files, format_name, args.quality, args.sample, args.adjust)
+    for preset, result in results.items():
+        emit('preset', preset=preset, format=format_name, **result)
+    emit('summary', command='compare-presets', fastest=min(results, key=lambda name: results[name]['seconds']),
+         smallest=min(results, key=lambda name: results[name]['bytes']))
+    return 0
+
+
+def convert_videos(args, files, output_dir):
+    """Converte vídeos com FFmpeg, emitindo percentual e velocidade de cada um"""
+    from tic_core.video import iter_convert_videos
+
+    format_name = args.format.upper()
+    extension = SUPPORTED_FORMATS['videos'][format_name]
+    total = len(files)
+    files, skipped, record = incremental_plan(args, files, output_dir, extension, type='videos', format=format_name)
+    emit('start', command='convert', type='videos', total=total, skipped=len(skipped), output_dir=output_dir)
+
+    def progress(file_path, percent, speed):
+        emit('file_progress', file=file_path, percent=percent, speed=speed)
+
+    converted_count = 0
+    failed_count = 0
+    convert = lambda batch: iter_convert_videos(batch, output_dir, format_name, extension, args.jobs,
+                                                on_progress=progress)
+    for result in iter_deduplicated(files, output_dir, extension, convert):
+        if result['error']:
+            failed_count += 1
+        else:
+            converted_count += 1
+            record(result)
+        emit('progress', **result)
+
+    emit('summary', command='convert', type='videos', total=total, converted=converted_count,
+         skipped=len(skipped), failed=failed_count)
+    return 0 if failed_count == 0 else 1
+
+
+def convert_audio(args, files, output_dir):
+    """Converte áudios com FFmpeg, informando o fator de tempo real de cada um e do lote"""
+    from tic_core.audio import iter_convert_audio
+
+    format_name = args.format.upper()
+    extension = SUPPORTED_FORMATS['audio'][format_name]
+    total = len(files)
+    files, skipped, record = incremental_plan(args, files, output_dir, extension, type='audio', format=format_name,
+                                              bitrate=args.bitrate)
+    emit('start', command='convert', type='audio', total=total, skipped=len(skipped), output_dir=output_dir)
+
+    converted_count = 0
+    copied_count = 0
+    failed_count = 0
+    realtime = None
+    convert = lambda batch: iter_convert_audio(batch, output_dir, format_name, extension, args.bitrate, args.jobs)
+    for result in iter_deduplicated(files, output_dir, extension, convert):
+        if result['error']:
+            failed_count += 1
+        else:
+            converted_count += 1
+            copied_count += result['copied']
+            record(result)
+        realtime = result['total_realtime']
+        emit('progress', **result)
+
+    emit('summary', command='convert', type='audio', total=total, converted=converted_count,
+         copied=copied_count, skipped=len(skipped), failed=failed_count, realtime=realtime)
+    return 0 if failed_count == 0 else 1
+
+
+def cmd_download(args):
+    """Baixa uma ou mais URLs"""
+    from tic_core.download_queue import DownloadQueue, DONE
+    from tic_core.jobs import JobRunner
+
+    urls = list(args.urls)
+    if args.url_file:
+        with open(args.url_file, encoding='utf-8') as f:
+            urls.extend(line.strip() for line in f if line.strip() and not line.startswith('#'))
+
+    output_dir = args.output or default_download_folders()[args.type]
+    emit('start', command='download', total=len(urls), output_dir=output_dir)
+
+    runner = JobRunner()
+    download_queue = DownloadQueue(runner, {args.type: output_dir}, workers={args.type: args.jobs},
+                                   retries=args.retries)
+    finished = []
+    options = {'quality': args.quality} if args.quality else {}
+    if args.type == 'videos':
+        options['video_format'] = args.video_format
+    if args.chunk_size:
+        options['chunk_size'] = args.chunk_size * 1024
+    if args.type == 'audio':
+        options.update(audio_format=args.audio_format, bitrate=args.bitrate)
+    expected = []
+    expansion_errors = []
+    if args.playlist:
+        # Cada URL é listada e suas entradas entram na fila conforme chegam
+        def on_expanded(url, items, skipped, error):
+            expected.extend(items)
+            if error is not None:
+                expansion_errors.append(url)
+            emit('expanded', url=url, items=len(items), skipped=skipped,
+                 error=str(error) if error is not None else None)
+
+        download_queue.expand(urls, args.type, on_expanded, on_update=finished.append, **options)
+    else:
+        expected.extend(download_queue.add(urls, args.type, on_update=finished.append, **options))
+
+    # Consome os eventos do agendador até todos os itens terminarem
+    while len(finished) < len(expected) or download_queue.expanding(args.type):
+        event = runner.events.get()
+        job = event['job']
+        before = len(finished)
+        if event['type'] == 'progress' and event.get('transfer'):
+            emit('transfer', url=event['item'].url, **event['transfer'])
+            continue
+        if event['type'] in ('done', 'cancelled') and job.on_done:
+            job.on_done(event['result'])
+        elif event['type'] == 'error' and job.on_error:
+            job.on_error(event['error'])
+        else:
+            continue
+
+        if len(finished) == before:
+            continue  # listagem de playlist
+        item = finished[-1]
+        emit('progress', url=item.url, state=item.state, attempts=item.attempts, output=item.output,
+             error=item.error, done=len(finished), total=len(expected))
+    runner.shutdown()
+
+    downloaded = sum(1 for item in finished if item.state == DONE)
+    emit('summary', command='download', total=len(expected), downloaded=downloaded,
+         failed=len(expected) - downloaded + len(expansion_errors))
+    return 0 if downloaded == len(expected) and not expansion_errors else 1
+
+
+def cmd_formats(args):
+    """Lista os formatos disponíveis em uma URL, sem baixar"""
+    from tic_core.downloads import probe_formats
+
+    try:
+        result = probe_formats(args.url, refresh=args.refresh)
+    except Exception as e:
+        emit('error', command='formats', url=args.url, error=str(e))
+        return 1
+
+    for f in result['formats']:
+        emit('format', **f)
+    emit('summary', command='formats', url=args.url, title=result['title'], duration=result['duration'],
+         total=len(result['formats']))
+    return 0
+
+
+def cmd_rename(args):
+    """Renomeia um arquivo mantendo pasta e extensão"""
+    try:
+        new_path = rename_file(args.file, args.new_name)
+    except (OSError, ValueError) as e:
+        emit('error', command='rename', file=args.file, error=str(e))
+        return 1
+
+    emit('summary', command='rename', file=args.file, output=new_path)
+    return 0
+
+
+def cmd_dedupe(args):
+    """Procura arquivos idênticos nas pastas e, com --apply, troca as cópias por links"""
+    from tic_core.dedupe import find_duplicates, iter_folder_files, link_duplicates
+
+    files = list(iter_folder_files(args.folders, recursive=args.recursive))
+    emit('start', command='dedupe', files=len(files))
+
+    groups = find_duplicates(files, args.jobs)
+    for group in groups:
+        emit('duplicates', kept=group[0], copies=group[1:], size=os.path.getsize(group[0]))
+
+    summary = {'linked': 0, 'failed': 0, 'bytes': 0}
+    if args.apply:
+        summary = link_duplicates(groups)
+    emit('summary', command='dedupe', files=len(files), groups=len(groups),
+         copies=sum(len(group) - 1 for group in groups), applied=args.apply, **summary)
+    return 0 if summary['failed'] == 0 else 1
+
+
+def cmd_bench(args):
+    """Executa os benchmarks e grava o relatório JSON"""
+    import tempfile
+
+    from tic_core.benchmark import SCENARIOS, compare, run_benchmarks
+
+    scenarios = args.only.split(',') if args.only else list(SCENARIOS)
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        raise ValueError(f"Cenários desconhecidos: {', '.join(unknown)} (opções: {', '.join(SCENARIOS)})")
+
+    width, _, height = args.size.partition('x')
+    workdir = args.workdir or os.path.join(tempfile.gettempdir(), 'mediatools-bench')
+    emit('start', command='bench', scenarios=scenarios, workdir=workdir)
+
+    report = run_benchmarks(workdir, scenarios, args.jobs,
+                            on_result=lambda name, result: emit('scenario', name=name, **result),
+                            images=args.images, image_size=(int(width), int(height)),
+                            audio=args.audio, audio_seconds=args.audio_seconds,
+                            videos=args.videos, video_seconds=args.video_seconds)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            report['comparison'] = compare(json.load(f), report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    emit('summary', command='bench', output=args.output, comparison=report.get('comparison'))
+    failed = [name for name, result in report['scenarios'].items() if 'error' in result]
+    return 0 if not failed else 1
+
+
+def build_parser():
+    """Monta o parser de argumentos com os subcomandos"""
+    parser = argparse.ArgumentParser(prog='tic', description="MediaTools Pro em linha de comando")
+    parser.add_argument('--metrics', help="Grava os tempos de cada operação neste arquivo (JSON lines)")
+    parser.add_argument('--profile', action='store_true',
+                        help="Captura cProfile e tracemalloc do comando (imagens são convertidas sem processos)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    convert = subparsers.add_parser('convert', help="Converte imagens em lote")
+    convert.add_argument('inputs', nargs='+', help="Arquivos, pastas ou padrões glob")
+    convert.add_argument('--type', default='images', choices=['images', 'videos', 'audio'], help="Tipo de mídia")
+    convert.add_argument('--format', default=None, type=str.upper,
+                         help="Formato de saída (padrão: JPEG, MP4 ou MP3, conforme o tipo)")
+    convert.add_argument('--quality', type=int, default=90, help="Qualidade (JPEG/WEBP), de 1 a 100")
+    convert.add_argument('--bitrate', type=int, default=192, help="Taxa de bits de áudio em kbps")
+    convert.add_argument('--output', help="Pasta de saída")
+    convert.add_argument('--jobs', '-j', type=int, default=None, help="Processos em paralelo (padrão: núcleos)")
+    convert.add_argument('--memory-budget', type=int, default=None,
+                        help="Memória máxima (MB) das conversões de imagem simultâneas (padrão: metade da RAM)")
+    convert.add_argument('--recursive', '-r', action='store_true', help="Percorre subpastas")
+    convert.add_argument('--incremental', action='store_true',
+                         help="Pula arquivos já convertidos com a mesma configuração (manifesto na pasta de saída)")
+    convert.add_argument('--adjust', action='append', default=[], choices=OPERATIONS,
+                         help="Ajuste aplicado a todos os arquivos (pode repetir, na ordem)")
+    convert.add_argument('--preset', default=DEFAULT_PRESET, choices=list(PRESET_LABELS),
+                        help="Preset do codificador de imagens: velocidade x tamanho do arquivo")
+    convert.add_argument('--compare-presets', action='store_true',
+                        help="Só mede tempo e tamanho de cada preset numa amostra dos arquivos")
+    convert.add_argument('--sample', type=int, default=8, help="Arquivos da amostra de --compare-presets")
+    convert.set_defaults(func=cmd_convert)
+
+    adjust = subparsers.add_parser('adjust', help="Aplica ajustes em lote mantendo o formato")
+    adjust.add_argument('inputs', nargs='+', help="Arquivos, pastas ou padrões glob")
+    adjust.add_argument('--adjust', action='append', required=True, choices=OPERATIONS,
+                        help="Ajuste aplicado a todos os arquivos (pode repetir, na ordem)")
+    adjust.add_argument('--quality', type=int, default=90, help="Qualidade (JPEG/WEBP), de 1 a 100")
+    adjust.add_argument('--output', help="Pasta de saída")
+    adjust.add_argument('--jobs', '-j', type=int, default=None, help="Processos em paralelo (padrão: núcleos)")
+    adjust.add_argument('--memory-budget', type=int, default=None,
+                        help="Memória máxima (MB) das conversões de imagem simultâneas (padrão: metade da RAM)")
+    adjust.add_argument('--recursive', '-r', action='store_true', help="Percorre subpastas")
+    adjust.add_argument('--incremental', action='store_true',
+                        help="Pula arquivos já ajustados com a mesma configuração (manifesto na pasta de saída)")
+    adjust.add_argument('--preset', default=DEFAULT_PRESET, choices=list(PRESET_LABELS),
+                        help="Preset do codificador de imagens: velocidade x tamanho do arquivo")
+    adjust.add_argument('--compare-presets', action='store_true',
+                        help="Só mede tempo e tamanho de cada preset numa amostra dos arquivos")
+    adjust.add_argument('--sample', type=int, default=8, help="Arquivos da amostra de --compare-presets")
+    adjust.set_defaults(func=cmd_convert)
+
+    download = subparsers.add_parser('download', help="Baixa mídias de URLs")
+    download.add_argument('urls', nargs='*', help="URLs a baixar")
+    download.add_argument('--url-file', help="Arquivo com uma URL por linha")
+    download.add_argument('--type', default='images', choices=['images', 'videos', 'audio'],
+                          help="Tipo de mídia")
+    download.add_argument('--quality', default=None, help="Qualidade de vídeo (ex.: 720p)")
+    download.add_argument('--video-format', default='MP4', choices=sorted(SUPPORTED_FORMATS['videos']),
+                          help="Contêiner dos vídeos baixados")
+    download.add_argument('--audio-format', default='MP3', choices=sorted(SUPPORTED_FORMATS['audio']),
+                          help="Formato dos áudios baixados")
+    download.add_argument('--bitrate', type=int, default=192, help="Taxa de bits dos áudios baixados (kbps)")
+    download.add_argument('--output', help="Pasta de saída")
+    download.add_argument('--jobs', '-j', type=int, default=4, help="Downloads simultâneos")
+    download.add_argument('--retries', type=int, default=2, help="Novas tentativas por URL")
+    download.add_argument('--playlist', action='store_true',
+                          help="Baixa todos os itens de playlists/canais, pulando os já baixados")
+    download.add_argument('--chunk-size', type=int, default=None,
+                          help="Tamanho do bloco de leitura em KB (padrão: 256)")
+    download.set_defaults(func=cmd_download)
+
+    formats = subparsers.add_parser('formats', help="Lista os formatos disponíveis em uma URL, sem baixar")
+    formats.add_argument('url', help="URL do vídeo ou áudio")
+    formats.add_argument('--refresh', action='store_true', help="Ignora a extração guardada em cache")
+    formats.set_defaults(func=cmd_formats)
+
+    rename = subparsers.add_parser('rename', help="Renomeia um arquivo")
+    rename.add_argument('file', help="Arquivo a renomear")
+    rename.add_argument('new_name', help="Novo nome (sem extensão)")
+    rename.set_defaults(func=cmd_rename)
+
+    dedupe = subparsers.add_parser('dedupe', help="Encontra arquivos idênticos e os troca por links")
+    dedupe.add_argument('folders', nargs='+', help="Pastas a verificar")
+    dedupe.add_argument('--recursive', '-r', action='store_true', help="Percorre subpastas")
+    dedupe.add_argument('--jobs', '-j', type=int, default=None, help="Arquivos lidos em paralelo")
+    dedupe.add_argument('--apply', action='store_true',
+                        help="Troca as cópias por links físicos (sem esta opção, só lista)")
+    dedupe.set_defaults(func=cmd_dedupe)
+
+    bench = subparsers.add_parser('bench', help="Mede conversão, preview e download com corpora sintéticos")
+    bench.add_argument('--only', help="Cenários separados por vírgula (padrão: todos)")
+    bench.add_argument('--images', type=int, default=20, help="Imagens no corpus")
+    bench.add_argument('--size', default='1920x1080', help="Dimensões das imagens (LARGURAxALTURA)")
+    bench.add_argument('--audio', type=int, default=4, help="Áudios no corpus")
+    bench.add_argument('--audio-seconds', type=int, default=30, help="Duração de cada áudio")
+    bench.add_argument('--videos', type=int, default=2, help="Vídeos no corpus")
+    bench.add_argument('--video-seconds', type=int, default=10, help="Duração de cada vídeo")
+    bench.add_argument('--jobs', '-j', type=int, default=None, help="Processos/downloads em paralelo")
+    bench.add_argument('--workdir', help="Pasta dos corpora e saídas (padrão: pasta temporária)")
+    bench.add_argument('--output', help="Arquivo JSON com o relatório")
+    bench.add_argument('--compare', help="Relatório anterior para comparar a vazão")
+    bench.set_defaults(func=cmd_bench)
+
+    return parser
+
+
+DEFAULT_FORMATS = {'images': 'JPEG', 'videos': 'MP4', 'audio': 'MP3'}
+
+
+def main(argv=None):
+    """Ponto de entrada da linha de comando"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.command == 'convert':
+        args.format = args.format or DEFAULT_FORMATS[args.type]
+        if args.format not in SUPPORTED_FORMATS[args.type]:
+            parser.error(f"formato inválido para {args.type}: {args.format} "
+                         f"(opções: {', '.join(SUPPORTED_FORMATS[args.type])})")
+    # O cProfile só enxerga a thread atual: com perfil, as imagens são convertidas nela
+    if args.profile and args.command in ('convert', 'adjust') and getattr(args, 'type', 'images') == 'images':
+        args.jobs = 0
+
+    try:
+        if args.profile:
+            from tic_core.metrics import profile_capture
+
+            with profile_capture(args.command) as capture:
+                status = args.func(args)
+            emit('profile', directory=capture['directory'])
+        else:
+            status = args.func(args)
+    except Exception as e:
+        emit('error', command=args.command, error=str(e))
+        status = 1
+
+    if args.metrics:
+        from tic_core.metrics import metrics
+
+        emit('metrics', output=args.metrics, events=metrics.export_jsonl(args.metrics),
+             summary=metrics.summary())
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
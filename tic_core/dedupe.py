@@ -0,0 +1,279 @@
+"""Deduplicação por conteúdo: arquivos idênticos são guardados uma vez e os demais viram links"""
+import json
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from tic_core.cache import file_hash
+
+# Índice (por pasta) com o hash do conteúdo de cada arquivo guardado; cada
+# linha é um registro JSON e o último registro de um hash prevalece
+HASH_INDEX_FILE = '.mediatools_hashes.jsonl'
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def default_hash_workers():
+    """Arquivos lidos e resumidos ao mesmo tempo (o hash libera o GIL)"""
+    return min(8, os.cpu_count() or 1)
+
+
+def link_file(source, target):
+    """Substitui `target` por um link físico para `source` (troca atômica)"""
+    tmp_path = target + '.link'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    os.link(source, tmp_path)
+    os.replace(tmp_path, target)
+
+
+def link_or_copy(source, target):
+    """Cria `target` com o conteúdo de `source`: link físico se possível, senão cópia"""
+    try:
+        link_file(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+def same_file(path, other):
+    """Indica se os dois caminhos já apontam para o mesmo arquivo (mesmo inode)"""
+    try:
+        return os.path.samefile(path, other)
+    except OSError:
+        return False
+
+
+class ContentIndex:
+    """Hash do conteúdo -> arquivo guardado na pasta
+
+    Um arquivo novo cujo conteúdo já existe na pasta com outro nome é trocado
+    por um link físico para o existente; se o sistema de arquivos não permitir
+    links, a cópia nova é descartada e o caminho existente é usado no lugar.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.path = os.path.join(directory, HASH_INDEX_FILE)
+        self._records = {}
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        self._records[record['hash']] = record
+                    except (ValueError, KeyError):
+                        continue
+        except OSError:
+            pass
+
+    def find(self, digest, size, exclude=None):
+        """Arquivo guardado com este conteúdo (ignorando `exclude`); None se não houver
+
+        Se o arquivo foi modificado depois de registrado (outra data de
+        modificação), o hash é recalculado; se o conteúdo mudou, o registro
+        vencido é descartado.
+        """
+        record = self._records.get(digest)
+        if record is None:
+            return None
+        path = os.path.join(self.directory, record['file'])
+        if exclude and os.path.abspath(path) == os.path.abspath(exclude):
+            return None
+        try:
+            stat = os.stat(path)
+            if stat.st_size != size:
+                return None
+            if stat.st_mtime_ns != record.get('mtime_ns'):
+                if file_hash(path) != digest:
+                    del self._records[digest]
+                    return None
+                self._append(path, digest, size)
+        except OSError:
+            return None
+        return path
+
+    def _append(self, path, digest, size):
+        record = {'hash': digest, 'file': os.path.relpath(path, self.directory), 'size': size,
+                  'mtime_ns': os.stat(path).st_mtime_ns}
+        self._records[digest] = record
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def add(self, path, digest=None):
+        """Registra o arquivo, se o conteúdo dele ainda não estiver no índice"""
+        digest = digest or file_hash(path)
+        size = os.path.getsize(path)
+        with self._lock:
+            if self.find(digest, size) is None:
+                self._append(path, digest, size)
+        return digest
+
+    def store(self, path, digest=None):
+        """Registra um arquivo recém-gravado; retorna o caminho que guarda o conteúdo
+
+        Se já houver um arquivo idêntico, `path` passa a ser um link para ele
+        (e é retornado) ou, sem suporte a links, é removido e o caminho
+        existente é retornado.
+        """
+        digest = digest or file_hash(path)
+        size = os.path.getsize(path)
+        with self._lock:
+            existing = self.find(digest, size, exclude=path)
+            if existing is None:
+                self._append(path, digest, size)
+                return path
+
+        if same_file(existing, path):
+            return path
+        try:
+            link_file(existing, path)
+            return path
+        except OSError:
+            os.remove(path)
+            return existing
+
+
+def content_index(directory):
+    """Índice de conteúdo da pasta, carregado uma vez e compartilhado entre threads"""
+    key = os.path.abspath(directory)
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = ContentIndex(directory)
+        return _indexes[key]
+
+
+def hash_files(paths, workers=None, should_stop=None, on_progress=None):
+    """Calcula o hash de vários arquivos em paralelo; retorna {caminho: hash}
+
+    Arquivos ilegíveis ficam de fora. on_progress(feitos, total) é chamado a
+    cada arquivo concluído.
+    """
+    paths = list(paths)
+    digests = {}
+    if not paths:
+        return digests
+
+    workers = max(1, min(workers or default_hash_workers(), len(paths)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='tic-hash') as executor:
+        futures = {executor.submit(file_hash, path): path for path in paths}
+        for done, future in enumerate(as_completed(futures), 1):
+            if should_stop and should_stop():
+                for pending in futures:
+                    pending.cancel()
+                break
+            try:
+                digests[futures[future]] = future.result()
+            except OSError:
+                pass
+            if on_progress:
+                on_progress(done, len(paths))
+    return digests
+
+
+def find_duplicates(paths, workers=None, should_stop=None, on_progress=None):
+    """Agrupa os arquivos de conteúdo idêntico
+
+    Só arquivos com o mesmo tamanho de outro são lidos, e caminhos que já são
+    links para o mesmo arquivo contam uma vez. Retorna uma lista de grupos
+    (listas de caminhos), cada um com o arquivo mais antigo primeiro.
+    """
+    by_size = {}
+    seen = set()
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        if (stat.st_dev, stat.st_ino) in seen and stat.st_ino:
+            continue
+        seen.add((stat.st_dev, stat.st_ino))
+        by_size.setdefault(stat.st_size, []).append(path)
+
+    candidates = [path for group in by_size.values() if len(group) > 1 for path in group]
+    digests = hash_files(candidates, workers, should_stop, on_progress)
+
+    by_hash = {}
+    for path in candidates:
+        if path in digests:
+            by_hash.setdefault(digests[path], []).append(path)
+    return [sorted(group, key=os.path.getmtime) for group in by_hash.values() if len(group) > 1]
+
+
+def link_duplicates(groups):
+    """Troca as cópias de cada grupo por links para o primeiro arquivo
+
+    Retorna {'linked', 'failed', 'bytes'} (bytes liberados).
+    """
+    summary = {'linked': 0, 'failed': 0, 'bytes': 0}
+    for kept, *copies in groups:
+        for path in copies:
+            try:
+                size = os.path.getsize(path)
+                link_file(kept, path)
+            except OSError as e:
+                summary['failed'] += 1
+                print(f"Erro ao vincular {path}: {str(e)}")
+                continue
+            summary['linked'] += 1
+            summary['bytes'] += size
+    return summary
+
+
+def split_duplicates(files, workers=None):
+    """Separa os arquivos de um lote em (únicos, {duplicado: original})"""
+    originals = {}
+    for group in find_duplicates(files, workers):
+        for path in group[1:]:
+            originals[path] = group[0]
+
+    unique = [path for path in files if path not in originals]
+    return unique, originals
+
+
+def iter_deduplicated(files, output_dir, extension, convert, workers=None):
+    """Converte só um arquivo de cada conteúdo e replica a saída nos duplicados
+
+    `convert(arquivos)` deve produzir os resultados da conversão (como
+    iter_convert_batch). Para cada origem idêntica a outra do lote, a saída
+    convertida é ligada (ou copiada) para o nome esperado da cópia. Os
+    contadores 'done' e 'total' dos resultados passam a considerar o lote todo.
+    """
+    from tic_core.files import build_output_path
+
+    files = list(files)
+    unique, originals = split_duplicates(files, workers)
+    copies = {}
+    for path, original in originals.items():
+        copies.setdefault(original, []).append(path)
+
+    done = 0
+    for result in convert(unique):
+        done += 1
+        yield dict(result, done=done, total=len(files))
+
+        for path in copies.get(result['file'], []):
+            copy = dict(result, file=path, output=None, duplicate_of=result['file'])
+            if not result['error']:
+                output_path = build_output_path(path, output_dir, extension)
+                try:
+                    link_or_copy(result['output'], output_path)
+                    copy['output'] = output_path
+                except OSError as e:
+                    copy['error'] = str(e)
+            done += 1
+            yield dict(copy, done=done, total=len(files))
+
+
+def iter_folder_files(folders, recursive=True):
+    """Arquivos das pastas, sem os índices e arquivos parciais do MediaTools"""
+    for folder in folders:
+        for directory, subdirs, names in os.walk(folder):
+            for name in sorted(names):
+                if name.startswith('.mediatools_') or name.endswith(('.part', '.link')):
+                    continue
+                yield os.path.join(directory, name)
+            if not recursive:
+                break
@@ -0,0 +1,287 @@
+"""Fila de downloads concorrentes com novas tentativas e estado por item"""
+import itertools
+import threading
+
+from tic_core.downloads import download_media, expand_url
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+STATE_LABELS = {
+    QUEUED: "Na fila",
+    RUNNING: "Baixando",
+    DONE: "Concluído",
+    FAILED: "Falhou",
+}
+
+# Downloads simultâneos padrão por tipo de mídia
+DEFAULT_WORKERS = {'images': 4, 'videos': 2, 'audio': 2}
+
+
+class DownloadItem:
+    """Uma URL na fila de downloads"""
+
+    def __init__(self, item_id, url, media_type, options):
+        self.id = item_id
+        self.url = url
+        self.media_type = media_type
+        self.options = options
+        self.state = QUEUED
+        self.attempts = 0
+        self.output = None
+        self.error = None
+        self.progress = None
+        self.transfer = None
+        self.title = None
+
+    def finished(self):
+        """Indica se o item chegou a um estado final"""
+        return self.state in (DONE, FAILED)
+
+
+def _format_bytes(count):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if count < 1024 or unit == 'GB':
+            return f"{count:.0f} {unit}" if unit == 'B' else f"{count:.1f} {unit}"
+        count /= 1024
+
+
+def transfer_percent(status):
+    """Percentual concluído do download (por bytes ou por fragmentos); None se desconhecido"""
+    if status.get('status') == 'finished':
+        return 100
+    if status.get('total_bytes') and status.get('downloaded_bytes') is not None:
+        return min(100, int(status['downloaded_bytes'] * 100 / status['total_bytes']))
+    if status.get('fragment_count') and status.get('fragment_index') is not None:
+        return min(100, int(status['fragment_index'] * 100 / status['fragment_count']))
+    return None
+
+
+def describe_transfer(status):
+    """Texto curto do progresso (ex.: "42% • 12.0 MB de 28.5 MB • 3.1 MB/s • 0:05")"""
+    if not status:
+        return ""
+    if status['phase'] == 'postprocess':
+        return "Pós-processando" if status['status'] != 'finished' else ""
+
+    parts = []
+    percent = transfer_percent(status)
+    if percent is not None:
+        parts.append(f"{percent}%")
+    if status.get('downloaded_bytes') is not None:
+        size = _format_bytes(status['downloaded_bytes'])
+        if status.get('total_bytes'):
+            size += f" de {_format_bytes(status['total_bytes'])}"
+        parts.append(size)
+    if status.get('speed'):
+        parts.append(f"{_format_bytes(status['speed'])}/s")
+    if status.get('eta') is not None and status['status'] == 'downloading':
+        minutes, seconds = divmod(int(status['eta']), 60)
+        parts.append(f"{minutes}:{seconds:02d}")
+    if status.get('fragment_count'):
+        parts.append(f"frag. {status.get('fragment_index') or 0}/{status['fragment_count']}")
+    return " • ".join(parts)
+
+
+class DownloadCancelled(Exception):
+    """Levantada no aviso de progresso para interromper um download cancelado"""
+
+
+def is_retryable(error):
+    """Erros HTTP 4xx (exceto 408/429) não melhoram com nova tentativa"""
+    response = getattr(error, 'response', None)
+    status = getattr(response, 'status_code', None)
+    if status and 400 <= status < 500 and status not in (408, 429):
+        return False
+    return True
+
+
+class DownloadQueue:
+    """Distribui downloads entre workers do JobRunner, um grupo por tipo de mídia
+
+    Cada item falho é repetido até `retries` vezes, com espera exponencial
+    (`backoff`, 2x`backoff`, 4x`backoff`...). Cancelar a tarefa de um item
+    interrompe também o download em andamento, no próximo aviso de progresso.
+    A função de download pode ser substituída, o que permite exercitar a fila
+    contra um servidor local.
+    Playlists e canais podem ser expandidos em um item por entrada (`expand`).
+    """
+
+    def __init__(self, runner, download_folders, workers=None, retries=2, backoff=1.0,
+                 download_func=download_media, expand_func=expand_url):
+        self.runner = runner
+        self.download_folders = download_folders
+        self.retries = retries
+        self.backoff = backoff
+        self.download_func = download_func
+        self.expand_func = expand_func
+        self._items = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._expanding = {}
+
+        for media_type, count in dict(DEFAULT_WORKERS, **(workers or {})).items():
+            self.set_workers(media_type, count)
+
+    def set_workers(self, media_type, count):
+        """Define quantos downloads do tipo de mídia rodam ao mesmo tempo"""
+        self.runner.configure_pool(f'download-{media_type}', count)
+
+    def workers(self, media_type):
+        """Downloads simultâneos configurados para o tipo de mídia"""
+        return self.runner.pool_size(f'download-{media_type}')
+
+    def add(self, urls, media_type, on_update=None, **options):
+        """Enfileira URLs e retorna os itens criados
+
+        on_update(item) é chamado pela thread que consome os eventos do
+        JobRunner sempre que o item termina (com sucesso ou falha).
+        """
+        items = []
+        for url in urls:
+            item = DownloadItem(next(self._ids), url, media_type, options)
+            with self._lock:
+                self._items.append(item)
+            self.runner.submit(self._run_item, item,
+                               name="Download",
+                               pool=f'download-{media_type}',
+                               on_done=lambda result, item=item: self._item_done(item, result, on_update),
+                               on_error=lambda error, item=item: on_update and on_update(item))
+            items.append(item)
+        return items
+
+    def _item_done(self, item, result, on_update):
+        if result is None and not item.finished():
+            # Cancelado antes de algum worker pegar o item: _run_item nem rodou
+            item.state = FAILED
+            item.error = "Cancelado"
+        if on_update:
+            on_update(item)
+
+    def expand(self, urls, media_type, on_expanded=None, on_update=None, **options):
+        """Enfileira todos os itens de playlists/canais
+
+        Cada URL é listada em segundo plano e as entradas viram itens comuns
+        da fila, com o histórico da pasta ativado para não baixar de novo o
+        que já foi baixado. on_expanded(url, itens, pulados, erro) é chamado
+        pela thread que consome os eventos quando a listagem termina.
+        """
+        for url in urls:
+            with self._lock:
+                self._expanding[media_type] = self._expanding.get(media_type, 0) + 1
+            self._submit_expansion(url, media_type, on_expanded, on_update, options)
+
+    def _submit_expansion(self, url, media_type, on_expanded, on_update, options):
+        def finish(result):
+            if result is None or job.cancelled():
+                # Cancelada: nada da listagem entra na fila, mesmo que ela tenha terminado
+                self._expansion_finished(media_type)
+                if on_expanded:
+                    on_expanded(url, [], 0, "Cancelado")
+                return
+            entries, skipped = result
+            items = self.add([entry['url'] for entry in entries], media_type, on_update,
+                             archive=True, **options)
+            for item, entry in zip(items, entries):
+                item.title = entry.get('title')
+            self._expansion_finished(media_type)
+            if on_expanded:
+                on_expanded(url, items, skipped, None)
+
+        def fail(error):
+            self._expansion_finished(media_type)
+            if on_expanded:
+                on_expanded(url, [], 0, error)
+
+        # finish/fail só rodam na thread que consome os eventos, depois do submit
+        job = self.runner.submit(self._expand_url, url, self.download_folders[media_type],
+                                 name="Listando playlist",
+                                 pool=f'download-{media_type}',
+                                 on_done=finish,
+                                 on_error=fail)
+
+    def _expand_url(self, job, url, output_dir):
+        job.report(0, 1, url)
+        return self.expand_func(url, output_dir)
+
+    def _expansion_finished(self, media_type):
+        with self._lock:
+            self._expanding[media_type] -= 1
+
+    def expanding(self, media_type):
+        """Quantas playlists/canais do tipo de mídia ainda estão sendo listados"""
+        with self._lock:
+            return self._expanding.get(media_type, 0)
+
+    def _run_item(self, job, item):
+        """Executa o download de um item com novas tentativas"""
+        output_dir = self.download_folders[item.media_type]
+
+        def on_progress(status):
+            if job.cancelled():
+                raise DownloadCancelled("Cancelado")
+            # Já chega espaçado pelo ProgressThrottle do download
+            item.transfer = status
+            if status['phase'] == 'download':
+                item.progress = transfer_percent(status)
+            job.report(item.progress or 0, 100, item.title or item.url, item=item, transfer=status)
+
+        for attempt in range(1, self.retries + 2):
+            if job.cancelled():
+                item.state = FAILED
+                item.error = "Cancelado"
+                return item
+
+            item.state = RUNNING
+            item.attempts = attempt
+            item.progress = None
+            item.transfer = None
+            job.report(0, 1, f"{item.url} (tentativa {attempt})", item=item)
+
+            try:
+                item.output = self.download_func(item.url, item.media_type, output_dir,
+                                                 on_progress=on_progress, **item.options)
+                item.state = DONE
+                item.error = None
+                job.report(1, 1, item.url, item=item)
+                return item
+            except Exception as e:
+                if job.cancelled():
+                    # Interrompido pelo aviso de progresso (o yt-dlp pode embrulhar a exceção)
+                    item.state = FAILED
+                    item.error = "Cancelado"
+                    job.report(1, 1, item.url, item=item)
+                    return item
+                item.error = str(e)
+                if attempt > self.retries or not is_retryable(e):
+                    item.state = FAILED
+                    job.report(1, 1, item.url, item=item)
+                    raise
+
+            delay = self.backoff * 2 ** (attempt - 1)
+            item.state = QUEUED
+            job.report(0, 1, f"{item.url} (nova tentativa em {delay:.0f}s)", item=item)
+            if job.wait(delay):
+                item.state = FAILED
+                item.error = "Cancelado"
+                return item
+
+    def items(self, media_type=None):
+        """Itens da fila, opcionalmente filtrados por tipo de mídia"""
+        with self._lock:
+            return [item for item in self._items if media_type is None or item.media_type == media_type]
+
+    def counts(self, media_type=None):
+        """Quantidade de itens em cada estado"""
+        counts = dict.fromkeys(STATE_LABELS, 0)
+        for item in self.items(media_type):
+            counts[item.state] += 1
+        return counts
+
+    def clear_finished(self, media_type=None):
+        """Remove da lista os itens concluídos ou com falha"""
+        with self._lock:
+            self._items = [item for item in self._items
+                           if not item.finished() or (media_type and item.media_type != media_type)]
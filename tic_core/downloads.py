@@ -0,0 +1,662 @@
+"""Download de mídia: imagens por HTTP e vídeos/áudio via yt-dlp"""
+import copy
+import glob
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from tic_core.audio import BITRATE_TOLERANCE, ENCODERS
+from tic_core.cache import content_hasher
+from tic_core.dedupe import content_index
+from tic_core.extraction import extraction_cache
+from tic_core.ffmpeg import find_executable
+from tic_core.formats import SUPPORTED_FORMATS
+from tic_core.metrics import metrics
+from tic_core.video import CONTAINERS, merge_streams
+
+# Tamanho padrão dos blocos lidos da rede (maior que os 8 KB de antes)
+DEFAULT_CHUNK_SIZE = 256 * 1024
+
+# Conexões mantidas abertas por host no pool da sessão
+POOL_SIZE = 16
+
+# Índice (por pasta) com os validadores HTTP de cada URL baixada; cada linha
+# é um registro JSON e o último registro de uma URL prevalece
+VALIDATORS_FILE = '.mediatools_http.jsonl'
+
+# Arquivo de histórico do yt-dlp (um "extrator id" por linha) usado no modo
+# playlist/canal: itens já baixados não são baixados de novo
+ARCHIVE_FILE = '.mediatools_archive.txt'
+
+# Fragmentos (HLS/DASH) baixados ao mesmo tempo por download do yt-dlp
+FRAGMENT_WORKERS = 4
+
+# Para cada formato de áudio: codec pedido ao FFmpegExtractAudio do yt-dlp e
+# prefixo do `acodec` dos streams que ele pode apenas copiar (None se o site
+# nunca oferece o codec, como nos formatos sem perdas)
+AUDIO_DOWNLOAD_CODECS = {
+    'MP3': ('mp3', 'mp3'),
+    'WAV': ('wav', None),
+    'OGG': ('vorbis', 'vorbis'),
+    'AAC': ('aac', 'mp4a'),
+    'FLAC': ('flac', None),
+    'M4A': ('m4a', 'mp4a'),
+}
+
+# Para cada formato de vídeo: contêiner em que os streams de vídeo e áudio
+# baixados são juntados (sem recodificar) e preferência de extensão do yt-dlp
+# entre streams da mesma resolução, para que os codecs caibam no contêiner.
+# Formatos que não comportam os codecs dos sites (AVI, MPEG, GIF) são
+# juntados em MKV e podem ser convertidos depois.
+VIDEO_DOWNLOAD_FORMATS = {
+    'MP4': ('MP4', 'ext:mp4:m4a'),
+    'MOV': ('MOV', 'ext:mp4:m4a'),
+    'WEBM': ('WEBM', 'ext:webm:webm'),
+    'MKV': ('MKV', None),
+}
+
+# Prefixos dos codecs informados pelos sites (RFC 6381 e nomes do yt-dlp) ->
+# nome do codec no FFmpeg, para conferir com CONTAINERS
+STREAM_CODECS = (
+    ('avc', 'h264'), ('h264', 'h264'), ('hev', 'hevc'), ('hvc', 'hevc'), ('h265', 'hevc'),
+    ('vp09', 'vp9'), ('vp9', 'vp9'), ('vp08', 'vp8'), ('vp8', 'vp8'), ('av01', 'av1'), ('av1', 'av1'),
+    ('mp4a', 'aac'), ('aac', 'aac'), ('opus', 'opus'), ('vorbis', 'vorbis'), ('mp3', 'mp3'),
+    ('ac-3', 'ac3'), ('ac3', 'ac3'),
+)
+
+# Intervalo mínimo (s) entre avisos de progresso de um mesmo download: os
+# hooks do yt-dlp disparam a cada bloco recebido
+PROGRESS_INTERVAL = 0.25
+
+_session = None
+_session_lock = threading.Lock()
+_validators = {}
+_validators_lock = threading.Lock()
+_claimed = {}
+
+
+def get_session():
+    """Sessão HTTP compartilhada, com pool de conexões reaproveitadas"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=0)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _session = session
+        return _session
+
+
+def _folder_validators(output_dir):
+    """Índice de validadores da pasta, carregado uma vez e mantido em memória"""
+    key = os.path.abspath(output_dir)
+    if key not in _validators:
+        validators = {}
+        try:
+            with open(os.path.join(output_dir, VALIDATORS_FILE), encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    url = record.pop('url', None)
+                    if record.get('file'):
+                        validators[url] = record
+                    else:
+                        validators.pop(url, None)
+        except OSError:
+            pass
+        _validators[key] = validators
+    return _validators[key]
+
+
+def _get_validators(output_dir, url):
+    """Validadores HTTP conhecidos para a URL (dicionário vazio se nenhum)"""
+    with _validators_lock:
+        return dict(_folder_validators(output_dir).get(url, {}))
+
+
+def _update_validators(output_dir, url, entry):
+    """Registra os validadores de uma URL (entry=None esquece a URL)"""
+    with _validators_lock:
+        validators = _folder_validators(output_dir)
+        if entry is None:
+            validators.pop(url, None)
+            entry = {'file': None}
+        else:
+            validators[url] = dict(entry)
+        with open(os.path.join(output_dir, VALIDATORS_FILE), 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'url': url, **entry}, ensure_ascii=False) + '\n')
+
+
+def _claim_filename(output_dir, url, filename):
+    """Escolhe um nome livre na pasta para a URL: `nome (1).ext`, `nome (2).ext`...
+
+    Um nome está ocupado se já existe (inteiro ou .part), se pertence a outra
+    URL do índice ou se outro download em andamento o reservou.
+    """
+    base_name, extension = os.path.splitext(filename)
+    with _validators_lock:
+        taken = {record.get('file') for other, record in _folder_validators(output_dir).items() if other != url}
+        candidate = filename
+        for number in range(1, 10000):
+            path = os.path.abspath(os.path.join(output_dir, candidate))
+            if _claimed.get(path) == url or (candidate not in taken and path not in _claimed
+                                             and not os.path.exists(path) and not os.path.exists(path + '.part')):
+                break
+            candidate = f"{base_name} ({number}){extension}"
+        _claimed[os.path.abspath(os.path.join(output_dir, candidate))] = url
+    return candidate
+
+
+def _image_filename(url):
+    """Extrai o nome do arquivo da URL"""
+    from urllib.parse import urlparse
+
+    parsed_url = urlparse(url)
+    filename = os.path.basename(parsed_url.path)
+    if not filename:
+        filename = f"image_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jpg"
+    return filename
+
+
+def download_image(url, output_dir, chunk_size=None, session=None, on_progress=None):
+    """Baixa uma imagem da URL e retorna o caminho salvo
+
+    Os bytes são gravados em `<arquivo>.part` e o arquivo final só aparece
+    quando o download termina. Uma tentativa seguinte continua do ponto em que
+    parou (cabeçalho Range, protegido por If-Range), e um arquivo já baixado
+    só é transferido de novo se o servidor indicar que mudou (ETag ou
+    Last-Modified). on_progress(status) recebe o progresso como nos downloads
+    do yt-dlp (ver ProgressThrottle); uma exceção levantada nele interrompe o
+    download, deixando o .part para continuar depois.
+    """
+    session = session or get_session()
+    chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+
+    known = _get_validators(output_dir, url)
+    filename = known.get('file')
+    if not filename:
+        # Outra URL com o mesmo nome de arquivo não sobrescreve o que já foi baixado
+        filename = _image_filename(url)
+        if os.path.exists(os.path.join(output_dir, filename)):
+            content_index(output_dir).add(os.path.join(output_dir, filename))
+        filename = _claim_filename(output_dir, url, filename)
+    output_path = os.path.join(output_dir, filename)
+    part_path = output_path + '.part'
+    validator = known.get('etag') or known.get('last_modified')
+
+    headers = {}
+    resume_from = 0
+    if known.get('complete') and os.path.exists(output_path):
+        # Requisição condicional: 304 significa que o arquivo local está atualizado
+        if known.get('etag'):
+            headers['If-None-Match'] = known['etag']
+        if known.get('last_modified'):
+            headers['If-Modified-Since'] = known['last_modified']
+    elif validator and os.path.exists(part_path):
+        resume_from = os.path.getsize(part_path)
+        headers['Range'] = f'bytes={resume_from}-'
+        headers['If-Range'] = validator
+
+    start = time.perf_counter()
+    with session.get(url, headers=headers, stream=True, timeout=30) as response:
+        if response.status_code == 304:
+            metrics.record('download.http', time.perf_counter() - start, url=url, status=304, bytes=0)
+            return output_path
+
+        if response.status_code == 416 and resume_from:
+            # O .part não corresponde mais ao recurso; recomeça do zero
+            os.remove(part_path)
+            _update_validators(output_dir, url, None)
+            return download_image(url, output_dir, chunk_size, session, on_progress)
+
+        response.raise_for_status()
+
+        mode = 'wb'
+        if response.status_code == 206:
+            if not response.headers.get('Content-Range', '').startswith(f'bytes {resume_from}-'):
+                # Faixa diferente da pedida; descarta o .part e baixa inteiro
+                os.remove(part_path)
+                _update_validators(output_dir, url, None)
+                return download_image(url, output_dir, chunk_size, session, on_progress)
+            mode = 'ab'
+
+        entry = {
+            'file': filename,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'complete': False,
+        }
+        if mode == 'wb':
+            # Registra os validadores antes do corpo para permitir retomar depois
+            _update_validators(output_dir, url, entry)
+
+        # O hash do conteúdo é calculado enquanto os bytes são gravados
+        digest = content_hasher()
+        if mode == 'ab':
+            with open(part_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(chunk_size), b''):
+                    digest.update(chunk)
+
+        received = 0
+        hook = ProgressThrottle(on_progress).download_hook if on_progress else None
+        length = response.headers.get('Content-Length')
+        total = resume_from + int(length) if length and length.isdigit() else None
+        with open(part_path, mode) as f:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                f.write(chunk)
+                digest.update(chunk)
+                received += len(chunk)
+                if hook:
+                    hook({'filename': output_path, 'status': 'downloading',
+                          'downloaded_bytes': resume_from + received, 'total_bytes': total})
+        if hook:
+            hook({'filename': output_path, 'status': 'finished', 'downloaded_bytes': resume_from + received,
+                  'total_bytes': resume_from + received})
+        metrics.record('download.http', time.perf_counter() - start, url=url, status=response.status_code,
+                       bytes=received)
+
+    os.replace(part_path, output_path)
+
+    # Conteúdo idêntico a outro arquivo da pasta: fica um link (ou o arquivo existente)
+    output_path = content_index(output_dir).store(output_path, digest.hexdigest())
+    entry['file'] = os.path.basename(output_path)
+    entry['complete'] = True
+    _update_validators(output_dir, url, entry)
+    return output_path
+
+
+class ProgressThrottle:
+    """Resume os hooks do yt-dlp e os repassa no máximo a cada `interval` segundos
+
+    on_progress(status) recebe um dicionário com 'phase' ('download' ou
+    'postprocess') e 'status'; no download, também bytes baixados e totais,
+    velocidade, ETA e fragmento atual. Os arquivos de um mesmo download (como
+    os streams de vídeo e de áudio baixados ao mesmo tempo) são somados.
+    Avisos intermediários são descartados (o seguinte os substitui), mas o fim
+    de um arquivo e as etapas de pós-processamento passam sempre. Os hooks
+    podem ser chamados de várias threads.
+    """
+
+    def __init__(self, on_progress, interval=PROGRESS_INTERVAL):
+        self.on_progress = on_progress
+        self.interval = interval
+        self._files = {}
+        self._last_key = None
+        self._last_time = 0.0
+        self._lock = threading.Lock()
+
+    def _emit(self, status, force=False):
+        key = (status['phase'], status['status'], status.get('postprocessor'))
+        now = time.monotonic()
+        with self._lock:
+            if not force and key == self._last_key and now - self._last_time < self.interval:
+                return
+            self._last_key = key
+            self._last_time = now
+        self.on_progress(status)
+
+    def download_hook(self, d):
+        """progress_hooks do yt-dlp"""
+        with self._lock:
+            self._files[d.get('filename')] = d
+            files = list(self._files.values())
+
+        active = [f for f in files if f.get('status') == 'downloading']
+        totals = [f.get('total_bytes') or f.get('total_bytes_estimate') for f in files]
+        etas = [f['eta'] for f in active if f.get('eta') is not None]
+        self._emit({
+            'phase': 'download',
+            'status': 'downloading' if active else d.get('status'),
+            'downloaded_bytes': sum(f.get('downloaded_bytes') or 0 for f in files),
+            'total_bytes': sum(totals) if all(totals) else None,
+            'speed': sum(f.get('speed') or 0 for f in active) or None,
+            'eta': max(etas) if etas else None,
+            'fragment_index': d.get('fragment_index'),
+            'fragment_count': d.get('fragment_count'),
+        }, force=d.get('status') != 'downloading')
+
+    def postprocessor_hook(self, d):
+        """postprocessor_hooks do yt-dlp"""
+        self._emit({'phase': 'postprocess', 'status': d.get('status'), 'postprocessor': d.get('postprocessor')})
+
+
+def audio_format_selector(format_name, bitrate):
+    """Seletor de formato do yt-dlp que prefere um stream nativo já no codec pedido
+
+    Um stream no codec de destino e com taxa de bits até a escolhida (`bitrate`,
+    em kbps) é só copiado para o arquivo final. Sem ele, fica o melhor stream
+    de outro codec, que é transcodificado uma vez; só então vale um stream do
+    mesmo codec com taxa maior (que seria copiado acima da taxa escolhida).
+    """
+    native = AUDIO_DOWNLOAD_CODECS[format_name][1]
+    if native is None:
+        return 'bestaudio/best'
+    limit = int(bitrate * (1 + BITRATE_TOLERANCE))
+    return f'bestaudio[acodec^={native}][abr<={limit}]/bestaudio[acodec!^={native}]/bestaudio/best'
+
+
+def video_download_container(video_format):
+    """Formato (chave de CONTAINERS) em que o download de vídeo é montado"""
+    return VIDEO_DOWNLOAD_FORMATS.get(video_format, VIDEO_DOWNLOAD_FORMATS['MKV'])[0]
+
+
+def video_format_options(video_format, quality=None):
+    """Opções de seleção de formato do yt-dlp para vídeos
+
+    Escolhe o melhor stream só de vídeo até a altura pedida (ex.: "1080p") e o
+    melhor stream de áudio, em vez dos arquivos já combinados, que nos sites
+    grandes param em 360p/720p. Na mesma resolução, vencem os codecs que o
+    contêiner de `video_format` aceita sem recodificar; se os escolhidos não
+    couberem nele, a junção sai em MKV. Sem FFmpeg para juntar os streams,
+    fica com o melhor arquivo já combinado.
+    """
+    limit = f'[height<={quality[:-1]}]' if quality and quality != "Melhor disponível" else ''
+    if find_executable('ffmpeg') is None:
+        return {'format': f'best{limit}'}
+
+    container, extension_sort = VIDEO_DOWNLOAD_FORMATS.get(video_format, VIDEO_DOWNLOAD_FORMATS['MKV'])
+    extension = SUPPORTED_FORMATS['videos'][container][1:]
+    options = {
+        'format': f'bestvideo{limit}+bestaudio/best{limit}',
+        'merge_output_format': extension if container == 'MKV' else f'{extension}/mkv',
+    }
+    if extension_sort:
+        options['format_sort'] = ['res', extension_sort]
+    return options
+
+
+def build_ydl_options(media_type, output_dir, quality=None, archive=False, on_progress=None,
+                      audio_format='MP3', bitrate=192, video_format='MP4'):
+    """Monta as opções do yt-dlp para vídeo ou áudio
+
+    Com `archive`, os itens baixados são anotados no histórico da pasta e
+    pulados nas próximas vezes. on_progress(status) recebe o progresso já
+    resumido e espaçado (ver ProgressThrottle). A barra de progresso do
+    próprio yt-dlp fica desligada para não misturar texto à saída da CLI.
+    Áudios saem em `audio_format` (chave de ENCODERS) a `bitrate` kbps e
+    vídeos, em `video_format` (ver video_format_options).
+    """
+    ydl_opts = {
+        'outtmpl': os.path.join(output_dir, '%(title)s.%(ext)s'),
+        'quiet': True,
+        'noprogress': True,
+        'concurrent_fragment_downloads': FRAGMENT_WORKERS,
+    }
+    if archive:
+        ydl_opts['download_archive'] = os.path.join(output_dir, ARCHIVE_FILE)
+    if on_progress:
+        throttle = ProgressThrottle(on_progress)
+        ydl_opts['progress_hooks'] = [throttle.download_hook]
+        ydl_opts['postprocessor_hooks'] = [throttle.postprocessor_hook]
+
+    if media_type == 'audio':
+        postprocessor = {'key': 'FFmpegExtractAudio', 'preferredcodec': AUDIO_DOWNLOAD_CODECS[audio_format][0]}
+        if not ENCODERS[audio_format]['lossless']:
+            postprocessor['preferredquality'] = str(bitrate)
+        ydl_opts.update({
+            'format': audio_format_selector(audio_format, bitrate),
+            'postprocessors': [postprocessor],
+        })
+    elif media_type == 'videos':
+        ydl_opts.update(video_format_options(video_format, quality))
+
+    return ydl_opts
+
+
+def _archived_ids(output_dir):
+    """Identificadores ("extrator id") já registrados no histórico da pasta"""
+    try:
+        with open(os.path.join(output_dir, ARCHIVE_FILE), encoding='utf-8') as f:
+            return {line.strip() for line in f if line.strip()}
+    except OSError:
+        return set()
+
+
+def ytdlp_extract(url, flat=False):
+    """Extrai as informações da URL com o yt-dlp, sem escolher formatos nem baixar
+
+    Com `flat`, playlists e canais só listam as entradas; sem ele, playlists
+    também saem listadas assim (cada entrada é extraída no download), pois
+    as entradas não processadas podem ser um gerador. O resultado é
+    convertido para tipos serializáveis em JSON (como no --dump-json).
+    """
+    import yt_dlp
+
+    options = {'quiet': True, 'noprogress': True, 'extract_flat': 'in_playlist', 'skip_download': True}
+    with yt_dlp.YoutubeDL(options) as ydl:
+        info = ydl.extract_info(url, download=False, process=flat)
+        if info.get('_type') in ('playlist', 'multi_video') and not flat:
+            info = ydl.process_ie_result(info, download=False)
+    return yt_dlp.YoutubeDL.sanitize_info(info)
+
+
+def extract_info(url, flat=False, refresh=False, extractor=None):
+    """Informações da URL, reaproveitando uma extração recente do cache
+
+    extractor(url, flat) substitui ytdlp_extract (ex.: um extrator falso
+    servindo arquivos locais). Com `refresh`, ignora o que estiver em cache.
+    Retorna (informações, True se vieram do cache).
+    """
+    cache = extraction_cache()
+    kind = 'flat' if flat else 'full'
+    if not refresh:
+        info = cache.get(url, kind)
+        if info is not None:
+            metrics.record('ytdlp.cached', 0.0, url=url, kind=kind)
+            return info, True
+
+    with metrics.timer('ytdlp.expand' if flat else 'ytdlp.extract', url=url) as fields:
+        info = (extractor or ytdlp_extract)(url, flat)
+        if flat:
+            fields['entries'] = len(info.get('entries') or [])
+    cache.put(url, info, kind)
+    return info, False
+
+
+def probe_formats(url, refresh=False, extractor=None):
+    """Lista os formatos disponíveis na URL, sem baixar nada
+
+    Retorna {'title', 'duration', 'formats'}, com os formatos do melhor para
+    o pior; cada um traz id, extensão, resolução, fps, codecs, taxa de bits
+    (kbps) e tamanho (exato ou estimado, em bytes).
+    """
+    import yt_dlp
+
+    info, _ = extract_info(url, refresh=refresh, extractor=extractor)
+    if info.get('_type') in ('playlist', 'multi_video'):
+        raise ValueError("A URL é uma playlist ou canal; consulte os formatos de um item")
+
+    with yt_dlp.YoutubeDL({'quiet': True, 'noprogress': True}) as ydl:
+        info = ydl.process_ie_result(copy.deepcopy(info), download=False)
+        formats = [{
+            'format_id': f.get('format_id'),
+            'ext': f.get('ext'),
+            'resolution': ydl.format_resolution(f),
+            'fps': f.get('fps'),
+            'vcodec': f.get('vcodec'),
+            'acodec': f.get('acodec'),
+            'bitrate': f.get('tbr') or f.get('abr') or f.get('vbr'),
+            'filesize': f.get('filesize') or f.get('filesize_approx'),
+            'note': f.get('format_note'),
+        } for f in reversed(info.get('formats') or [info])]
+    return {'title': info.get('title'), 'duration': info.get('duration'), 'formats': formats}
+
+
+def expand_url(url, output_dir=None, extractor=None):
+    """Lista os itens de uma playlist ou canal sem extrair cada um (extração "flat")
+
+    Retorna (itens, quantos já estavam no histórico da pasta). Cada item é um
+    dicionário com 'url', 'id' e 'title'. Uma URL que não é playlist vira um
+    item só.
+    """
+    info, _ = extract_info(url, flat=True, extractor=extractor)
+
+    if info.get('_type') not in ('playlist', 'multi_video'):
+        return [{'url': url, 'id': info.get('id'), 'title': info.get('title')}], 0
+
+    archived = _archived_ids(output_dir) if output_dir else set()
+    entries = []
+    skipped = 0
+    for entry in _flat_entries(info):
+        key = f"{(entry.get('ie_key') or entry.get('extractor_key') or '').lower()} {entry.get('id')}"
+        if key in archived:
+            skipped += 1
+            continue
+        entries.append({'url': entry.get('url') or entry.get('webpage_url'), 'id': entry.get('id'),
+                        'title': entry.get('title')})
+    return entries, skipped
+
+
+def _flat_entries(info):
+    """Itens de uma playlist, descendo em playlists aninhadas (abas de canais)"""
+    for entry in info.get('entries') or []:
+        if not entry:
+            continue
+        if entry.get('entries'):
+            yield from _flat_entries(entry)
+        elif entry.get('url') or entry.get('webpage_url'):
+            yield entry
+
+
+def download_media(url, media_type, output_dir, quality=None, chunk_size=None, archive=False, on_progress=None,
+                   audio_format='MP3', bitrate=192, video_format='MP4', extractor=None):
+    """Baixa a mídia da URL para a pasta indicada; retorna o caminho ou a pasta de saída
+
+    A extração do yt-dlp é reaproveitada do cache quando recente (ver
+    extract_info); se o download com ela falhar, os links podem ter expirado,
+    então a URL é extraída de novo e o download é repetido uma vez.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    if media_type == 'images':
+        return download_image(url, output_dir, chunk_size, on_progress=on_progress)
+
+    ydl_opts = build_ydl_options(media_type, output_dir, quality, archive, on_progress,
+                                 audio_format, bitrate, video_format)
+    info, cached = extract_info(url, extractor=extractor)
+    try:
+        info = _download_info(url, info, ydl_opts, media_type, video_format, on_progress)
+    except Exception:
+        if not cached:
+            raise
+        info, _ = extract_info(url, refresh=True, extractor=extractor)
+        info = _download_info(url, info, ydl_opts, media_type, video_format, on_progress)
+
+    # O yt-dlp grava os arquivos por conta própria; o hash é calculado depois
+    index = content_index(output_dir)
+    for path in _downloaded_files(info):
+        if os.path.exists(path):
+            index.store(path)
+
+    return output_dir
+
+
+def _download_info(url, info, ydl_opts, media_type, video_format, on_progress=None):
+    """Escolhe os formatos e baixa a partir das informações extraídas; retorna o resultado do yt-dlp"""
+    import yt_dlp
+
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        selected = None
+        if media_type == 'videos' and info.get('_type', 'video') == 'video':
+            # Só escolhe os formatos (sem rede); vídeo + áudio separados são baixados juntos
+            selected = ydl.process_ie_result(copy.deepcopy(info), download=False)
+            if len(selected.get('requested_formats') or ()) != 2 or ydl.in_download_archive(selected):
+                selected = None
+
+        with metrics.timer('ytdlp.download', url=url):
+            if selected:
+                path = _download_streams(ydl, info, selected, ydl_opts, video_download_container(video_format),
+                                         on_progress)
+                ydl.record_download_archive(selected)
+                info = dict(selected, requested_downloads=[{'filepath': path}])
+            else:
+                info = ydl.process_ie_result(copy.deepcopy(info), download=True)
+    return info
+
+
+def stream_codec(codec):
+    """Nome no FFmpeg de um codec informado pelo yt-dlp (ex.: "avc1.64001F" -> "h264"); None se desconhecido"""
+    codec = (codec or '').lower()
+    return next((name for prefix, name in STREAM_CODECS if codec.startswith(prefix)), None)
+
+
+def merge_container(streams, container):
+    """Contêiner para juntar os streams (vídeo, áudio) sem recodificar: `container` ou, se não couberem, MKV
+
+    Sem codec informado, vale a extensão do stream (a do contêiner escolhido
+    indica que ele foi preferido por caber nele).
+    """
+    allowed = CONTAINERS[container]
+    extensions = VIDEO_DOWNLOAD_FORMATS.get(container, (container, None))[1]
+    for stream, key, field in zip(streams, ('video_copy', 'audio_copy'), ('vcodec', 'acodec')):
+        if allowed[key] is None:
+            continue
+        codec = stream_codec(stream.get(field))
+        if codec is None and extensions and stream.get('ext') in extensions.split(':')[1:]:
+            continue
+        if codec not in allowed[key]:
+            return 'MKV'
+    return container
+
+
+def _download_streams(ydl, info, selected, ydl_opts, container, on_progress=None):
+    """Baixa os streams de vídeo e de áudio ao mesmo tempo e os junta sem recodificar
+
+    Cada stream é baixado por uma instância própria do yt-dlp, já com o
+    formato escolhido, em `<título>.f<formato>.<ext>`; os hooks de progresso
+    são compartilhados, então o progresso soma os dois. Se os codecs não
+    couberem em `container`, a junção sai em MKV. Se um dos downloads ou a
+    junção falhar, os arquivos dos streams são apagados. Retorna o caminho final.
+    """
+    import yt_dlp
+
+    # Vídeo primeiro, áudio depois
+    streams = sorted(selected['requested_formats'], key=lambda stream: stream.get('vcodec') in (None, 'none'))
+    container = merge_container(streams, container)
+    base = os.path.splitext(ydl.prepare_filename(selected))[0]
+    final_path = base + SUPPORTED_FORMATS['videos'][container]
+    if os.path.exists(final_path):
+        return final_path
+
+    stream_opts = dict(ydl_opts, postprocessors=[], download_archive=None, merge_output_format=None)
+
+    def fetch(stream):
+        outtmpl = f"{base.replace('%', '%%')}.f{stream['format_id']}.%(ext)s"
+        with yt_dlp.YoutubeDL(dict(stream_opts, format=stream['format_id'], outtmpl=outtmpl)) as stream_ydl:
+            result = stream_ydl.process_ie_result(copy.deepcopy(info), download=True)
+        return result['requested_downloads'][0]['filepath']
+
+    try:
+        with ThreadPoolExecutor(max_workers=len(streams), thread_name_prefix='tic-stream') as executor:
+            video_path, audio_path = executor.map(fetch, streams)
+
+        if on_progress:
+            on_progress({'phase': 'postprocess', 'status': 'started', 'postprocessor': 'Merger'})
+        merge_streams(video_path, audio_path, final_path, container)
+    finally:
+        # Streams baixados (ou parciais) não servem mais depois da junção ou da falha
+        for stream in streams:
+            for path in glob.glob(glob.escape(f"{base}.f{stream['format_id']}.") + '*'):
+                os.remove(path)
+    if on_progress:
+        on_progress({'phase': 'postprocess', 'status': 'finished', 'postprocessor': 'Merger'})
+    return final_path
+
+
+def _downloaded_files(info):
+    """Caminhos finais dos arquivos baixados pelo yt-dlp (inclusive de playlists)"""
+    for entry in info.get('entries') or []:
+        if entry:
+            yield from _downloaded_files(entry)
+    for download in info.get('requested_downloads') or []:
+        if download.get('filepath'):
+            yield download['filepath']
@@ -0,0 +1,71 @@
+"""Cache persistente das extrações do yt-dlp (URL -> informações da mídia)"""
+import json
+import os
+import threading
+import time
+
+from tic_core.cache import cache_dir, cache_key
+
+# Validade das extrações guardadas (s). Os links dos formatos que os sites
+# devolvem costumam expirar em algumas horas; depois disso, extrai de novo.
+EXTRACTION_TTL = 60 * 60
+
+_default = None
+_default_lock = threading.Lock()
+
+
+class ExtractionCache:
+    """Informações extraídas pelo yt-dlp por URL, gravadas como JSON com data
+
+    Guarda o resultado ainda não processado da extração, de modo que trocar a
+    qualidade, repetir uma tentativa ou baixar de novo só refaz a seleção de
+    formatos, sem consultar o site. `kind` separa extrações da mesma URL com
+    opções diferentes (ex.: listagem "flat" de playlists).
+    """
+
+    def __init__(self, directory=None, ttl=EXTRACTION_TTL):
+        self.directory = directory or cache_dir('extractions')
+        self.ttl = ttl
+
+    def _disk_path(self, url, kind):
+        key = cache_key(url, kind)
+        return os.path.join(self.directory, key[:2], key + '.json')
+
+    def get(self, url, kind='full'):
+        """Informações guardadas e ainda válidas; None se ausentes ou vencidas"""
+        try:
+            with open(self._disk_path(url, kind), encoding='utf-8') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - record.get('time', 0) > self.ttl:
+            return None
+        return record.get('info')
+
+    def put(self, url, info, kind='full'):
+        """Guarda as informações (já serializáveis em JSON) extraídas da URL"""
+        disk_path = self._disk_path(url, kind)
+        try:
+            os.makedirs(os.path.dirname(disk_path), exist_ok=True)
+            tmp_path = disk_path + f'.{threading.get_ident()}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'url': url, 'time': time.time(), 'info': info}, f, ensure_ascii=False)
+            os.replace(tmp_path, disk_path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Erro ao gravar extração em cache: {str(e)}")
+
+    def invalidate(self, url, kind='full'):
+        """Descarta a extração guardada (ex.: depois que os links expiraram)"""
+        try:
+            os.remove(self._disk_path(url, kind))
+        except OSError:
+            pass
+
+
+def extraction_cache():
+    """Cache de extrações padrão, compartilhado entre threads"""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = ExtractionCache()
+        return _default
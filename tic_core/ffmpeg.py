@@ -0,0 +1,195 @@
+"""Execução do FFmpeg/FFprobe como subprocesso, com leitura do progresso"""
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+
+from tic_core.metrics import metrics
+
+# No Windows, evita abrir uma janela de console para cada subprocesso
+CREATION_FLAGS = getattr(subprocess, 'CREATE_NO_WINDOW', 0) if sys.platform == 'win32' else 0
+
+
+def find_executable(name):
+    """Localiza ffmpeg/ffprobe: variável MEDIATOOLS_<NOME>, PATH ou pasta do aplicativo"""
+    configured = os.environ.get(f'MEDIATOOLS_{name.upper()}')
+    if configured:
+        return configured
+
+    found = shutil.which(name)
+    if found:
+        return found
+
+    app_dir = os.path.dirname(os.path.abspath(sys.executable if getattr(sys, 'frozen', False) else __file__))
+    for candidate in (os.path.join(app_dir, name), os.path.join(app_dir, name + '.exe')):
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+def require_ffmpeg():
+    """Caminho do ffmpeg, ou erro explicativo se não estiver instalado"""
+    ffmpeg = find_executable('ffmpeg')
+    if not ffmpeg:
+        raise RuntimeError("FFmpeg não encontrado. Instale o FFmpeg e adicione-o ao PATH")
+    return ffmpeg
+
+
+def probe(path):
+    """Lê duração, contêiner e streams do arquivo
+
+    Usa o ffprobe quando disponível; senão, interpreta o cabeçalho impresso
+    por `ffmpeg -i`. Retorna {'duration', 'format', 'bit_rate', 'streams'},
+    com cada stream como {'type', 'codec', ...}.
+    """
+    ffprobe = find_executable('ffprobe')
+    with metrics.timer('ffmpeg.probe', file=path):
+        if ffprobe:
+            return _probe_with_ffprobe(ffprobe, path)
+        return _probe_with_ffmpeg(require_ffmpeg(), path)
+
+
+def _probe_with_ffprobe(ffprobe, path):
+    completed = subprocess.run(
+        [ffprobe, '-v', 'error', '-print_format', 'json', '-show_format', '-show_streams', path],
+        capture_output=True, text=True, creationflags=CREATION_FLAGS)
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip() or f"ffprobe falhou para {path}")
+
+    data = json.loads(completed.stdout)
+    fmt = data.get('format', {})
+    streams = []
+    for stream in data.get('streams', []):
+        streams.append({
+            'type': stream.get('codec_type'),
+            'codec': stream.get('codec_name'),
+            'width': stream.get('width'),
+            'height': stream.get('height'),
+            'fps': _parse_rate(stream.get('avg_frame_rate')),
+            'sample_rate': int(stream['sample_rate']) if stream.get('sample_rate') else None,
+            'channels': stream.get('channels'),
+            'bit_rate': int(stream['bit_rate']) if stream.get('bit_rate') else None,
+        })
+    return {
+        'duration': float(fmt['duration']) if fmt.get('duration') else None,
+        'format': fmt.get('format_name'),
+        'bit_rate': int(fmt['bit_rate']) if fmt.get('bit_rate') else None,
+        'streams': streams,
+    }
+
+
+def _parse_rate(rate):
+    """Converte '30000/1001' em float"""
+    try:
+        num, den = rate.split('/')
+        return float(num) / float(den) if float(den) else None
+    except (AttributeError, ValueError):
+        return None
+
+
+_DURATION_RE = re.compile(r'Duration: (\d+):(\d+):(\d+(?:\.\d+)?)(?:, start: [^,]+)?, bitrate: (\d+|N/A)')
+_INPUT_RE = re.compile(r'^Input #0, ([^,]+(?:,[^,\s]+)*), from', re.M)
+_STREAM_RE = re.compile(r'Stream #0:\d+.*?: (Video|Audio|Subtitle|Data): (\w+)([^\n]*)')
+
+
+def _probe_with_ffmpeg(ffmpeg, path):
+    completed = subprocess.run([ffmpeg, '-hide_banner', '-i', path], capture_output=True, text=True,
+                               errors='replace', creationflags=CREATION_FLAGS)
+    output = completed.stderr
+    input_match = _INPUT_RE.search(output)
+    if not input_match:
+        raise RuntimeError(output.strip().splitlines()[-1] if output.strip() else f"ffmpeg falhou para {path}")
+
+    duration = None
+    bit_rate = None
+    duration_match = _DURATION_RE.search(output)
+    if duration_match:
+        hours, minutes, seconds, rate = duration_match.groups()
+        duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+        bit_rate = int(rate) * 1000 if rate != 'N/A' else None
+
+    streams = []
+    for kind, codec, details in _STREAM_RE.findall(output):
+        stream = {'type': kind.lower(), 'codec': codec, 'width': None, 'height': None, 'fps': None,
+                  'sample_rate': None, 'channels': None, 'bit_rate': None}
+        size = re.search(r', (\d{2,5})x(\d{2,5})', details)
+        if size:
+            stream['width'], stream['height'] = int(size.group(1)), int(size.group(2))
+        fps = re.search(r', (\d+(?:\.\d+)?) fps', details)
+        if fps:
+            stream['fps'] = float(fps.group(1))
+        sample_rate = re.search(r', (\d+) Hz', details)
+        if sample_rate:
+            stream['sample_rate'] = int(sample_rate.group(1))
+        channels = re.search(r'Hz, (mono|stereo|[\d.]+(?:\(\w+\))?)', details)
+        if channels:
+            layout = channels.group(1)
+            stream['channels'] = {'mono': 1, 'stereo': 2}.get(layout) or _layout_channels(layout)
+        stream_rate = re.search(r', (\d+) kb/s', details)
+        if stream_rate:
+            stream['bit_rate'] = int(stream_rate.group(1)) * 1000
+        streams.append(stream)
+
+    return {'duration': duration, 'format': input_match.group(1), 'bit_rate': bit_rate, 'streams': streams}
+
+
+def _layout_channels(layout):
+    """'5.1(side)' -> 6 canais"""
+    try:
+        return sum(int(part) for part in layout.split('(')[0].split('.'))
+    except ValueError:
+        return None
+
+
+def run_ffmpeg(args, duration=None, on_progress=None, should_stop=None):
+    """Executa o ffmpeg com `-progress` e repassa percentual e velocidade
+
+    on_progress(percent, speed) recebe o percentual (0-100, ou None se a
+    duração for desconhecida) e a velocidade em relação ao tempo real. Se
+    should_stop() ficar verdadeiro, o processo é encerrado e RuntimeError é
+    levantado.
+    """
+    command = [require_ffmpeg(), '-hide_banner', '-nostdin', '-y', '-loglevel', 'error',
+               '-nostats', '-progress', 'pipe:1'] + list(args)
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+                               errors='replace', creationflags=CREATION_FLAGS)
+
+    # O stderr é lido em paralelo para o processo nunca travar com o pipe cheio
+    stderr_lines = []
+    stderr_thread = threading.Thread(target=lambda: stderr_lines.extend(process.stderr), daemon=True)
+    stderr_thread.start()
+
+    out_time = 0.0
+    speed = None
+    stopped = False
+    for line in process.stdout:
+        if should_stop and should_stop():
+            stopped = True
+            process.terminate()
+            break
+
+        key, _, value = line.strip().partition('=')
+        if key == 'out_time_us' and value.isdigit():
+            out_time = int(value) / 1_000_000
+        elif key == 'speed' and value.endswith('x'):
+            try:
+                speed = float(value[:-1])
+            except ValueError:
+                speed = None
+        elif key == 'progress' and on_progress:
+            percent = min(100.0, out_time / duration * 100) if duration else None
+            if value == 'end':
+                percent = 100.0
+            on_progress(percent, speed)
+
+    process.wait()
+    stderr_thread.join(timeout=1)
+    if stopped:
+        raise RuntimeError("Cancelado")
+    if process.returncode != 0:
+        message = ''.join(stderr_lines).strip()
+        raise RuntimeError(message.splitlines()[-1] if message else f"ffmpeg terminou com código {process.returncode}")
+    return speed
@@ -0,0 +1,72 @@
+"""Operações sobre arquivos locais: seleção por padrão e renomeação"""
+import glob
+import os
+
+
+def collect_files(inputs, extensions, recursive=False):
+    """Expande arquivos, pastas e padrões glob em uma lista de arquivos
+
+    Pastas e padrões são filtrados pelas extensões informadas; arquivos
+    passados diretamente são aceitos como estão. A ordem é preservada e
+    arquivos repetidos aparecem uma única vez.
+    """
+    extensions = {ext.lower() for ext in extensions}
+    files = []
+    seen = set()
+
+    def add(path, filtered):
+        if filtered and os.path.splitext(path)[1].lower() not in extensions:
+            return
+        key = os.path.abspath(path)
+        if key not in seen:
+            seen.add(key)
+            files.append(path)
+
+    for item in inputs:
+        if os.path.isdir(item):
+            if recursive:
+                for directory, _, names in os.walk(item):
+                    for name in sorted(names):
+                        add(os.path.join(directory, name), True)
+            else:
+                for name in sorted(os.listdir(item)):
+                    path = os.path.join(item, name)
+                    if os.path.isfile(path):
+                        add(path, True)
+        elif glob.has_magic(item):
+            for path in sorted(glob.glob(item, recursive=True)):
+                if os.path.isfile(path):
+                    add(path, True)
+        elif os.path.isfile(item):
+            add(item, False)
+        else:
+            raise FileNotFoundError(f"Arquivo não encontrado: {item}")
+
+    return files
+
+
+def build_output_path(file_path, output_dir, extension=None):
+    """Monta o caminho de saída no padrão {base}_converted{ext}
+
+    Sem extensão, mantém a do arquivo de origem.
+    """
+    base_name, source_extension = os.path.splitext(os.path.basename(file_path))
+    return os.path.join(output_dir, f"{base_name}_converted{extension or source_extension}")
+
+
+def rename_file(file_path, new_name):
+    """Renomeia o arquivo mantendo pasta e extensão; retorna o novo caminho"""
+    new_name = new_name.strip()
+    if not new_name:
+        raise ValueError("Digite um novo nome para o arquivo")
+
+    directory = os.path.dirname(file_path)
+    extension = os.path.splitext(file_path)[1]
+    new_path = os.path.join(directory, new_name + extension)
+
+    # Verifica se o arquivo de destino já existe
+    if os.path.exists(new_path):
+        raise FileExistsError("Já existe um arquivo com este nome")
+
+    os.rename(file_path, new_path)
+    return new_path
@@ -0,0 +1,156 @@
+"""Tira de quadros-chave para o preview de vídeos (memória + disco)"""
+import io
+import os
+import subprocess
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from tic_core.cache import cache_dir, cache_key, file_signature
+from tic_core.ffmpeg import CREATION_FLAGS, require_ffmpeg
+from tic_core.metrics import metrics
+
+FRAME_COUNT = 6
+FRAME_SIZE = (160, 90)
+FRAME_GAP = 4
+BACKGROUND = (34, 34, 34)
+
+
+def extract_keyframe(path, seconds, size=FRAME_SIZE):
+    """Decodifica o quadro-chave mais próximo antes de `seconds`, já reduzido
+
+    A busca é feita no demuxer (-ss antes de -i, sem busca precisa) e o
+    decodificador descarta tudo que não for quadro-chave, então apenas um
+    quadro é decodificado por chamada.
+    """
+    width, height = size
+    command = [require_ffmpeg(), '-hide_banner', '-loglevel', 'error', '-nostdin',
+               '-skip_frame', 'nokey', '-noaccurate_seek', '-ss', f'{seconds:.3f}', '-i', path,
+               '-an', '-sn', '-fps_mode', 'passthrough', '-frames:v', '1',
+               '-vf', f'scale={width}:{height}:force_original_aspect_ratio=decrease',
+               '-f', 'image2pipe', '-c:v', 'ppm', '-']
+    completed = subprocess.run(command, capture_output=True, creationflags=CREATION_FLAGS)
+    if completed.returncode != 0 or not completed.stdout:
+        message = completed.stderr.decode('utf-8', 'replace').strip()
+        raise RuntimeError(message.splitlines()[-1] if message else f"Nenhum quadro em {seconds:.1f}s")
+    with Image.open(io.BytesIO(completed.stdout)) as frame:
+        return frame.convert('RGB')
+
+
+def frame_times(duration, count=FRAME_COUNT):
+    """Instantes distribuídos ao longo do vídeo (o centro de cada trecho)"""
+    if not duration:
+        return [0.0]
+    return [duration * (index + 0.5) / count for index in range(count)]
+
+
+class FilmstripCache:
+    """Tiras de quadros indexadas por (caminho, mtime, tamanho do arquivo)
+
+    As mais recentes ficam em memória (LRU) e todas são gravadas em disco como
+    PNG. As decodificações de todos os vídeos passam pelo mesmo executor, que
+    limita quantos ffmpeg rodam ao mesmo tempo.
+    """
+
+    def __init__(self, directory=None, max_items=16, frames=FRAME_COUNT, size=FRAME_SIZE, max_decodes=2):
+        self.directory = directory or cache_dir('filmstrips')
+        self.max_items = max_items
+        self.frames = frames
+        self.size = size
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_decodes, thread_name_prefix='tic-keyframes')
+
+    def _key(self, path):
+        return cache_key(*file_signature(path), self.frames, self.size)
+
+    def _disk_path(self, key):
+        return os.path.join(self.directory, key[:2], key + '.png')
+
+    def lookup(self, path):
+        """Tira já gerada (memória ou disco), sem decodificar o vídeo; None se ausente"""
+        key = self._key(path)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+
+        try:
+            with Image.open(self._disk_path(key)) as stored:
+                strip = stored.convert('RGB')
+        except OSError:
+            return None
+        self._remember(key, strip)
+        return strip
+
+    def get(self, path, duration, should_stop=None):
+        """Tira do vídeo, extraindo os quadros-chave se ainda não estiver em cache
+
+        Bloqueia até os quadros ficarem prontos; chame fora da thread da
+        interface. Se should_stop() ficar verdadeiro, os quadros pendentes são
+        descartados e None é retornado.
+        """
+        strip = self.lookup(path)
+        if strip is not None:
+            return strip
+
+        key = self._key(path)
+        futures = [self._executor.submit(self._extract, path, seconds, should_stop)
+                   for seconds in frame_times(duration, self.frames)]
+        frames = []
+        for future in futures:
+            try:
+                frames.append(future.result())
+            except Exception as e:
+                print(f"Erro ao extrair quadro de {path}: {str(e)}")
+                frames.append(None)
+
+        if should_stop and should_stop():
+            return None
+        if not any(frames):
+            raise RuntimeError("Não foi possível extrair quadros do vídeo")
+
+        strip = self._compose(frames)
+        self._save_to_disk(key, strip)
+        self._remember(key, strip)
+        return strip
+
+    def _extract(self, path, seconds, should_stop):
+        if should_stop and should_stop():
+            return None
+        with metrics.timer('filmstrip.keyframe', file=path, position=seconds):
+            return extract_keyframe(path, seconds, self.size)
+
+    def _compose(self, frames):
+        """Junta os quadros lado a lado, centralizados em células do mesmo tamanho"""
+        width, height = self.size
+        strip = Image.new('RGB', (len(frames) * (width + FRAME_GAP) - FRAME_GAP, height), BACKGROUND)
+        for index, frame in enumerate(frames):
+            if frame is not None:
+                left = index * (width + FRAME_GAP) + (width - frame.width) // 2
+                strip.paste(frame, (left, (height - frame.height) // 2))
+        return strip
+
+    def _remember(self, key, strip):
+        with self._lock:
+            self._memory[key] = strip
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_items:
+                self._memory.popitem(last=False)
+
+    def _save_to_disk(self, key, strip):
+        """Grava a tira em disco (falhas apenas desativam o cache em disco)"""
+        disk_path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(disk_path), exist_ok=True)
+            tmp_path = disk_path + f'.{threading.get_ident()}.tmp'
+            strip.save(tmp_path, format='PNG', compress_level=1)
+            os.replace(tmp_path, disk_path)
+        except OSError as e:
+            print(f"Erro ao gravar quadros em cache: {str(e)}")
+
+    def shutdown(self):
+        """Descarta as decodificações pendentes"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
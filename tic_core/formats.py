@@ -0,0 +1,86 @@
+"""Formatos suportados e pastas padrão de cada tipo de mídia"""
+import os
+
+# Formatos de saída suportados para cada tipo de mídia
+SUPPORTED_FORMATS = {
+    'images': {
+        "JPEG": ".jpg", "PNG": ".png", "GIF": ".gif",
+        "BMP": ".bmp", "WEBP": ".webp", "TIFF": ".tiff",
+        "AVIF": ".avif", "ICO": ".ico", "TGA": ".tga"
+    },
+    'videos': {
+        "MP4": ".mp4", "MOV": ".mov", "AVI": ".avi",
+        "MKV": ".mkv", "WEBM": ".webm", "MPEG": ".mpeg",
+        "GIF": ".gif"
+    },
+    'audio': {
+        "MP3": ".mp3", "WAV": ".wav", "OGG": ".ogg",
+        "AAC": ".aac", "FLAC": ".flac", "M4A": ".m4a"
+    }
+}
+
+# Presets de codificação de imagens: opções do save() do Pillow para cada
+# formato de saída, do mais rápido ao menor arquivo (a qualidade escolhida
+# na interface é aplicada à parte em JPEG e WEBP)
+DEFAULT_PRESET = 'balanced'
+PRESET_LABELS = {'fast': "Rápido", 'balanced': "Equilibrado", 'smallest': "Menor arquivo"}
+ENCODER_PRESETS = {
+    'JPEG': {
+        'fast': {'optimize': False, 'progressive': False, 'subsampling': '4:2:0'},
+        'balanced': {'optimize': True, 'subsampling': '4:2:0'},
+        'smallest': {'optimize': True, 'progressive': True, 'subsampling': '4:2:0'},
+    },
+    'PNG': {
+        'fast': {'compress_level': 1},
+        'balanced': {'compress_level': 6},
+        'smallest': {'optimize': True},
+    },
+    'WEBP': {
+        'fast': {'method': 0},
+        'balanced': {'method': 4},
+        'smallest': {'method': 6},
+    },
+    'AVIF': {
+        'fast': {'speed': 9},
+        'balanced': {'speed': 6},
+        'smallest': {'speed': 4},
+    },
+    'TIFF': {
+        'fast': {},
+        'balanced': {},
+        'smallest': {'compression': 'tiff_adobe_deflate'},
+    },
+    'GIF': {
+        'fast': {},
+        'balanced': {'optimize': True},
+        'smallest': {'optimize': True},
+    },
+    'TGA': {
+        'fast': {},
+        'balanced': {},
+        'smallest': {'compression': 'tga_rle'},
+    },
+}
+
+# Extensões aceitas como entrada (as mesmas dos diálogos de seleção)
+INPUT_EXTENSIONS = {
+    'images': ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp', '.tiff', '.avif', '.ico', '.tga'],
+    'videos': ['.mp4', '.mov', '.avi', '.mkv', '.webm', '.mpeg', '.gif'],
+    'audio': ['.mp3', '.wav', '.ogg', '.aac', '.flac', '.m4a']
+}
+
+# Sites suportados para download organizados por tipo
+SUPPORTED_SITES = {
+    'images': ["Qualquer URL de imagem"],
+    'videos': ["YouTube", "Vimeo", "Facebook", "Twitter", "Instagram", "TikTok", "Dailymotion"],
+    'audio': ["YouTube", "SoundCloud", "Bandcamp", "Mixcloud"]
+}
+
+
+def default_download_folders():
+    """Pastas de download/saída padrão de cada tipo de mídia"""
+    return {
+        'images': os.path.expanduser("~/Downloads/MediaTools_Images"),
+        'videos': os.path.expanduser("~/Downloads/MediaTools_Videos"),
+        'audio': os.path.expanduser("~/Downloads/MediaTools_Audio")
+    }
@@ -0,0 +1,204 @@
+"""Conversão de imagens, individual e em lote com múltiplos processos"""
+import io
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from PIL import Image
+
+from tic_core.adjustments import apply_adjustments
+from tic_core.files import build_output_path
+from tic_core.formats import DEFAULT_PRESET, ENCODER_PRESETS
+from tic_core.large_images import (convert_large_image, default_memory_budget, estimate_memory, image_metadata,
+                                   is_large_image)
+from tic_core.metrics import metrics
+
+# Digitalizações grandes (20k x 20k) passam do limite padrão do Pillow contra
+# "bombas de descompressão"; os arquivos são escolhidos pelo próprio usuário
+Image.MAX_IMAGE_PIXELS = 1_000_000_000
+
+
+def default_workers():
+    """Número padrão de processos de conversão (um por núcleo)"""
+    return os.cpu_count() or 1
+
+
+def encoder_options(format_name, quality, preset=DEFAULT_PRESET):
+    """Opções do save() do Pillow para o formato no preset indicado"""
+    options = dict(ENCODER_PRESETS.get(format_name, {}).get(preset or DEFAULT_PRESET, {}))
+    if format_name in ['JPEG', 'WEBP']:
+        options['quality'] = quality
+    return options
+
+
+def convert_image_file(file_path, output_path, format_name, quality, adjustments=None, timings=None,
+                       preset=DEFAULT_PRESET):
+    """Converte um arquivo de imagem e salva no formato indicado
+
+    Se houver ajustes pendentes (lista de operações), eles são aplicados uma
+    única vez, já fundidos, antes de salvar. Sem formato, mantém o do original.
+    `preset` (fast, balanced ou smallest) escolhe as opções do codificador.
+    Com `timings` (dicionário), registra os segundos gastos em cada fase:
+    decode, adjust, encode e write. Imagens muito grandes são convertidas em
+    faixas, com memória limitada (ver large_images). Grava em `<saída>.part` e
+    renomeia ao final: a saída pode ser um link para a de uma origem idêntica
+    (ver dedupe.iter_deduplicated) e não deve ser sobrescrita no lugar.
+    """
+    timings = {} if timings is None else timings
+    start = time.perf_counter()
+    with Image.open(file_path) as image:
+        format_name = format_name or image.format
+        # O perfil de cor e a resolução da origem são mantidos em todos os formatos
+        options = dict(image_metadata(image), **encoder_options(format_name, quality, preset))
+        if is_large_image(image, format_name, options, adjustments):
+            image.close()
+            return convert_large_image(file_path, output_path, format_name, options, adjustments, timings)
+
+        image.load()
+        timings['decode'] = time.perf_counter() - start
+
+        if adjustments:
+            start = time.perf_counter()
+            image = apply_adjustments(image, adjustments)
+            timings['adjust'] = time.perf_counter() - start
+
+        # Codifica em memória e grava depois, para separar CPU de disco
+        start = time.perf_counter()
+        encoded = io.BytesIO()
+        image.save(encoded, format=format_name, **options)
+        timings['encode'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    part_path = output_path + '.part'
+    try:
+        with open(part_path, 'wb') as f:
+            f.write(encoded.getbuffer())
+    except OSError:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+    os.replace(part_path, output_path)
+    timings['write'] = time.perf_counter() - start
+    timings['bytes'] = encoded.tell()
+    return output_path
+
+
+def _convert_timed(*args):
+    """Executa convert_image_file no processo de trabalho e devolve os tempos de cada fase"""
+    file_path, output_path, format_name, quality, adjustments, preset = args
+    timings = {}
+    convert_image_file(file_path, output_path, format_name, quality, adjustments, timings, preset)
+    return timings
+
+
+def _record_timings(file_path, timings):
+    """Registra no processo principal as fases medidas no processo de trabalho"""
+    # No modo em faixas a gravação acontece junto com a codificação
+    bytes_phase = 'write' if 'write' in timings else 'encode'
+    for phase in ('decode', 'adjust', 'encode', 'write'):
+        if phase in timings:
+            metrics.record(f'image.{phase}', timings[phase], file=file_path,
+                           bytes=timings['bytes'] if phase == bytes_phase else None)
+
+
+def iter_convert_batch(files, output_dir, format_name, extension, quality, workers=None,
+                       should_stop=None, adjustments=None, memory_budget=None, preset=DEFAULT_PRESET):
+    """Converte vários arquivos em paralelo, produzindo um resultado por arquivo
+
+    Cada resultado é um dicionário com o arquivo de origem, o caminho de saída,
+    o erro (se houver), o tempo gasto no arquivo (`seconds`), o progresso e a
+    taxa atual em arquivos por segundo.
+    Os resultados chegam na ordem em que as conversões terminam. Se
+    should_stop() retornar verdadeiro, as conversões pendentes são canceladas.
+    A mesma lista de ajustes e o mesmo preset de codificação valem para todos
+    os arquivos. Com format_name e
+    extension None, cada arquivo mantém o próprio formato (só os ajustes).
+    Com workers=0, converte na própria thread, sem processos (útil para perfis).
+    Uma conversão só começa se a soma das memórias estimadas das que estão
+    em andamento couber em `memory_budget` (bytes; padrão: metade da memória
+    física). Uma conversão sempre roda, mesmo que sozinha passe do limite.
+    """
+    files = list(files)
+    total = len(files)
+    start = time.perf_counter()
+    done = 0
+
+    if workers == 0:
+        for file_path in files:
+            if should_stop and should_stop():
+                break
+            output_path = build_output_path(file_path, output_dir, extension)
+            error = None
+            seconds = None
+            try:
+                timings = _convert_timed(file_path, output_path, format_name, quality, adjustments, preset)
+                _record_timings(file_path, timings)
+                seconds = sum(value for key, value in timings.items() if key != 'bytes')
+            except Exception as e:
+                error = str(e)
+
+            done += 1
+            elapsed = time.perf_counter() - start
+            yield {'file': file_path, 'output': output_path, 'error': error, 'seconds': seconds,
+                   'done': done, 'total': total, 'elapsed': elapsed,
+                   'files_per_sec': done / elapsed if elapsed > 0 else 0.0}
+        return
+
+    workers = max(1, min(workers or default_workers(), total or 1))
+    memory_budget = memory_budget or default_memory_budget()
+    pending = [(file_path, estimate_memory(file_path, adjustments, format_name, preset))
+               for file_path in files]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        in_use = 0
+
+        def submit_fitting():
+            # Envia os próximos arquivos que cabem nos processos livres e no limite de memória
+            nonlocal in_use
+            index = 0
+            while index < len(pending) and len(futures) < workers:
+                file_path, memory = pending[index]
+                if futures and in_use + memory > memory_budget:
+                    index += 1
+                    continue
+                del pending[index]
+                output_path = build_output_path(file_path, output_dir, extension)
+                future = executor.submit(_convert_timed, file_path, output_path, format_name, quality,
+                                         adjustments, preset)
+                futures[future] = (file_path, output_path, memory)
+                in_use += memory
+
+        submit_fitting()
+        while futures:
+            finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+            if should_stop and should_stop():
+                for future in futures:
+                    future.cancel()
+                break
+
+            future = next(iter(finished))
+            file_path, output_path, memory = futures.pop(future)
+            in_use -= memory
+            submit_fitting()
+
+            error = None
+            seconds = None
+            try:
+                timings = future.result()
+                _record_timings(file_path, timings)
+                seconds = sum(value for key, value in timings.items() if key != 'bytes')
+            except Exception as e:
+                error = str(e)
+
+            done += 1
+            elapsed = time.perf_counter() - start
+            yield {
+                'file': file_path,
+                'output': output_path,
+                'error': error,
+                'seconds': seconds,
+                'done': done,
+                'total': total,
+                'elapsed': elapsed,
+                'files_per_sec': done / elapsed if elapsed > 0 else 0.0,
+            }
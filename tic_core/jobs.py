@@ -0,0 +1,146 @@
+"""Execução de tarefas longas em segundo plano com fila de progresso
+
+As tarefas rodam em threads de trabalho e publicam eventos em uma
+`queue.Queue`; quem tem a interface (ex.: Tk via `root.after`) consome a
+fila com `poll()` e executa os callbacks na sua própria thread.
+"""
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Job:
+    """Uma tarefa em execução: progresso, ETA e pedido de cancelamento"""
+
+    def __init__(self, job_id, name, events, on_done=None, on_error=None):
+        self.id = job_id
+        self.name = name
+        self.on_done = on_done
+        self.on_error = on_error
+        self.started_at = None
+        self.done = 0
+        self.total = 0
+        self._events = events
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        """Pede o cancelamento (a tarefa para no próximo ponto de verificação)"""
+        self._cancel_event.set()
+
+    def cancelled(self):
+        """Indica se o cancelamento foi pedido"""
+        return self._cancel_event.is_set()
+
+    def wait(self, timeout):
+        """Aguarda até timeout segundos; retorna True se a tarefa foi cancelada"""
+        return self._cancel_event.wait(timeout)
+
+    def eta(self):
+        """Tempo restante estimado em segundos (None se ainda não há base)"""
+        if not self.started_at or not self.done or not self.total:
+            return None
+        elapsed = time.perf_counter() - self.started_at
+        return elapsed / self.done * (self.total - self.done)
+
+    def report(self, done=None, total=None, status="", **data):
+        """Publica o progresso da tarefa na fila de eventos"""
+        if done is not None:
+            self.done = done
+        if total is not None:
+            self.total = total
+        self._events.put({'type': 'progress', 'job': self, 'done': self.done, 'total': self.total,
+                          'status': status, 'eta': self.eta(), **data})
+
+
+class JobRunner:
+    """Agendador único de tarefas longas com threads de trabalho
+
+    As tarefas são distribuídas em grupos (pools) nomeados, cada um com seu
+    próprio limite de concorrência; o grupo 'default' sempre existe.
+    """
+
+    def __init__(self, max_workers=4):
+        self.events = queue.Queue()
+        self._ids = itertools.count(1)
+        self._active = {}
+        self._lock = threading.Lock()
+        self._pools = {}
+        self.configure_pool('default', max_workers)
+
+    def configure_pool(self, pool, max_workers):
+        """Cria ou redimensiona um grupo de threads de trabalho
+
+        Tarefas já agendadas continuam no executor anterior; as novas usam o
+        limite atualizado.
+        """
+        max_workers = max(1, int(max_workers))
+        with self._lock:
+            current = self._pools.get(pool)
+            if current and current[0] == max_workers:
+                return
+            self._pools[pool] = (max_workers, ThreadPoolExecutor(max_workers=max_workers,
+                                                                 thread_name_prefix=f'tic-{pool}'))
+        if current:
+            current[1].shutdown(wait=False)
+
+    def pool_size(self, pool='default'):
+        """Limite de concorrência de um grupo"""
+        with self._lock:
+            return self._pools[pool][0]
+
+    def submit(self, func, *args, name="Tarefa", on_done=None, on_error=None, pool='default', **kwargs):
+        """Agenda func(job, *args, **kwargs) no grupo indicado e retorna o Job"""
+        job = Job(next(self._ids), name, self.events, on_done, on_error)
+        with self._lock:
+            self._active[job.id] = job
+            executor = self._pools[pool][1]
+        executor.submit(self._run, job, func, args, kwargs)
+        return job
+
+    def _run(self, job, func, args, kwargs):
+        """Executa a tarefa na thread de trabalho e publica o resultado"""
+        try:
+            if job.cancelled():
+                self.events.put({'type': 'cancelled', 'job': job, 'result': None})
+                return
+            job.started_at = time.perf_counter()
+            self.events.put({'type': 'start', 'job': job})
+            result = func(job, *args, **kwargs)
+            event_type = 'cancelled' if job.cancelled() else 'done'
+            self.events.put({'type': event_type, 'job': job, 'result': result})
+        except Exception as e:
+            self.events.put({'type': 'error', 'job': job, 'error': str(e)})
+        finally:
+            with self._lock:
+                self._active.pop(job.id, None)
+
+    def active_jobs(self):
+        """Tarefas agendadas ou em execução"""
+        with self._lock:
+            return list(self._active.values())
+
+    def cancel(self, job=None):
+        """Cancela uma tarefa, ou todas as ativas se nenhuma for indicada"""
+        jobs = [job] if job else self.active_jobs()
+        for active_job in jobs:
+            active_job.cancel()
+
+    def poll(self, max_events=200):
+        """Retira da fila os eventos pendentes sem bloquear"""
+        events = []
+        while len(events) < max_events:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                break
+        return events
+
+    def shutdown(self):
+        """Cancela as tarefas e libera as threads"""
+        self.cancel()
+        with self._lock:
+            executors = [executor for _, executor in self._pools.values()]
+        for executor in executors:
+            executor.shutdown(wait=False)
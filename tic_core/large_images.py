@@ -0,0 +1,417 @@
+"""Conversão de imagens muito grandes em faixas de linhas, com memória limitada
+
+Digitalizações de centenas de megapixels não cabem com folga na memória de
+vários processos de conversão ao mesmo tempo. Aqui a imagem é lida em faixas
+horizontais (quando o arquivo guarda os pixels sem compressão: TIFF sem
+compressão, BMP, PPM...) e PNG e TIFF sem compressão são gravados faixa a
+faixa, de modo que o pico de memória não depende do tamanho da imagem. Para
+JPEG, as faixas são montadas num arquivo mapeado em memória, que o sistema
+pode descarregar para o disco, e salvas sem `optimize` (que exigiria mais
+uma cópia inteira da imagem no codificador). Os demais formatos de saída
+precisam da imagem inteira convertida e seguem o caminho normal.
+"""
+import ctypes
+import os
+import struct
+import sys
+import tempfile
+import time
+import zlib
+
+import numpy as np
+from PIL import Image
+
+from tic_core.adjustments import apply_adjustments, fuse
+from tic_core.formats import DEFAULT_PRESET, ENCODER_PRESETS
+
+# Acima deste número de pixels a imagem é convertida em faixas
+LARGE_IMAGE_PIXELS = 64_000_000
+
+# Tamanho aproximado (bytes descomprimidos) de cada faixa lida
+STRIP_BYTES = 16 * 1024 * 1024
+
+# Memória de trabalho do modo em faixas (faixa lida, ajustada e comprimida)
+STRIP_OVERHEAD = 4 * STRIP_BYTES
+
+# Modos de cor tratados em faixas, gravados no mesmo modo (paletas, 1 bit,
+# CMYK e 16 bits seguem o caminho normal)
+STRIP_MODES = ('L', 'LA', 'RGB', 'RGBA')
+
+# Formatos de saída gravados sem a imagem inteira na memória (o TIFF só sem
+# compressão)
+STRIP_FORMATS = ('PNG', 'TIFF', 'JPEG')
+
+# Cópias da imagem decodificada no caminho normal (a própria imagem e o arquivo
+# codificado em memória); o GIF ainda quantiza para paleta, o que dobra o pico
+ENCODE_COPIES = {'GIF': 4}
+
+
+def physical_memory():
+    """Memória física total em bytes (None se não for possível descobrir)"""
+    if sys.platform == 'win32':
+        class MemoryStatus(ctypes.Structure):
+            _fields_ = [('length', ctypes.c_ulong), ('memory_load', ctypes.c_ulong),
+                        ('total_phys', ctypes.c_ulonglong), ('avail_phys', ctypes.c_ulonglong),
+                        ('total_page_file', ctypes.c_ulonglong), ('avail_page_file', ctypes.c_ulonglong),
+                        ('total_virtual', ctypes.c_ulonglong), ('avail_virtual', ctypes.c_ulonglong),
+                        ('avail_extended_virtual', ctypes.c_ulonglong)]
+
+        status = MemoryStatus()
+        status.length = ctypes.sizeof(MemoryStatus)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return status.total_phys
+        return None
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def default_memory_budget():
+    """Memória que um lote de imagens pode ocupar ao mesmo tempo: metade da memória física"""
+    total = physical_memory()
+    return total // 2 if total else 2 * 1024 ** 3
+
+
+def _pixel_bytes(mode):
+    """Bytes por pixel que o Pillow usa internamente para o modo"""
+    if Image.getmodebands(mode) > 1 or mode in ('I', 'F'):
+        return 4
+    if mode.startswith('I;16'):
+        return 2
+    return 1
+
+
+def _raw_strips(image):
+    """Faixas 'raw' da imagem como (topo, base, offset, modo bruto, bytes por linha, orientação)
+
+    Retorna None se os pixels não estiverem guardados em faixas de largura
+    inteira sem compressão (nesse caso não dá para ler só um trecho).
+    """
+    strips = []
+    width = image.size[0]
+    for tile in image.tile:
+        name, extents, offset, args = tile
+        if name != 'raw':
+            return None
+        x0, y0, x1, y1 = extents
+        if x0 != 0 or x1 != width:
+            return None
+
+        if isinstance(args, str):
+            args = (args, 0, 1)
+        rawmode, stride, orientation = (tuple(args) + (0, 1))[:3]
+        if not stride:
+            try:
+                stride = len(Image.new(image.mode, (width, 1)).tobytes('raw', rawmode))
+            except (ValueError, OSError):
+                return None
+        strips.append((y0, y1, offset, rawmode, stride, orientation or 1))
+    return sorted(strips) or None
+
+
+def is_large_image(image, format_name, options, adjustments=None):
+    """Indica se a conversão da imagem (aberta, ainda não decodificada) vai para o modo em faixas
+
+    Só quando a saída pode ser gravada por faixa (STRIP_FORMATS) e não há
+    rotação; nos outros casos o modo em faixas não reduziria o pico de memória.
+    """
+    return (image.size[0] * image.size[1] > LARGE_IMAGE_PIXELS and image.mode in STRIP_MODES
+            and format_name in STRIP_FORMATS and not (format_name == 'TIFF' and options.get('compression'))
+            and not _rotated(adjustments))
+
+
+def estimate_memory(file_path, adjustments=None, format_name=None, preset=DEFAULT_PRESET):
+    """Estimativa do pico de memória (bytes) para converter o arquivo
+
+    No modo em faixas com leitura parcial o custo é constante; com origem
+    comprimida soma a imagem decodificada. No caminho normal é proporcional
+    aos pixels: a imagem decodificada, mais a cópia ajustada e o arquivo
+    codificado em memória. Sem formato, vale o da própria origem.
+    """
+    try:
+        with Image.open(file_path) as image:
+            decoded = image.size[0] * image.size[1] * _pixel_bytes(image.mode)
+            format_name = format_name or image.format
+            options = ENCODER_PRESETS.get(format_name, {}).get(preset or DEFAULT_PRESET, {})
+            if is_large_image(image, format_name, options, adjustments):
+                return STRIP_OVERHEAD if _raw_strips(image) else decoded + STRIP_OVERHEAD
+    except OSError:
+        return 0
+    return decoded * (ENCODE_COPIES.get(format_name, 2) + (1 if adjustments else 0))
+
+
+def _rotated(adjustments):
+    """Rotações (de 90°, 180° ou 270°) mudam a ordem das linhas e não são feitas por faixa"""
+    return bool(adjustments) and fuse(adjustments)[1] != 0
+
+
+def _strip_rows(image):
+    """Linhas por faixa para que cada uma tenha cerca de STRIP_BYTES"""
+    row_bytes = image.size[0] * _pixel_bytes(image.mode)
+    return max(1, STRIP_BYTES // max(1, row_bytes))
+
+
+def iter_strips(file_path, rows=None):
+    """Lê a imagem em faixas horizontais, produzindo (topo, imagem da faixa)
+
+    Se os pixels estiverem sem compressão, cada faixa é lida diretamente do
+    arquivo; senão a imagem é decodificada inteira e recortada.
+    """
+    with Image.open(file_path) as image:
+        width, height = image.size
+        rows = rows or _strip_rows(image)
+        strips = _raw_strips(image)
+        if strips is None:
+            image.load()
+            for top in range(0, height, rows):
+                yield top, image.crop((0, top, width, min(height, top + rows)))
+            return
+
+        mode = image.mode
+        with open(file_path, 'rb') as f:
+            for top in range(0, height, rows):
+                bottom = min(height, top + rows)
+                parts = []
+                for y0, y1, offset, rawmode, stride, orientation in strips:
+                    start, end = max(top, y0), min(bottom, y1)
+                    if start >= end:
+                        continue
+                    # Em arquivos de baixo para cima (BMP), a última linha vem primeiro
+                    first = (start - y0) if orientation > 0 else (y1 - end)
+                    f.seek(offset + first * stride)
+                    data = f.read((end - start) * stride)
+                    parts.append((start, Image.frombytes(mode, (width, end - start), data, 'raw',
+                                                         rawmode, stride, orientation)))
+
+                if len(parts) == 1:
+                    yield top, parts[0][1]
+                    continue
+                strip = Image.new(mode, (width, bottom - top))
+                for start, part in parts:
+                    strip.paste(part, (0, start - top))
+                yield top, strip
+
+
+def image_metadata(image):
+    """Perfil de cor (ICC) e resolução (dpi) da imagem aberta, como opções do save() do Pillow"""
+    return {key: image.info[key] for key in ('icc_profile', 'dpi') if image.info.get(key)}
+
+
+def _png_mode(mode):
+    """Modo de gravação no PNG: (modo do Pillow, tipo de cor, bytes por pixel)"""
+    if mode in ('1', 'L'):
+        return 'L', 0, 1
+    if mode == 'LA':
+        return 'LA', 4, 2
+    if mode == 'RGBA':
+        return 'RGBA', 6, 4
+    return 'RGB', 2, 3
+
+
+def _png_chunk(f, kind, data):
+    f.write(struct.pack('>I', len(data)) + kind + data)
+    f.write(struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff))
+
+
+def write_png(f, size, mode, strips, compress_level=6, icc_profile=None, dpi=None):
+    """Grava um PNG a partir das faixas, comprimindo cada uma assim que chega
+
+    Usa o filtro "Up" (diferença para a linha de cima), calculado com NumPy.
+    O perfil ICC e a resolução, se houver, vão nos blocos iCCP e pHYs.
+    """
+    width, height = size
+    png_mode, color_type, channels = _png_mode(mode)
+    f.write(b'\x89PNG\r\n\x1a\n')
+    _png_chunk(f, b'IHDR', struct.pack('>IIBBBBB', width, height, 8, color_type, 0, 0, 0))
+    if icc_profile:
+        _png_chunk(f, b'iCCP', b'ICC Profile\x00\x00' + zlib.compress(icc_profile))
+    if dpi:
+        # Pixels por metro, unidade 1 (metro)
+        _png_chunk(f, b'pHYs', struct.pack('>IIB', int(dpi[0] / 0.0254 + 0.5), int(dpi[1] / 0.0254 + 0.5), 1))
+
+    compressor = zlib.compressobj(compress_level)
+    previous = np.zeros(width * channels, dtype=np.uint8)
+    for strip in strips:
+        if strip.mode != png_mode:
+            strip = strip.convert(png_mode)
+        pixels = np.frombuffer(strip.tobytes(), dtype=np.uint8).reshape(strip.size[1], width * channels)
+
+        above = np.vstack((previous[None, :], pixels[:-1]))
+        filtered = np.empty((pixels.shape[0], pixels.shape[1] + 1), dtype=np.uint8)
+        filtered[:, 0] = 2
+        np.subtract(pixels, above, out=filtered[:, 1:])
+        previous = pixels[-1].copy()
+
+        data = compressor.compress(filtered.tobytes())
+        if data:
+            _png_chunk(f, b'IDAT', data)
+    _png_chunk(f, b'IDAT', compressor.flush())
+    _png_chunk(f, b'IEND', b'')
+
+
+def write_tiff(f, size, mode, strips, icc_profile=None, dpi=None):
+    """Grava um TIFF sem compressão (como o Pillow faz por padrão), uma faixa por vez
+
+    O perfil ICC e a resolução (em polegadas), se houver, vão nas tags próprias.
+    """
+    width, height = size
+    tiff_mode, _, channels = _png_mode(mode)
+    photometric = 1 if tiff_mode in ('L', 'LA') else 2
+
+    f.write(b'II*\x00\x00\x00\x00\x00')
+    offsets = []
+    counts = []
+    rows_per_strip = None
+    for strip in strips:
+        if strip.mode != tiff_mode:
+            strip = strip.convert(tiff_mode)
+        rows_per_strip = rows_per_strip or strip.size[1]
+        data = strip.tobytes()
+        offsets.append(f.tell())
+        counts.append(len(data))
+        f.write(data)
+
+    if f.tell() >= 2 ** 32:
+        raise RuntimeError("Imagem grande demais para TIFF (limite de 4 GB)")
+
+    # Listas de valores que não cabem nos 4 bytes da entrada do diretório vão antes dele
+    def array(kind, values):
+        if len(values) * (4 if kind == 4 else 2) <= 4:
+            return None
+        position = f.tell()
+        f.write(struct.pack(f"<{len(values)}{'I' if kind == 4 else 'H'}", *values))
+        return position
+
+    def blob(data):
+        if f.tell() % 2:
+            f.write(b'\x00')
+        position = f.tell()
+        f.write(data)
+        return position
+
+    bits_offset = array(3, [8] * channels)
+    offsets_offset = array(4, offsets)
+    counts_offset = array(4, counts)
+
+    def entry(tag, kind, values, offset=None):
+        if offset is not None:
+            return struct.pack('<HHII', tag, kind, len(values), offset)
+        packed = struct.pack(f"<{len(values)}{'I' if kind == 4 else 'H'}", *values)
+        return struct.pack('<HHI', tag, kind, len(values)) + packed.ljust(4, b'\x00')
+
+    entries = [
+        entry(256, 4, [width]),
+        entry(257, 4, [height]),
+        entry(258, 3, [8] * channels, bits_offset),
+        entry(259, 3, [1]),
+        entry(262, 3, [photometric]),
+        entry(273, 4, offsets, offsets_offset),
+        entry(277, 3, [channels]),
+        entry(278, 4, [rows_per_strip or height]),
+        entry(279, 4, counts, counts_offset),
+        entry(284, 3, [1]),
+    ]
+    if tiff_mode in ('LA', 'RGBA'):
+        entries.append(entry(338, 3, [2]))
+    if dpi:
+        # Racionais (numerador, denominador) não cabem na entrada
+        for tag, value in ((282, dpi[0]), (283, dpi[1])):
+            entries.append(struct.pack('<HHII', tag, 5, 1, blob(struct.pack('<II', round(value * 1000), 1000))))
+        entries.append(entry(296, 3, [2]))
+    if icc_profile:
+        entries.append(struct.pack('<HHII', 34675, 7, len(icc_profile), blob(icc_profile)))
+    # As entradas do diretório ficam em ordem de tag
+    entries.sort(key=lambda packed: struct.unpack('<H', packed[:2])[0])
+
+    if f.tell() % 2:
+        f.write(b'\x00')
+    directory = f.tell()
+    f.write(struct.pack('<H', len(entries)) + b''.join(entries) + b'\x00\x00\x00\x00')
+    f.seek(4)
+    f.write(struct.pack('<I', directory))
+
+
+def convert_large_image(file_path, output_path, format_name, options, adjustments=None, timings=None):
+    """Converte uma imagem grande faixa a faixa, gravando em `<saída>.part`
+
+    `options` são as opções do save() do Pillow (preset de codificação e,
+    se houver, `icc_profile` e `dpi` da origem, gravados também em PNG e TIFF).
+    Espelhamento e brilho são aplicados em cada faixa; conversões com
+    rotação não chegam aqui (ver is_large_image). `timings` recebe 'decode' (leitura das faixas), 'adjust', 'encode'
+    (compressão e gravação) e 'bytes'.
+    """
+    timings = {} if timings is None else timings
+    with Image.open(file_path) as image:
+        size, mode = image.size, image.mode
+
+    def strips():
+        # Mede separadamente a leitura e os ajustes de cada faixa
+        decode = adjust = 0.0
+        reader = iter_strips(file_path)
+        while True:
+            start = time.perf_counter()
+            try:
+                _, strip = next(reader)
+            except StopIteration:
+                break
+            decode += time.perf_counter() - start
+            if adjustments:
+                start = time.perf_counter()
+                strip = apply_adjustments(strip, adjustments)
+                adjust += time.perf_counter() - start
+            timings['decode'], timings['adjust'] = decode, adjust
+            yield strip
+
+    part_path = output_path + '.part'
+    start = time.perf_counter()
+    try:
+        with open(part_path, 'wb') as f:
+            metadata = {key: options.get(key) for key in ('icc_profile', 'dpi')}
+            if format_name == 'PNG':
+                level = options.get('compress_level', 9 if options.get('optimize') else 6)
+                write_png(f, size, mode, strips(), level, **metadata)
+            elif format_name == 'TIFF':
+                write_tiff(f, size, mode, strips(), **metadata)
+            else:
+                _save_mapped(f, size, mode, strips(), format_name, options)
+    except BaseException:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+    os.replace(part_path, output_path)
+
+    timings['encode'] = time.perf_counter() - start - timings.get('decode', 0.0) - timings.get('adjust', 0.0)
+    timings['bytes'] = os.path.getsize(output_path)
+    return output_path
+
+
+def _save_mapped(f, size, mode, strips, format_name, options):
+    """Monta a imagem num arquivo mapeado em memória e a salva com o codificador do Pillow
+
+    O codificador JPEG lê direto do arquivo mapeado (RGB como RGBX, sem cópia).
+    """
+    width, height = size
+    target = 'L' if mode == 'L' else 'RGBA' if 'A' in mode else 'RGBX'
+
+    channels = 1 if target == 'L' else 4
+    with tempfile.TemporaryFile(prefix='tic-', suffix='.raw') as buffer:
+        pixels = np.memmap(buffer, dtype=np.uint8, mode='w+', shape=(height, width * channels))
+        top = 0
+        for strip in strips:
+            strip = strip.convert(target)
+            rows = strip.size[1]
+            pixels[top:top + rows] = np.frombuffer(strip.tobytes(), dtype=np.uint8).reshape(rows, -1)
+            top += rows
+
+        # Sem cópia: a imagem aponta para o arquivo mapeado
+        image = Image.frombuffer(target, size, pixels, 'raw', target, 0, 1)
+        _save(image, f, format_name, options)
+        del image
+        del pixels
+
+
+def _save(image, f, format_name, options):
+    """Salva sem `optimize` nem `progressive` (que mantêm uma cópia inteira no codificador)"""
+    options = {key: value for key, value in options.items() if key not in ('optimize', 'progressive')}
+    image.save(f, format=format_name, **options)
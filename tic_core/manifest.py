@@ -0,0 +1,86 @@
+"""Manifesto de conversões para reexecutar lotes só com o que mudou"""
+import json
+import os
+import threading
+
+from tic_core.cache import cache_key, file_hash
+from tic_core.files import build_output_path
+
+# Índice (por pasta de saída) com uma linha JSON por conversão concluída; o
+# último registro de cada (origem, configuração) prevalece
+MANIFEST_FILE = '.mediatools_manifest.jsonl'
+
+
+def settings_key(**settings):
+    """Identifica a configuração de conversão (formato, qualidade, ajustes...)"""
+    return cache_key(*sorted(settings.items()))
+
+
+class ConversionManifest:
+    """Registro de origem (tamanho, mtime, hash) + configuração -> arquivo gerado
+
+    Um arquivo está em dia quando há registro para a mesma configuração, a
+    saída ainda existe e a origem não mudou. Tamanho e mtime iguais bastam;
+    se diferirem, o hash do conteúdo decide (um arquivo apenas copiado ou
+    tocado não é convertido de novo).
+    """
+
+    def __init__(self, output_dir):
+        self.path = os.path.join(output_dir, MANIFEST_FILE)
+        self._records = {}
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        self._records[(record['source'], record['settings'])] = record
+                    except (ValueError, KeyError):
+                        continue
+        except OSError:
+            pass
+
+    def is_current(self, source, settings, output):
+        """True se `output` já corresponde à origem atual com esta configuração"""
+        record = self._records.get((os.path.abspath(source), settings))
+        if record is None or record['output'] != os.path.abspath(output) or not os.path.exists(output):
+            return False
+
+        stat = os.stat(source)
+        if stat.st_size == record['size'] and stat.st_mtime_ns == record['mtime_ns']:
+            return True
+        if stat.st_size != record['size'] or file_hash(source) != record['hash']:
+            return False
+
+        # Mesmo conteúdo com outro mtime: atualiza o registro para a próxima vez
+        self.record(source, settings, output)
+        return True
+
+    def split(self, files, output_dir, extension, settings):
+        """Separa os arquivos em (a converter, já em dia)"""
+        pending = []
+        current = []
+        for file_path in files:
+            output_path = build_output_path(file_path, output_dir, extension)
+            try:
+                up_to_date = self.is_current(file_path, settings, output_path)
+            except OSError:
+                up_to_date = False
+            (current if up_to_date else pending).append(file_path)
+        return pending, current
+
+    def record(self, source, settings, output):
+        """Registra uma conversão concluída"""
+        stat = os.stat(source)
+        record = {
+            'source': os.path.abspath(source),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'hash': file_hash(source),
+            'settings': settings,
+            'output': os.path.abspath(output),
+        }
+        with self._lock:
+            self._records[(record['source'], settings)] = record
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
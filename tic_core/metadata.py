@@ -0,0 +1,133 @@
+"""Metadados de vídeos e áudios (duração, codecs, resolução...) com cache persistente"""
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from tic_core.cache import cache_dir, cache_key, file_signature
+from tic_core.ffmpeg import probe
+
+# Índice com o resultado de cada análise; cada linha é um registro JSON
+# {'key', 'info'} e a chave muda sempre que o arquivo muda de tamanho ou mtime
+METADATA_FILE = 'probes.jsonl'
+
+
+class MetadataCache:
+    """Resultados de `ffmpeg.probe` indexados por (caminho, mtime, tamanho)
+
+    Os registros ficam em memória e num arquivo JSONL acrescido a cada nova
+    análise, de modo que reabrir um lote já visto não executa o ffprobe de novo.
+    """
+
+    def __init__(self, directory=None, workers=4):
+        self.path = os.path.join(directory or cache_dir('metadata'), METADATA_FILE)
+        self.workers = workers
+        self._entries = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """Carrega o índice do disco na primeira consulta (chamado com o lock)"""
+        if self._entries is None:
+            entries = {}
+            try:
+                with open(self.path, encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                            entries[record['key']] = record['info']
+                        except (ValueError, KeyError):
+                            continue
+            except OSError:
+                pass
+            self._entries = entries
+        return self._entries
+
+    def lookup(self, path):
+        """Metadados já conhecidos do arquivo, sem analisá-lo (None se ausentes)"""
+        key = cache_key(*file_signature(path))
+        with self._lock:
+            return self._load().get(key)
+
+    def get(self, path):
+        """Metadados do arquivo, analisando-o apenas se ainda não estiverem no cache"""
+        key = cache_key(*file_signature(path))
+        with self._lock:
+            info = self._load().get(key)
+        if info is not None:
+            return info
+
+        info = probe(path)
+        with self._lock:
+            self._load()[key] = info
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({'key': key, 'info': info}, ensure_ascii=False) + '\n')
+            except OSError as e:
+                print(f"Erro ao gravar metadados em cache: {str(e)}")
+        return info
+
+    def iter_probe(self, paths, should_stop=None):
+        """Produz (caminho, metadados, erro) para cada arquivo
+
+        Os que já estão em cache saem imediatamente; os demais são analisados
+        em paralelo e chegam na ordem em que terminam.
+        """
+        pending = []
+        for path in paths:
+            try:
+                info = self.lookup(path)
+            except OSError as e:
+                yield path, None, str(e)
+                continue
+            if info is not None:
+                yield path, info, None
+            else:
+                pending.append(path)
+
+        if not pending:
+            return
+
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(pending)),
+                                thread_name_prefix='tic-probe') as executor:
+            futures = {executor.submit(self.get, path): path for path in pending}
+            for future in as_completed(futures):
+                if should_stop and should_stop():
+                    for remaining in futures:
+                        remaining.cancel()
+                    break
+                try:
+                    yield futures[future], future.result(), None
+                except Exception as e:
+                    yield futures[future], None, str(e)
+
+
+def summarize(info):
+    """Linhas legíveis com duração, taxa de bits e detalhes de cada stream"""
+    lines = []
+    if info.get('duration'):
+        minutes, seconds = divmod(info['duration'], 60)
+        hours, minutes = divmod(int(minutes), 60)
+        lines.append(f"Duração: {hours:d}:{minutes:02d}:{seconds:05.2f}")
+    if info.get('bit_rate'):
+        lines.append(f"Taxa de bits: {info['bit_rate'] // 1000} kb/s")
+
+    for stream in info.get('streams', []):
+        if stream['type'] == 'video':
+            text = f"Vídeo: {stream['codec']}"
+            if stream['width'] and stream['height']:
+                text += f", {stream['width']}x{stream['height']}"
+            if stream['fps']:
+                text += f", {stream['fps']:.2f} fps"
+        elif stream['type'] == 'audio':
+            text = f"Áudio: {stream['codec']}"
+            if stream['sample_rate']:
+                text += f", {stream['sample_rate']} Hz"
+            if stream['channels']:
+                text += f", {stream['channels']} canais"
+        else:
+            continue
+        if stream['bit_rate']:
+            text += f", {stream['bit_rate'] // 1000} kb/s"
+        lines.append(text)
+    return lines
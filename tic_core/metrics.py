@@ -0,0 +1,146 @@
+"""Métricas de desempenho das operações (decodificar, codificar, baixar...) e captura de perfis
+
+Cada operação medida vira um evento {'name', 'seconds', ...} guardado no
+registro do processo. O registro resume os eventos por nome (contagem,
+percentis, bytes/s) para o painel de diagnóstico e exporta o histórico em
+JSON lines para anexar a relatos de problemas.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+from tic_core.cache import cache_dir
+
+# Eventos mantidos em memória (os mais antigos são descartados)
+MAX_EVENTS = 20000
+
+
+class MetricsRegistry:
+    """Registro de eventos de tempo, seguro para uso por várias threads"""
+
+    def __init__(self, max_events=MAX_EVENTS):
+        self._events = deque(maxlen=max_events)
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds, **fields):
+        """Registra uma operação concluída (campos extras: bytes, arquivo, erro...)"""
+        event = {'name': name, 'seconds': seconds, 'time': time.time(), **fields}
+        with self._lock:
+            self._events.append(event)
+
+    @contextmanager
+    def timer(self, name, **fields):
+        """Mede o bloco e registra o evento, inclusive se ele levantar exceção
+
+        O dicionário devolvido pode receber campos durante o bloco (ex.: bytes).
+        """
+        start = time.perf_counter()
+        try:
+            yield fields
+        except Exception as e:
+            fields['error'] = str(e)
+            raise
+        finally:
+            self.record(name, time.perf_counter() - start, **fields)
+
+    def events(self):
+        """Cópia dos eventos registrados, do mais antigo ao mais recente"""
+        with self._lock:
+            return list(self._events)
+
+    def summary(self):
+        """Resumo por operação: contagem, erros, percentis (ms), total e bytes/s"""
+        groups = {}
+        for event in self.events():
+            groups.setdefault(event['name'], []).append(event)
+
+        rows = []
+        for name in sorted(groups):
+            events = groups[name]
+            durations = sorted(event['seconds'] for event in events)
+            total = sum(durations)
+            total_bytes = sum(event.get('bytes') or 0 for event in events)
+            rows.append({
+                'name': name,
+                'count': len(events),
+                'errors': sum(1 for event in events if event.get('error')),
+                'total_s': total,
+                'mean_ms': total / len(durations) * 1000,
+                'p50_ms': durations[int((len(durations) - 1) * 0.5)] * 1000,
+                'p90_ms': durations[int((len(durations) - 1) * 0.9)] * 1000,
+                'max_ms': durations[-1] * 1000,
+                'bytes_per_sec': total_bytes / total if total_bytes and total > 0 else None,
+            })
+        return rows
+
+    def export_jsonl(self, path):
+        """Grava os eventos em JSON lines; retorna quantos foram gravados"""
+        events = self.events()
+        with open(path, 'w', encoding='utf-8') as f:
+            for event in events:
+                f.write(json.dumps(event, ensure_ascii=False, default=str) + '\n')
+        return len(events)
+
+    def clear(self):
+        """Descarta os eventos registrados"""
+        with self._lock:
+            self._events.clear()
+
+
+# Registro usado por todo o processo
+metrics = MetricsRegistry()
+
+
+@contextmanager
+def profile_capture(label, directory=None, top=30):
+    """Captura cProfile (da thread atual) e tracemalloc durante o bloco
+
+    Grava numa pasta nova `<data>-<label>`: `profile.prof` (pstats),
+    `profile.txt` (funções mais caras), `memory.txt` (maiores alocações) e
+    `metrics.jsonl` (eventos registrados durante a captura). O dicionário
+    devolvido recebe o caminho da pasta em 'directory' ao final.
+    """
+    directory = os.path.join(directory or cache_dir('profiles'),
+                             f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{label}")
+    os.makedirs(directory, exist_ok=True)
+    capture = {'directory': directory}
+    started_at = time.time()
+
+    started_tracemalloc = not tracemalloc.is_tracing()
+    if started_tracemalloc:
+        tracemalloc.start(10)
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield capture
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if started_tracemalloc:
+            tracemalloc.stop()
+
+        profiler.dump_stats(os.path.join(directory, 'profile.prof'))
+        text = io.StringIO()
+        pstats.Stats(profiler, stream=text).sort_stats('cumulative').print_stats(top)
+        with open(os.path.join(directory, 'profile.txt'), 'w', encoding='utf-8') as f:
+            f.write(text.getvalue())
+
+        with open(os.path.join(directory, 'memory.txt'), 'w', encoding='utf-8') as f:
+            f.write(f"Memória rastreada: atual {current / 1024 / 1024:.1f} MB, pico {peak / 1024 / 1024:.1f} MB\n\n")
+            for stat in snapshot.statistics('lineno')[:top]:
+                f.write(f"{stat}\n")
+
+        with open(os.path.join(directory, 'metrics.jsonl'), 'w', encoding='utf-8') as f:
+            for event in metrics.events():
+                if event['time'] < started_at:
+                    continue
+                f.write(json.dumps(event, ensure_ascii=False, default=str) + '\n')
@@ -0,0 +1,137 @@
+"""Cache de miniaturas para o preview de imagens (memória + disco)"""
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, PngImagePlugin
+
+from tic_core.cache import cache_dir, cache_key, file_signature
+from tic_core.metrics import metrics
+
+PREVIEW_SIZE = (400, 400)
+
+# Quanto a decodificação reduzida pode se aproximar do tamanho final antes do
+# LANCZOS (2 = decodifica com pelo menos o dobro da resolução do preview)
+REDUCING_GAP = 2.0
+
+
+def make_thumbnail(path, size=PREVIEW_SIZE):
+    """Gera a miniatura e as informações do arquivo original
+
+    JPEGs são decodificados já em escala reduzida (Image.draft, feito pelo
+    próprio decodificador); os demais formatos passam por Image.reduce antes
+    do LANCZOS. Em nenhum caso uma cópia em resolução total é mantida.
+    """
+    with Image.open(path) as image:
+        info = {
+            'width': image.size[0],
+            'height': image.size[1],
+            'format': image.format,
+            'mode': image.mode,
+        }
+        if image.format == 'JPEG':
+            draft_size = (int(size[0] * REDUCING_GAP), int(size[1] * REDUCING_GAP))
+            image.draft(image.mode, draft_size)
+        image.thumbnail(size, Image.Resampling.LANCZOS, reducing_gap=REDUCING_GAP)
+    return image, info
+
+
+class ThumbnailCache:
+    """Miniaturas indexadas por (caminho, mtime, tamanho do arquivo, tamanho do preview)
+
+    As mais recentes ficam em memória (LRU); todas são gravadas em disco como
+    PNG, com as informações do original num campo de texto, para sobreviver
+    entre execuções.
+    """
+
+    def __init__(self, directory=None, max_items=64, size=PREVIEW_SIZE, prefetch_workers=2):
+        self.directory = directory or cache_dir('thumbnails')
+        self.max_items = max_items
+        self.size = size
+        self._memory = OrderedDict()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=prefetch_workers, thread_name_prefix='tic-thumbs')
+
+    def _key(self, path):
+        return cache_key(*file_signature(path), self.size)
+
+    def _disk_path(self, key):
+        return os.path.join(self.directory, key[:2], key + '.png')
+
+    def get(self, path):
+        """Retorna (miniatura, informações) do arquivo, gerando se necessário"""
+        key = self._key(path)
+
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+
+        with metrics.timer('thumbnail.disk', file=path) as event:
+            entry = self._load_from_disk(key)
+            event['hit'] = entry is not None
+        if entry is None:
+            with metrics.timer('thumbnail.generate', file=path):
+                entry = make_thumbnail(path, self.size)
+            self._save_to_disk(key, *entry)
+
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_items:
+                self._memory.popitem(last=False)
+        return entry
+
+    def _load_from_disk(self, key):
+        """Lê a miniatura gravada em disco, se existir"""
+        disk_path = self._disk_path(key)
+        try:
+            with Image.open(disk_path) as stored:
+                stored.load()
+                info = json.loads(stored.text['mediatools-info'])
+                return stored.copy(), info
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def _save_to_disk(self, key, thumbnail, info):
+        """Grava a miniatura em disco (falhas apenas desativam o cache em disco)"""
+        disk_path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(disk_path), exist_ok=True)
+            metadata = PngImagePlugin.PngInfo()
+            metadata.add_text('mediatools-info', json.dumps(info))
+            image = thumbnail if thumbnail.mode in ('RGB', 'RGBA', 'L', 'LA', 'P') else thumbnail.convert('RGBA')
+            tmp_path = disk_path + f'.{threading.get_ident()}.tmp'
+            image.save(tmp_path, format='PNG', pnginfo=metadata, compress_level=1)
+            os.replace(tmp_path, disk_path)
+        except OSError as e:
+            print(f"Erro ao gravar miniatura em cache: {str(e)}")
+
+    def prefetch(self, paths):
+        """Gera em segundo plano as miniaturas que ainda não estão em memória"""
+        for path in paths:
+            try:
+                key = self._key(path)
+            except OSError:
+                continue
+            with self._lock:
+                if key in self._memory or key in self._pending:
+                    continue
+                self._pending.add(key)
+            self._executor.submit(self._prefetch_one, path, key)
+
+    def _prefetch_one(self, path, key):
+        try:
+            self.get(path)
+        except Exception as e:
+            print(f"Erro ao pré-carregar {path}: {str(e)}")
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def shutdown(self):
+        """Descarta a pré-carga pendente"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
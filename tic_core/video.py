@@ -0,0 +1,175 @@
+"""Conversão de vídeos com FFmpeg, individual e em lote com transcodificações em paralelo"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from tic_core.ffmpeg import probe, run_ffmpeg
+from tic_core.files import build_output_path
+from tic_core.metrics import metrics
+
+# Para cada formato de saída: muxer do FFmpeg, codecs que podem ser copiados
+# sem recodificar e o codificador usado quando a cópia não é possível
+CONTAINERS = {
+    'MP4': {'muxer': 'mp4', 'video_copy': {'h264', 'hevc', 'mpeg4', 'av1'},
+            'audio_copy': {'aac', 'mp3', 'ac3', 'alac'},
+            'video_encoder': ['-c:v', 'libx264', '-preset', 'medium', '-crf', '23', '-pix_fmt', 'yuv420p'],
+            'audio_encoder': ['-c:a', 'aac', '-b:a', '160k'], 'extra': ['-movflags', '+faststart']},
+    'MOV': {'muxer': 'mov', 'video_copy': {'h264', 'hevc', 'mpeg4', 'prores', 'mjpeg'},
+            'audio_copy': {'aac', 'mp3', 'alac', 'pcm_s16le', 'pcm_s24le'},
+            'video_encoder': ['-c:v', 'libx264', '-preset', 'medium', '-crf', '23', '-pix_fmt', 'yuv420p'],
+            'audio_encoder': ['-c:a', 'aac', '-b:a', '160k'], 'extra': ['-movflags', '+faststart']},
+    'AVI': {'muxer': 'avi', 'video_copy': {'mpeg4', 'h264', 'mjpeg'},
+            'audio_copy': {'mp3', 'ac3', 'pcm_s16le'},
+            'video_encoder': ['-c:v', 'mpeg4', '-q:v', '4'],
+            'audio_encoder': ['-c:a', 'libmp3lame', '-b:a', '192k'], 'extra': []},
+    'MKV': {'muxer': 'matroska', 'video_copy': None, 'audio_copy': None,
+            'video_encoder': ['-c:v', 'libx264', '-preset', 'medium', '-crf', '23'],
+            'audio_encoder': ['-c:a', 'aac', '-b:a', '160k'], 'extra': []},
+    'WEBM': {'muxer': 'webm', 'video_copy': {'vp8', 'vp9', 'av1'}, 'audio_copy': {'opus', 'vorbis'},
+             'video_encoder': ['-c:v', 'libvpx-vp9', '-crf', '32', '-b:v', '0', '-row-mt', '1'],
+             'audio_encoder': ['-c:a', 'libopus', '-b:a', '128k'], 'extra': []},
+    'MPEG': {'muxer': 'mpeg', 'video_copy': {'mpeg1video', 'mpeg2video'}, 'audio_copy': {'mp2', 'mp3', 'ac3'},
+             'video_encoder': ['-c:v', 'mpeg2video', '-q:v', '4'],
+             'audio_encoder': ['-c:a', 'mp2', '-b:a', '192k'], 'extra': []},
+    'GIF': {'muxer': 'gif', 'video_copy': {'gif'}, 'audio_copy': set(),
+            'video_encoder': ['-vf', 'fps=15,split[a][b];[a]palettegen[p];[b][p]paletteuse'],
+            'audio_encoder': None, 'extra': []},
+}
+
+
+def default_video_workers():
+    """Transcodificações simultâneas padrão (cada ffmpeg já usa várias threads)"""
+    return max(1, min(4, (os.cpu_count() or 1) // 2))
+
+
+def plan_video_conversion(info, format_name):
+    """Decide, stream a stream, entre cópia direta e recodificação
+
+    Retorna (argumentos de codec para o ffmpeg, True se tudo for copiado).
+    """
+    container = CONTAINERS[format_name]
+    video = next((s for s in info['streams'] if s['type'] == 'video'), None)
+    audios = [s for s in info['streams'] if s['type'] == 'audio']
+
+    def can_copy(stream, allowed):
+        return allowed is None or stream['codec'] in allowed
+
+    args = []
+    copy_video = video is not None and can_copy(video, container['video_copy'])
+    copy_audio = all(can_copy(audio, container['audio_copy']) for audio in audios)
+
+    if video is not None:
+        args += ['-map', '0:v:0']
+        args += ['-c:v', 'copy'] if copy_video else container['video_encoder']
+    if audios and container['audio_encoder'] is not None:
+        args += ['-map', '0:a']
+        args += ['-c:a', 'copy'] if copy_audio else container['audio_encoder']
+    else:
+        args += ['-an']
+    args += ['-sn'] + container['extra']
+
+    return args, copy_video and (copy_audio or container['audio_encoder'] is None)
+
+
+def convert_video_file(file_path, output_path, format_name, threads=0, on_progress=None, should_stop=None):
+    """Converte um vídeo; copia os streams quando o contêiner de destino aceita
+
+    Grava em `<saída>.part` e renomeia ao final. Retorna um dicionário com o
+    caminho de saída, se houve apenas remux, a duração, o tempo gasto
+    (`seconds`) e a velocidade final.
+    """
+    info = probe(file_path)
+    if not any(s['type'] == 'video' for s in info['streams']):
+        raise RuntimeError("O arquivo não possui stream de vídeo")
+    codec_args, remux = plan_video_conversion(info, format_name)
+
+    part_path = output_path + '.part'
+    args = ['-i', file_path] + codec_args
+    if threads and not remux:
+        args += ['-threads', str(threads)]
+    args += ['-f', CONTAINERS[format_name]['muxer'], part_path]
+
+    start = time.perf_counter()
+    try:
+        speed = run_ffmpeg(args, info['duration'], on_progress, should_stop)
+    except Exception:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+    os.replace(part_path, output_path)
+
+    elapsed = time.perf_counter() - start
+    duration = info['duration'] or 0.0
+    metrics.record('video.remux' if remux else 'video.transcode', elapsed, file=file_path,
+                   format=format_name, duration=duration, bytes=os.path.getsize(output_path))
+    return {
+        'output': output_path,
+        'remux': remux,
+        'duration': duration,
+        'seconds': elapsed,
+        'speed': speed or (duration / elapsed if elapsed > 0 else None),
+    }
+
+
+def merge_streams(video_path, audio_path, output_path, format_name):
+    """Junta um arquivo só de vídeo e outro só de áudio, copiando os streams
+
+    Grava em `<saída>.part` e renomeia ao final.
+    """
+    container = CONTAINERS[format_name]
+    part_path = output_path + '.part'
+    args = (['-i', video_path, '-i', audio_path, '-map', '0:v:0', '-map', '1:a:0', '-c', 'copy']
+            + container['extra'] + ['-f', container['muxer'], part_path])
+    try:
+        with metrics.timer('video.merge', file=output_path, format=format_name) as fields:
+            run_ffmpeg(args)
+            fields['bytes'] = os.path.getsize(part_path)
+    except Exception:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+    os.replace(part_path, output_path)
+    return output_path
+
+
+def iter_convert_videos(files, output_dir, format_name, extension, workers=None,
+                        on_progress=None, should_stop=None):
+    """Converte vários vídeos em paralelo, produzindo um resultado por arquivo
+
+    on_progress(file_path, percent, speed) é chamado pelas threads de trabalho
+    durante cada conversão. Os resultados chegam na ordem em que terminam.
+    """
+    files = list(files)
+    total = len(files)
+    workers = max(1, min(workers or default_video_workers(), total or 1))
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    start = time.perf_counter()
+    done = 0
+
+    def convert(file_path):
+        output_path = build_output_path(file_path, output_dir, extension)
+        progress = (lambda percent, speed: on_progress(file_path, percent, speed)) if on_progress else None
+        return convert_video_file(file_path, output_path, format_name, threads, progress, should_stop)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='tic-ffmpeg') as executor:
+        futures = {executor.submit(convert, file_path): file_path for file_path in files}
+
+        for future in as_completed(futures):
+            if should_stop and should_stop():
+                for pending in futures:
+                    pending.cancel()
+                break
+
+            file_path = futures[future]
+            result = {'file': file_path, 'output': None, 'remux': False, 'speed': None, 'seconds': None,
+                      'error': None}
+            try:
+                result.update(future.result())
+            except Exception as e:
+                result['error'] = str(e)
+
+            done += 1
+            elapsed = time.perf_counter() - start
+            result.update({'done': done, 'total': total, 'elapsed': elapsed,
+                           'files_per_sec': done / elapsed if elapsed > 0 else 0.0})
+            yield result
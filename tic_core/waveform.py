@@ -0,0 +1,167 @@
+"""Forma de onda para o preview de áudios: picos mín/máx calculados em fluxo e guardados em disco"""
+import math
+import os
+import subprocess
+import threading
+
+import numpy as np
+from PIL import Image
+
+from tic_core.cache import cache_dir, cache_key, file_signature
+from tic_core.ffmpeg import CREATION_FLAGS, require_ffmpeg
+from tic_core.metrics import metrics
+
+# O áudio é decodificado em mono e com taxa reduzida: suficiente para o
+# desenho e bem menos dados para percorrer
+ANALYSIS_RATE = 8000
+PEAK_COUNT = 2000
+
+# Amostras lidas do ffmpeg por vez (int16 mono): ~4 s de áudio, ~64 KB
+READ_SAMPLES = 32 * 1024
+
+
+def compute_peaks(path, duration=None, count=PEAK_COUNT, should_stop=None):
+    """Calcula até `count` pares (mínimo, máximo) do áudio, sem carregá-lo inteiro
+
+    O PCM sai do ffmpeg por um pipe e é consumido em blocos; cada bloco é
+    dividido em grupos de tamanho fixo e reduzido com NumPy. Sem a duração
+    (ou com uma duração menor que a real), os picos passam a ser juntados
+    dois a dois sempre que excedem `count`. Retorna um array int16 de forma
+    (2, n), n <= count: linha 0 com os mínimos e linha 1 com os máximos.
+    """
+    if duration:
+        samples_per_peak = max(1, math.ceil(duration * ANALYSIS_RATE / count))
+    else:
+        samples_per_peak = ANALYSIS_RATE // 10
+
+    command = [require_ffmpeg(), '-hide_banner', '-loglevel', 'error', '-nostdin', '-i', path,
+               '-vn', '-sn', '-ac', '1', '-ar', str(ANALYSIS_RATE), '-f', 's16le', '-c:a', 'pcm_s16le', '-']
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                               creationflags=CREATION_FLAGS)
+
+    minimums = []
+    maximums = []
+    pending = np.empty(0, dtype=np.int16)
+
+    def clamp():
+        nonlocal minimums, maximums, samples_per_peak
+        while sum(group.size for group in minimums) > count:
+            minimums = [_merge_pairs(np.concatenate(minimums), np.minimum)]
+            maximums = [_merge_pairs(np.concatenate(maximums), np.maximum)]
+            samples_per_peak *= 2
+
+    try:
+        while True:
+            if should_stop and should_stop():
+                process.kill()
+                return None
+
+            data = process.stdout.read(READ_SAMPLES * 2)
+            if not data:
+                break
+            samples = np.frombuffer(data[:len(data) - len(data) % 2], dtype='<i2')
+            pending = np.concatenate((pending, samples)) if pending.size else samples
+
+            complete = pending.size - pending.size % samples_per_peak
+            if complete:
+                groups = pending[:complete].reshape(-1, samples_per_peak)
+                minimums.append(groups.min(axis=1))
+                maximums.append(groups.max(axis=1))
+                pending = pending[complete:]
+                clamp()
+
+        if pending.size:
+            minimums.append(pending.min(keepdims=True))
+            maximums.append(pending.max(keepdims=True))
+            clamp()
+    finally:
+        process.stdout.close()
+        process.wait()
+
+    if process.returncode != 0 and not minimums:
+        raise RuntimeError("Não foi possível decodificar o áudio")
+    if not minimums:
+        return np.zeros((2, 0), dtype=np.int16)
+    return np.vstack((np.concatenate(minimums), np.concatenate(maximums)))
+
+
+def _merge_pairs(values, reduce):
+    """Reduz os picos vizinhos dois a dois (o último, se sobrar, fica sozinho)"""
+    if values.size % 2:
+        values = np.append(values, values[-1])
+    return reduce(values[0::2], values[1::2])
+
+
+def render_waveform(peaks, width, height, color=(74, 107, 175), background=(255, 255, 255)):
+    """Desenha os picos como uma imagem RGB de width x height
+
+    Os picos são reagrupados em uma coluna por pixel e a imagem é montada
+    inteira com operações vetorizadas, sem desenhar linha a linha.
+    """
+    image = np.empty((height, width, 3), dtype=np.uint8)
+    image[:] = background
+    if peaks.shape[1] == 0:
+        return Image.fromarray(image)
+
+    # Índice inicial dos picos de cada coluna (colunas vazias repetem o anterior)
+    starts = (np.arange(width) * peaks.shape[1]) // width
+    minimums = np.minimum.reduceat(peaks[0], starts).astype(np.float32)
+    maximums = np.maximum.reduceat(peaks[1], starts).astype(np.float32)
+
+    middle = (height - 1) / 2
+    top = np.floor(middle - maximums / 32768 * middle).astype(np.int32)
+    bottom = np.ceil(middle - minimums / 32768 * middle).astype(np.int32)
+
+    rows = np.arange(height)[:, None]
+    image[(rows >= top) & (rows <= bottom)] = color
+    return Image.fromarray(image)
+
+
+class WaveformCache:
+    """Picos indexados por (caminho, mtime, tamanho do arquivo), gravados como .npy
+
+    Ler um .npy de alguns KB é praticamente instantâneo, então reabrir um áudio
+    já analisado só custa o desenho.
+    """
+
+    def __init__(self, directory=None, count=PEAK_COUNT):
+        self.directory = directory or cache_dir('waveforms')
+        self.count = count
+        self._lock = threading.Lock()
+
+    def _disk_path(self, path):
+        key = cache_key(*file_signature(path), self.count, ANALYSIS_RATE)
+        return os.path.join(self.directory, key[:2], key + '.npy')
+
+    def lookup(self, path):
+        """Picos já calculados, sem decodificar o áudio; None se ausentes"""
+        try:
+            return np.load(self._disk_path(path), allow_pickle=False)
+        except (OSError, ValueError):
+            return None
+
+    def get(self, path, duration, should_stop=None):
+        """Picos do áudio, calculando-os se ainda não estiverem em cache
+
+        Bloqueia até o fim da decodificação; chame fora da thread da interface.
+        Retorna None se should_stop() ficar verdadeiro.
+        """
+        peaks = self.lookup(path)
+        if peaks is not None:
+            return peaks
+
+        with metrics.timer('waveform.peaks', file=path, duration=duration):
+            peaks = compute_peaks(path, duration, self.count, should_stop)
+        if peaks is None:
+            return None
+
+        disk_path = self._disk_path(path)
+        try:
+            os.makedirs(os.path.dirname(disk_path), exist_ok=True)
+            tmp_path = disk_path + f'.{threading.get_ident()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                np.save(f, peaks, allow_pickle=False)
+            os.replace(tmp_path, disk_path)
+        except OSError as e:
+            print(f"Erro ao gravar forma de onda em cache: {str(e)}")
+        return peaks